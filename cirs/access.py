@@ -0,0 +1,57 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+"""
+Access of reporters to single critical incidents.
+
+Reporters find an incident by its comment code. The search sets a signed and
+expiring cookie, which is bound to the incident, its department and the user
+and only sent to the URL of this incident. Several incidents can be opened at
+the same time and no session has to be written.
+"""
+
+from django.conf import settings
+
+SALT = 'cirs.incident_access'
+
+
+def get_max_age():
+    return getattr(settings, 'INCIDENT_ACCESS_MAX_AGE', 8 * 60 * 60)
+
+
+def get_cookie_name(incident):
+    return 'incident_access_{}'.format(incident.pk)
+
+
+def get_token(incident, user):
+    return '{}:{}:{}'.format(incident.pk, incident.department_id, user.pk)
+
+
+def grant_access(response, incident, user):
+    response.set_signed_cookie(
+        get_cookie_name(incident), get_token(incident, user), salt=SALT,
+        max_age=get_max_age(), path=incident.get_absolute_url(),
+        secure=settings.SESSION_COOKIE_SECURE, httponly=True, samesite='Lax')
+    return response
+
+
+def has_access(request, incident):
+    token = request.get_signed_cookie(get_cookie_name(incident), default=None, salt=SALT,
+                                      max_age=get_max_age())
+    return token == get_token(incident, request.user)
@@ -16,18 +16,72 @@
 # along with LabCIRS.
 # If not, see <https://www.gnu.org/licenses/>.
 
+from collections import defaultdict
+
 from django.conf import settings
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.views.autocomplete import AutocompleteJsonView
+from django.contrib.admin.views.main import ChangeList
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.models import User
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.core.paginator import Paginator
 from django.db import models
-from django.forms import Textarea, TextInput
+from django.db.models import Exists, OuterRef
+from django.db.models.functions import Substr
+from django.forms import BaseInlineFormSet, Textarea, TextInput
+from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils.http import urlencode
 from django.utils.translation import gettext_lazy as _
+from django.utils.translation import ngettext
 from parler.admin import TranslatableAdmin, TranslatableTabularInline
+from parler.utils import get_language_title
 from registration.admin import RegistrationAdmin, RegistrationProfile
 
-from cirs.models import (Comment, CriticalIncident, Department, LabCIRSConfig,
-                         PublishableIncident, Reporter, Reviewer)
+from cirs import profiling, translations
+from cirs.dashboard import cached_work_queues, incomplete_translations
+from cirs.forms import (DepartmentProvisioningForm, IncidentClassificationForm,
+                        IncidentImportForm, IncidentStatusForm, TranslationBatchForm,
+                        TranslationImportForm)
+from cirs.importers import (IncidentImporter, get_format, incident_to_row,
+                            open_text, read_rows, write_csv)
+from cirs.provisioning import provision_departments, read_department_specs
+from cirs.triage import create_publishable_incidents, update_incidents
+from cirs.models import (COMMENT_STATUS_CHOICES, APIToken, ArchivedComment,
+                         ArchivedIncident, Comment, CriticalIncident, Department,
+                         LabCIRSConfig, ProfileReport, PublishableIncident, Reporter,
+                         Reviewer)
+
+INCIDENT_EXCERPT_LENGTH = 80
+
+
+class ScopedAutocompleteJsonView(AutocompleteJsonView):
+    """
+    Lets the admin of the model with the autocomplete field define the choices
+    with get_autocomplete_queryset(request, field_name). If it returns None,
+    the queryset of the admin of the related model is used.
+    """
+
+    def get_queryset(self):
+        source_admin = self.admin_site._registry.get(self.source_field.model)
+        qs = None
+        if hasattr(source_admin, 'get_autocomplete_queryset'):
+            qs = source_admin.get_autocomplete_queryset(self.request, self.source_field.name)
+        if qs is None:
+            return self.order(super(ScopedAutocompleteJsonView, self).get_queryset())
+        qs = qs.complex_filter(self.source_field.get_limit_choices_to())
+        qs, search_use_distinct = self.model_admin.get_search_results(
+            self.request, qs, self.term)
+        if search_use_distinct:
+            qs = qs.distinct()
+        return self.order(qs)
+
+    def order(self, qs):
+        # pages need a stable order
+        return qs if qs.ordered else qs.order_by('pk')
 
 
 class LabCIRSAdminSite(admin.AdminSite):
@@ -35,6 +89,16 @@ class LabCIRSAdminSite(admin.AdminSite):
     # Translators: This message appears in the page title
     site_title = 'LabCIRS'
     index_title = _('LabCIRS administration')
+    index_template = 'admin/cirs/index.html'
+
+    def index(self, request, extra_context=None):
+        extra_context = extra_context or {}
+        if hasattr(request.user, 'reviewer'):
+            extra_context['work_queues'] = cached_work_queues(request.user.reviewer)
+        return super(LabCIRSAdminSite, self).index(request, extra_context)
+
+    def autocomplete_view(self, request):
+        return ScopedAutocompleteJsonView.as_view(admin_site=self)(request)
     
     
 admin_site = LabCIRSAdminSite()
@@ -72,10 +136,54 @@ class HasPublishableIncidentListFilter(admin.SimpleListFilter):
         )
 
     def queryset(self, request, queryset):
+        # EXISTS uses the unique index of the one-to-one field instead of a join
+        has_publishable = Exists(PublishableIncident.objects.filter(
+            critical_incident=OuterRef('pk')))
         if self.value() == '1':
-            return queryset.exclude(publishableincident=None)
+            return queryset.filter(has_publishable)
         if self.value() == '0':
-            return queryset.filter(publishableincident=None)
+            return queryset.filter(~has_publishable)
+
+
+class ReviewerDepartmentListFilter(admin.RelatedFieldListFilter):
+    """Offers only the departments of the reviewer."""
+
+    def field_choices(self, field, request, model_admin):
+        departments = Department.objects.order_by('label')
+        if hasattr(request.user, 'reviewer'):
+            departments = request.user.reviewer.departments.order_by('label')
+        return [(department.pk, str(department)) for department in departments]
+
+
+class OpenCommentsListFilter(admin.SimpleListFilter):
+    title = _('has open comments')
+    parameter_name = 'open_comments'
+
+    def lookups(self, request, model_admin):
+        return (
+            ('1', _('Yes')),
+            ('0', _('No')),
+        )
+
+    def queryset(self, request, queryset):
+        if self.value() == '1':
+            return queryset.filter(open_comment_count__gt=0)
+        if self.value() == '0':
+            return queryset.filter(open_comment_count=0)
+
+
+class TranslationStatusListFilter(admin.SimpleListFilter):
+    title = _('Translation status')
+    parameter_name = 'translation'
+
+    def lookups(self, request, model_admin):
+        return (
+            ('incomplete', _('incomplete')),
+        )
+
+    def queryset(self, request, queryset):
+        if self.value() == 'incomplete':
+            return incomplete_translations(queryset)
 
 common_pi_fields = (
     ('incident', 'description', 'measures_and_consequences')
@@ -94,23 +202,85 @@ class PublishableIncidentInline(TranslatableTabularInline):
     readonly_fields = ('translation_info', )
 
 
+class CommentInlineFormSet(BaseInlineFormSet):
+    """Shows one page of the most recent comments, optionally with one status."""
+    per_page = 20
+    page_number = 1
+    status = None
+    # further parameters of the change view, e.g. the preserved changelist filters
+    query = {}
+
+    def get_queryset(self):
+        if not hasattr(self, '_queryset'):
+            comments = self.queryset.select_related('author').order_by('-created', '-pk')
+            if self.status:
+                comments = comments.filter(status=self.status)
+            self.page = Paginator(comments, self.per_page).get_page(self.page_number)
+            self._queryset = self.page.object_list
+        return self._queryset
+
+    def get_url(self, page_number, status):
+        return '?' + urlencode(dict(self.query, comments_page=page_number,
+                                    comments_status=status or ''))
+
+    @property
+    def status_links(self):
+        return [(label, self.get_url(1, status), status == self.status)
+                for status, label in ((None, _('All')),) + COMMENT_STATUS_CHOICES]
+
+    @property
+    def previous_url(self):
+        if self.page.has_previous():
+            return self.get_url(self.page.previous_page_number(), self.status)
+
+    @property
+    def next_url(self):
+        if self.page.has_next():
+            return self.get_url(self.page.next_page_number(), self.status)
+
+
 class CommentInline(admin.TabularInline):
     model = Comment
+    formset = CommentInlineFormSet
     extra = 0
     readonly_fields = ('author', 'text',)
+    template = 'admin/cirs/criticalincident/comment_inline.html'
     
     def has_add_permission(self, request, *args, **kwargs):
         # TODO: write tests. Reviewer should not add comments in the admin inline view
         return False
 
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super(CommentInline, self).get_formset(request, obj, **kwargs)
+        formset.page_number = request.GET.get('comments_page') or 1
+        if request.GET.get('comments_status') in dict(COMMENT_STATUS_CHOICES):
+            formset.status = request.GET['comments_status']
+        formset.query = {key: value for key, value in request.GET.items()
+                         if key not in ('comments_page', 'comments_status')}
+        return formset
+
+class IncidentChangeList(ChangeList):
+    """Reads only the beginning of the incident and none of the other long texts."""
+
+    def get_queryset(self, request):
+        return super(IncidentChangeList, self).get_queryset(request).defer(
+            'incident', 'reason', 'immediate_action', 'action').annotate(
+                incident_start=Substr('incident', 1, INCIDENT_EXCERPT_LENGTH + 1))
+
+
 class CriticalIncidentAdmin(admin.ModelAdmin):
     readonly_fields = ('date', 'incident', 'reason', 'immediate_action',
                        'public', 'reported', 'preventability', 'photo',
                        'photo_tag')
-    list_filter = ('department', 'status', 'date', 'reported', 'public', 'risk',
-                   HasPublishableIncidentListFilter)
-    list_display = ('incident', 'date', 'reported', 'status', 'risk')
-    list_display_links = ('incident', 'status', 'risk')
+    list_filter = (('department', ReviewerDepartmentListFilter), 'status', 'date', 'reported',
+                   'public', 'risk', HasPublishableIncidentListFilter, OpenCommentsListFilter)
+    list_display = ('short_incident', 'date', 'reported', 'status', 'risk', 'comment_count',
+                    'open_comment_count')
+    list_display_links = ('short_incident', 'status', 'risk')
+    search_fields = ('incident', 'comment_code')
+    date_hierarchy = 'reported'
+    # counting all incidents of the table is slow and not helpful for reviewers
+    show_full_result_count = False
     fieldsets = (
         (_('Reported incident'), {
             'fields': (('date', 'reported'), 'public', 'incident', 'reason',
@@ -126,6 +296,19 @@ class CriticalIncidentAdmin(admin.ModelAdmin):
         })
     )
     inlines = [PublishableIncidentInline, CommentInline]
+    actions = ['change_status', 'classify', 'create_publishable_incidents']
+
+    def get_changelist(self, request, **kwargs):
+        return IncidentChangeList
+
+    @admin.display(description=_("Mistake / problem / critical incident"), ordering='incident')
+    def short_incident(self, obj):
+        text = getattr(obj, 'incident_start', None)
+        if text is None:
+            text = obj.incident
+        if len(text) > INCIDENT_EXCERPT_LENGTH:
+            return text[:INCIDENT_EXCERPT_LENGTH] + '…'
+        return text
 
     def get_formsets(self, request, obj=None):
         for inline in self.get_inline_instances(request, obj):
@@ -141,17 +324,169 @@ class CriticalIncidentAdmin(admin.ModelAdmin):
         except Reviewer.DoesNotExist:
             return qs.none()
 
+    def get_urls(self):
+        import_url = path('import/', self.admin_site.admin_view(self.import_view),
+                          name='cirs_criticalincident_import')
+        return [import_url] + super(CriticalIncidentAdmin, self).get_urls()
+
+    def get_import_departments(self, request):
+        if request.user.is_superuser:
+            return Department.objects.all()
+        try:
+            return request.user.reviewer.departments.all()
+        except Reviewer.DoesNotExist:
+            return Department.objects.none()
+
+    def import_view(self, request):
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        errors = []
+        form = IncidentImportForm(request.POST or None, request.FILES or None,
+                                  departments=self.get_import_departments(request))
+        if request.method == 'POST' and form.is_valid():
+            upload = form.cleaned_data['file']
+            importer = IncidentImporter(form.cleaned_data['department'],
+                                        dry_run=form.cleaned_data['dry_run'])
+            try:
+                importer.run(read_rows(open_text(upload), get_format(upload.name)))
+            except ValueError as error:
+                # also raised for broken CSV/JSON content
+                messages.error(request, _('The file could not be read: %s') % error)
+            else:
+                errors = importer.errors
+                if form.cleaned_data['dry_run']:
+                    msg = _('%(valid)d valid and %(invalid)d invalid incidents found. '
+                            'Nothing was saved.')
+                else:
+                    msg = _('%(valid)d incidents imported, %(invalid)d invalid rows skipped.')
+                messages.info(request, msg % {'valid': importer.imported,
+                                              'invalid': len(errors)})
+        context = dict(self.admin_site.each_context(request),
+                       title=_('Import critical incidents'),
+                       opts=self.model._meta, form=form, errors=errors)
+        return TemplateResponse(request, 'admin/cirs/criticalincident/import_form.html',
+                                context)
+
+    def bulk_update_view(self, request, queryset, form_class, title):
+        """
+        Asks for the new values on an intermediate page and applies them to
+        all selected incidents with one UPDATE.
+        """
+        form = form_class(request.POST if 'apply' in request.POST else None)
+        if form.is_valid():
+            changed, skipped = update_incidents(queryset, form.get_values())
+            msg = ngettext('%(changed)d incident was changed.',
+                           '%(changed)d incidents were changed.', changed)
+            if skipped:
+                msg += ' ' + ngettext(
+                    '%(skipped)d new incident was skipped, please set its status first.',
+                    '%(skipped)d new incidents were skipped, please set their status first.',
+                    skipped)
+            self.message_user(request, msg % {'changed': changed, 'skipped': skipped},
+                              messages.WARNING if skipped else messages.SUCCESS)
+            return None
+        context = dict(self.admin_site.each_context(request), title=title,
+                       opts=self.model._meta, form=form,
+                       selected=list(queryset.values_list('pk', flat=True)),
+                       action=request.POST.get('action'),
+                       action_checkbox_name=helpers.ACTION_CHECKBOX_NAME)
+        return TemplateResponse(request, 'admin/cirs/criticalincident/bulk_update_form.html',
+                                context)
+
+    @admin.action(description=_('Change status of selected incidents'),
+                  permissions=['change'])
+    def change_status(self, request, queryset):
+        return self.bulk_update_view(request, queryset, IncidentStatusForm,
+                                     _('Change status'))
+
+    @admin.action(description=_('Classify selected incidents'), permissions=['change'])
+    def classify(self, request, queryset):
+        return self.bulk_update_view(request, queryset, IncidentClassificationForm,
+                                     _('Classify incidents'))
+
+    def has_add_publishable_permission(self, request):
+        publishable_admin = self.admin_site._registry.get(PublishableIncident)
+        return (publishable_admin is not None
+                and publishable_admin.has_add_permission(request))
+
+    @admin.action(description=_('Create publishable incidents for selected incidents'),
+                  permissions=['add_publishable'])
+    def create_publishable_incidents(self, request, queryset):
+        created = create_publishable_incidents(queryset)
+        skipped = queryset.count() - created
+        msg = ngettext('%(created)d publishable incident was created.',
+                       '%(created)d publishable incidents were created.', created)
+        if skipped:
+            msg += ' ' + ngettext(
+                '%(skipped)d incident was skipped as it is new, not public or '
+                'already has a publishable incident.',
+                '%(skipped)d incidents were skipped as they are new, not public or '
+                'already have a publishable incident.', skipped)
+        self.message_user(request, msg % {'created': created, 'skipped': skipped})
+
+class ArchivedCommentInline(admin.TabularInline):
+    model = ArchivedComment
+    extra = 0
+    fields = readonly_fields = ('author', 'created', 'text', 'status')
+    can_delete = False
+
+
+class ArchivedIncidentAdmin(admin.ModelAdmin):
+    """Read-only, searchable list of archived incidents."""
+    list_display = ('incident', 'date', 'reported', 'department', 'archived')
+    list_filter = (('department', ReviewerDepartmentListFilter), 'reported', 'archived', 'risk')
+    search_fields = ('comment_code', 'incident', 'reason', 'immediate_action', 'action')
+    fieldsets = CriticalIncidentAdmin.fieldsets + (
+        (_('Archive'), {'fields': ('archived', 'comment_code')}),)
+    inlines = [ArchivedCommentInline]
+    actions = ['export_csv']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def get_queryset(self, request):
+        qs = super(ArchivedIncidentAdmin, self).get_queryset(request)
+        try:
+            return qs.filter(department__in=request.user.reviewer.departments.all())
+        except Reviewer.DoesNotExist:
+            return qs.none()
+
+    @admin.action(description=_('Export selected incidents as CSV'), permissions=['view'])
+    def export_csv(self, request, queryset):
+        response = HttpResponse(content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = 'attachment; filename="archived_incidents.csv"'
+        write_csv((incident_to_row(incident, incident.comments.all())
+                   for incident in queryset.prefetch_related('comments__author')), response)
+        return response
+
+
 class PublishableIncidentAdmin(TranslatableAdmin):
 
     fields = (('critical_incident', 'publish', 'translation_info'),) + common_pi_fields
-    list_filter = ('publish', )
+    list_filter = ('publish', 'critical_incident__department', TranslationStatusListFilter)
     list_display = ('incident', 'critical_incident', 'translation_status')
     list_display_links = ('incident', )
     readonly_fields = ('translation_info', )
+    autocomplete_fields = ('critical_incident', )
+
+    def get_autocomplete_queryset(self, request, field_name):
+        if field_name == 'critical_incident':
+            incidents = CriticalIncident.objects.filter(public=True, publishableincident=None)
+            if hasattr(request.user, 'reviewer'):
+                incidents = incidents.filter(
+                    department__in=request.user.reviewer.departments.all())
+            return incidents.exclude(status='new').order_by('-reported', '-pk')
 
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
         if db_field.name == "critical_incident":
-            kwargs["queryset"] = CriticalIncident.objects.filter(public=True).filter(publishableincident=None).exclude(status='new')
+            # validates the choice, the autocomplete widget does not render all options
+            kwargs["queryset"] = self.get_autocomplete_queryset(request, db_field.name)
         return super(PublishableIncidentAdmin, self).formfield_for_foreignkey(db_field, request, **kwargs)
 
     def get_readonly_fields(self, request, obj=None):
@@ -170,6 +505,120 @@ class PublishableIncidentAdmin(TranslatableAdmin):
         except Reviewer.DoesNotExist:
             return qs.none()
 
+    def get_urls(self):
+        info = self.model._meta.app_label, self.model._meta.model_name
+        return [
+            path('translations/', self.admin_site.admin_view(self.translations_view),
+                 name='%s_%s_translations' % info),
+            path('translations/import/',
+                 self.admin_site.admin_view(self.import_translations_view),
+                 name='%s_%s_import_translations' % info),
+        ] + super(PublishableIncidentAdmin, self).get_urls()
+
+    def get_translation_departments(self, request):
+        if request.user.is_superuser:
+            return Department.objects.all()
+        try:
+            return request.user.reviewer.departments.all()
+        except Reviewer.DoesNotExist:
+            return Department.objects.none()
+
+    def get_translation_queryset(self, request):
+        return self.model._default_manager.filter(
+            critical_incident__department__in=self.get_translation_departments(request))
+
+    def translations_view(self, request):
+        """
+        Grid of all publishable incidents of a department lacking a complete
+        translation in one language, saved at once and exportable as XLIFF or
+        PO file.
+        """
+        if not self.has_change_permission(request):
+            raise PermissionDenied
+        form = TranslationBatchForm(request.GET or None,
+                                    departments=self.get_translation_departments(request))
+        rows, posted = [], {}
+        if form.is_valid():
+            department = form.cleaned_data['department']
+            language = form.cleaned_data['language']
+            queryset = self.get_translation_queryset(request).filter(
+                critical_incident__department=department)
+            if request.method == 'POST':
+                posted = defaultdict(dict)
+                for key, value in request.POST.items():
+                    pk, _sep, field = key.partition('-')
+                    if pk.isdigit() and field in translations.TRANSLATED_FIELDS:
+                        posted[int(pk)][field] = value
+                try:
+                    created, updated = translations.save_translations(
+                        queryset, language, posted)
+                except ValidationError as error:
+                    messages.error(request, ' '.join(error.messages))
+                else:
+                    self.message_translations_saved(request, created, updated)
+                    return HttpResponseRedirect(request.get_full_path())
+            rows = translations.load_batch(
+                translations.missing_translations(queryset, language), language)
+            export_format = request.GET.get('format')
+            if export_format in translations.FORMATS:
+                return self.export_translations(rows, department, language, export_format)
+        fields = [PublishableIncident._parler_meta.root_model._meta.get_field(name)
+                  for name in translations.TRANSLATED_FIELDS]
+        for row in rows:
+            row['cells'] = [
+                (field, row['source'][field.name],
+                 posted.get(row['pk'], {}).get(field.name, row['target'][field.name]))
+                for field in fields]
+        context = dict(self.admin_site.each_context(request),
+                       title=_('Translate publishable incidents'), opts=self.model._meta,
+                       form=form, rows=rows, fields=fields,
+                       import_form=TranslationImportForm(),
+                       source_language=get_language_title(settings.PARLER_DEFAULT_LANGUAGE_CODE))
+        return TemplateResponse(request, 'admin/cirs/publishableincident/translations.html',
+                                context)
+
+    def export_translations(self, rows, department, language, export_format):
+        content_type, extension = {
+            'xliff': ('application/x-xliff+xml', 'xlf'),
+            'po': ('text/x-gettext-translation; charset=utf-8', 'po'),
+        }[export_format]
+        response = HttpResponse(content_type=content_type)
+        response['Content-Disposition'] = 'attachment; filename="translations_{}_{}.{}"'.format(
+            department.label, language, extension)
+        translations.WRITERS[export_format](
+            rows, settings.PARLER_DEFAULT_LANGUAGE_CODE, language, response)
+        return response
+
+    def import_translations_view(self, request):
+        if not self.has_change_permission(request):
+            raise PermissionDenied
+        form = TranslationImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            upload = form.cleaned_data['file']
+            try:
+                file_format = translations.get_format(upload.name)
+                if file_format == 'po':
+                    upload = open_text(upload)
+                language, texts = translations.READERS[file_format](upload)
+                if language not in translations.get_target_languages():
+                    raise ValueError('Unsupported target language {}.'.format(language))
+                created, updated = translations.save_translations(
+                    self.get_translation_queryset(request), language, texts)
+            except ValueError as error:
+                messages.error(request, _('The file could not be read: %s') % error)
+            except ValidationError as error:
+                messages.error(request, ' '.join(error.messages))
+            else:
+                self.message_translations_saved(request, created, updated)
+        elif request.method == 'POST':
+            messages.error(request, _('Please choose a file.'))
+        return HttpResponseRedirect(reverse('admin:cirs_publishableincident_translations'))
+
+    def message_translations_saved(self, request, created, updated):
+        self.message_user(request, _(
+            '%(created)d translations created, %(updated)d translations updated.') % {
+                'created': created, 'updated': updated}, messages.SUCCESS)
+
 
 class AdminObjectMixin(object):
     
@@ -184,7 +633,7 @@ class AdminObjectMixin(object):
 class ConfigurationAdmin(AdminObjectMixin, TranslatableAdmin):
     
     list_display = ('__str__', 'translation_status')
-    filter_horizontal = ('notification_recipients',)
+    autocomplete_fields = ('notification_recipients',)
     fieldsets = (
         (_('Languages'), {
             'fields': ('mandatory_languages', 'translation_info')
@@ -194,7 +643,7 @@ class ConfigurationAdmin(AdminObjectMixin, TranslatableAdmin):
         }),
         (_('Notification settings'), {
             'fields': (('send_notification', 'notification_sender_email'),
-                       'notification_text', 'notification_recipients')
+                       'notification_mode', 'notification_text', 'notification_recipients')
         })
     )
     readonly_fields = ('translation_info', )
@@ -205,6 +654,15 @@ class ConfigurationAdmin(AdminObjectMixin, TranslatableAdmin):
             kwargs["queryset"] = User.objects.filter(reviewer__in=self.model_instance.department.reviewers.all())
         return super(ConfigurationAdmin, self).formfield_for_manytomany(db_field, request, **kwargs)
 
+    def get_autocomplete_queryset(self, request, field_name):
+        # the configuration is not known here, so reviewers of all departments of the user
+        if field_name == 'notification_recipients':
+            try:
+                departments = request.user.reviewer.departments.all()
+            except Reviewer.DoesNotExist:
+                departments = Department.objects.all()
+            return User.objects.filter(reviewer__departments__in=departments).distinct()
+
     def get_queryset(self, request):
         qs = super(ConfigurationAdmin, self).get_queryset(request)
         try:
@@ -216,7 +674,9 @@ class ConfigurationAdmin(AdminObjectMixin, TranslatableAdmin):
 
 
 class DepartmentAdmin(AdminObjectMixin, admin.ModelAdmin):
-    filter_horizontal = ('reviewers',)
+    autocomplete_fields = ('reporter', 'reviewers')
+    list_display = ('label', 'name', 'active', 'new_incident_count', 'open_comment_count',
+                    'unpublished_count')
        
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
         if db_field.name == "reporter":
@@ -224,8 +684,44 @@ class DepartmentAdmin(AdminObjectMixin, admin.ModelAdmin):
                                   | Reporter.objects.filter(department=self.model_instance))
         return super(DepartmentAdmin, self).formfield_for_foreignkey(db_field, request, **kwargs)
 
+    def get_autocomplete_queryset(self, request, field_name):
+        # the assigned reporter is rendered by the widget anyway
+        if field_name == 'reporter':
+            return Reporter.objects.filter(department=None)
+
+    def get_urls(self):
+        provision_url = path('provision/', self.admin_site.admin_view(self.provision_view),
+                             name='cirs_department_provision')
+        return [provision_url] + super(DepartmentAdmin, self).get_urls()
+
+    def provision_view(self, request):
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        provisioned = []
+        form = DepartmentProvisioningForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            try:
+                specs = list(read_department_specs(open_text(form.cleaned_data['file'])))
+                provisioned = provision_departments(specs)
+            except (ValidationError, ValueError) as error:
+                for message in getattr(error, 'messages', [str(error)]):
+                    messages.error(request, message)
+            else:
+                messages.success(request, _('%d departments were created.') % len(provisioned))
+        context = dict(self.admin_site.each_context(request),
+                       title=_('Provision departments'),
+                       opts=self.model._meta, form=form, provisioned=provisioned)
+        return TemplateResponse(request, 'admin/cirs/department/provision_form.html', context)
+
 
 class RoleAdmin(AdminObjectMixin, admin.ModelAdmin):
+    autocomplete_fields = ('user',)
+    search_fields = ('user__username', 'user__email')
+
+    def get_autocomplete_queryset(self, request, field_name):
+        # the assigned user is rendered by the widget anyway
+        if field_name == 'user':
+            return User.objects.filter(is_superuser=False, reporter=None, reviewer=None)
 
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
         if db_field.name == "user":
@@ -239,11 +735,112 @@ class RoleAdmin(AdminObjectMixin, admin.ModelAdmin):
         return super(RoleAdmin, self).formfield_for_foreignkey(db_field, request, **kwargs)
 
 
+class APITokenAdmin(admin.ModelAdmin):
+    list_display = ('name', 'department', 'created', 'active')
+    list_filter = ('active', 'department')
+    readonly_fields = ('key', 'created')
+    fields = ('name', 'department', 'active', 'key', 'created')
+
+
+class ProfileReportAdmin(admin.ModelAdmin):
+    """Requests profiled on demand, only for superusers, see cirs.profiling."""
+    list_display = ('created', 'method', 'path', 'status_code', 'duration', 'query_count',
+                    'query_duration', 'user')
+    list_filter = ('method', 'status_code')
+    search_fields = ('path',)
+    change_list_template = 'admin/cirs/profilereport/change_list.html'
+
+    def has_module_permission(self, request):
+        return request.user.is_superuser
+
+    def has_view_permission(self, request, obj=None):
+        return request.user.is_superuser
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return request.user.is_superuser
+
+    def get_queryset(self, request):
+        # the statistics are loaded only for the report
+        return super(ProfileReportAdmin, self).get_queryset(request).defer(
+            'stats', 'queries').select_related('user')
+
+    def get_urls(self):
+        urls = [
+            path('start/', self.admin_site.admin_view(self.start_view),
+                 name='cirs_profilereport_start'),
+            path('stop/', self.admin_site.admin_view(self.stop_view),
+                 name='cirs_profilereport_stop'),
+            path('<int:pk>/download/', self.admin_site.admin_view(self.download_view),
+                 name='cirs_profilereport_download'),
+        ]
+        return urls + super(ProfileReportAdmin, self).get_urls()
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = dict(extra_context or {}, profiling_active=profiling.is_requested(request),
+                             profiling_parameter=profiling.QUERY_PARAMETER)
+        if request.user.is_superuser:
+            extra_context['profiling_token'] = profiling.get_token(request.user)
+        return super(ProfileReportAdmin, self).changelist_view(request, extra_context)
+
+    def start_view(self, request):
+        if request.method != 'POST' or not self.has_view_permission(request):
+            raise PermissionDenied
+        messages.info(request, _('Requests are profiled for the next %d minutes.')
+                      % (profiling.get_max_age() // 60))
+        return profiling.start_profiling(
+            HttpResponseRedirect(reverse('admin:cirs_profilereport_changelist')), request.user)
+
+    def stop_view(self, request):
+        if request.method != 'POST' or not self.has_view_permission(request):
+            raise PermissionDenied
+        return profiling.stop_profiling(
+            HttpResponseRedirect(reverse('admin:cirs_profilereport_changelist')))
+
+    def get_report(self, request, pk):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        try:
+            pk = int(pk)
+        except ValueError:
+            raise Http404
+        report = ProfileReport.objects.filter(pk=pk).first()
+        if report is None:
+            raise Http404
+        return report
+
+    def download_view(self, request, pk):
+        report = self.get_report(request, pk)
+        response = HttpResponse(bytes(report.stats), content_type='application/octet-stream')
+        response['Content-Disposition'] = 'attachment; filename="request_{}.prof"'.format(pk)
+        return response
+
+    def change_view(self, request, object_id, form_url='', extra_context=None):
+        report = self.get_report(request, object_id)
+        sort = request.GET.get('sort')
+        if sort not in profiling.SORT_KEYS:
+            sort = profiling.SORT_KEYS[0]
+        context = dict(self.admin_site.each_context(request), title=str(report),
+                       opts=self.model._meta, report=report, sort=sort,
+                       sort_keys=profiling.SORT_KEYS,
+                       stats=profiling.format_stats(report, sort),
+                       queries=sorted(report.queries, key=lambda query: -query['duration']))
+        return TemplateResponse(request, 'admin/cirs/profilereport/report.html', context)
+
+
 admin_site.register(User, LabCIRSUserAdmin)
 admin_site.register(CriticalIncident, CriticalIncidentAdmin)
 admin_site.register(PublishableIncident, PublishableIncidentAdmin)
+admin_site.register(ArchivedIncident, ArchivedIncidentAdmin)
 admin_site.register(LabCIRSConfig, ConfigurationAdmin)
 admin_site.register(Department, DepartmentAdmin)
 admin_site.register(Reporter, RoleAdmin)
 admin_site.register(Reviewer, RoleAdmin)
+admin_site.register(APIToken, APITokenAdmin)
+admin_site.register(ProfileReport, ProfileReportAdmin)
 admin_site.register(RegistrationProfile, RegistrationAdmin)
@@ -0,0 +1,226 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Read-only JSON API for other systems.
+
+Clients authenticate with an API token in the ``Authorization`` header::
+
+    Authorization: Token <key>
+
+Every token belongs to one department and grants access only to its data.
+Lists are paginated by the primary key (keyset pagination): the client passes
+the highest id it already knows as ``after`` and follows the ``next`` link
+until it is ``null``. Storing the last id allows fetching only new entries
+later on.
+
+The change feed contains only changes of publishable incidents. Its
+``last_sequence`` does not pass recent changes, which may be followed by
+changes with lower sequence numbers of transactions still running. They are
+delivered again with the next request, so clients skip sequence numbers they
+already processed.
+
+The views are coroutines using the asynchronous ORM methods, so that an ASGI
+server (labcirs/asgi.py) can answer many clients without a thread for each.
+Django 4.2 does not support coroutines in require_GET and condition, so
+their checks are done here.
+"""
+
+from functools import wraps
+from hashlib import md5
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.http import Http404, HttpResponseNotAllowed, JsonResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag, urlencode
+
+from .changelog import get_settled_sequence
+from .models import APIToken, ChangeLogEntry, PublishableIncident
+from .routers import replica_allowed
+
+API_VERSION = 1
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# change log entries of other models reveal unpublished data
+FEED_MODELS = ('cirs.publishableincident',)
+
+
+def require_GET(view_func):
+    @wraps(view_func)
+    async def wrapped_view(request, *args, **kwargs):
+        if request.method != 'GET':
+            return HttpResponseNotAllowed(['GET'])
+        return await view_func(request, *args, **kwargs)
+    return wrapped_view
+
+
+def api_token_required(view_func):
+    """Authenticates the request by token and checks the department scope."""
+    @wraps(view_func)
+    async def wrapped_view(request, *args, **kwargs):
+        keyword, _, key = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+        try:
+            if keyword.lower() != 'token':
+                raise APIToken.DoesNotExist
+            token = await APIToken.objects.select_related('department').aget(
+                key=key.strip(), active=True)
+        except APIToken.DoesNotExist:
+            response = JsonResponse({'detail': 'Invalid or missing API token.'}, status=401)
+            response['WWW-Authenticate'] = 'Token'
+            return response
+        # do not disclose if another department exists
+        if 'dept' in kwargs and token.department.label != kwargs['dept']:
+            raise Http404
+        request.api_token = token
+        return await view_func(request, *args, **kwargs)
+    return wrapped_view
+
+
+def get_language_code(request):
+    language_code = request.GET.get('language', settings.PARLER_DEFAULT_LANGUAGE_CODE)
+    if language_code not in [lang['code'] for lang in settings.PARLER_LANGUAGES[None]]:
+        raise Http404('Unsupported language')
+    return language_code
+
+
+def get_page_params(request, cursor='after'):
+    """
+    Returns the keyset cursor and the page size from the query string.
+
+    Raises ValueError if they are not integers.
+    """
+    after = int(request.GET.get(cursor, 0))
+    limit = int(request.GET.get('limit', DEFAULT_PAGE_SIZE))
+    return max(after, 0), min(max(limit, 1), MAX_PAGE_SIZE)
+
+
+def invalid_page_params():
+    return JsonResponse({'detail': 'Invalid pagination parameters.'}, status=400)
+
+
+def get_next_url(request, url_name, dept, params):
+    return request.build_absolute_uri('{}?{}'.format(
+        reverse(url_name, kwargs={'dept': dept}), urlencode(params)))
+
+
+def published_incidents(department):
+    return PublishableIncident.objects.filter(
+        publish=True, critical_incident__department=department)
+
+
+def get_last_modified(state):
+    # the date and the photo are serialized from the critical incident
+    dates = [date for date in (state['modified'], state['ci_modified']) if date]
+    return max(dates) if dates else None
+
+
+def incidents_etag(language_code, after, limit, state):
+    # The ETag changes if any publishable incident of the department or its
+    # critical incident was modified, published, unpublished or deleted.
+    dates = [date.isoformat() if date else '' for date in (state['modified'],
+                                                            state['ci_modified'])]
+    fingerprint = ':'.join(str(part) for part in [
+        API_VERSION, language_code, after, limit, state['count']] + dates)
+    return quote_etag(md5(fingerprint.encode('utf-8')).hexdigest())
+
+
+def set_conditional_headers(response, etag, last_modified):
+    if not response.has_header('ETag'):
+        response['ETag'] = etag
+    if last_modified and not response.has_header('Last-Modified'):
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def serialize_incident(request, incident, language_code):
+    ci = incident.critical_incident
+    data = {'id': incident.id, 'date': ci.date.strftime('%Y-%m'), 'photo': None}
+    for field in ('incident', 'description', 'measures_and_consequences'):
+        data[field] = incident.safe_translation_getter(
+            field, default='', language_code=language_code, any_language=True)
+    if ci.photo:
+        data['photo'] = request.build_absolute_uri(settings.MEDIA_URL + str(ci.photo))
+    return data
+
+
+@replica_allowed
+@require_GET
+@api_token_required
+async def publishable_incident_list(request, dept):
+    """
+    Returns published incidents of the department ordered by their id.
+    """
+    language_code = get_language_code(request)
+    try:
+        after, limit = get_page_params(request)
+    except ValueError:
+        return invalid_page_params()
+    incidents = published_incidents(request.api_token.department)
+    state = await incidents.aaggregate(count=Count('id'), modified=Max('modified'),
+                                       ci_modified=Max('critical_incident__modified'))
+    etag = incidents_etag(language_code, after, limit, state)
+    last_modified = get_last_modified(state)
+    last_modified = last_modified and int(last_modified.timestamp())
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        return set_conditional_headers(response, etag, last_modified)
+    incidents = [incident async for incident in incidents.filter(
+        id__gt=after).select_related('critical_incident').prefetch_related(
+            'translations').order_by('id')[:limit]]
+    next_url = None
+    if len(incidents) == limit:
+        next_url = get_next_url(request, 'api_incidents', dept, {
+            'language': language_code, 'after': incidents[-1].id, 'limit': limit})
+    return set_conditional_headers(JsonResponse({
+        'version': API_VERSION,
+        'department': dept,
+        'language': language_code,
+        'results': [serialize_incident(request, incident, language_code)
+                    for incident in incidents],
+        'next': next_url,
+    }), etag, last_modified)
+
+
+@replica_allowed
+@require_GET
+@api_token_required
+async def change_list(request, dept):
+    """
+    Returns change log entries of publishable incidents of the department with
+    a sequence number greater than ``since``.
+    """
+    try:
+        since, limit = get_page_params(request, cursor='since')
+    except ValueError:
+        return invalid_page_params()
+    entries = [entry async for entry in ChangeLogEntry.objects.filter(
+        department_pk=request.api_token.department_id, model__in=FEED_MODELS,
+        id__gt=since)[:limit]]
+    next_url = None
+    if len(entries) == limit:
+        next_url = get_next_url(request, 'api_changes', dept,
+                                {'since': entries[-1].id, 'limit': limit})
+    return JsonResponse({
+        'version': API_VERSION,
+        'department': dept,
+        'results': [entry.as_dict() for entry in entries],
+        'last_sequence': get_settled_sequence(entries, since),
+        'next': next_url,
+    })
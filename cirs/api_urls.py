@@ -0,0 +1,10 @@
+from django.urls import path
+
+from cirs.api import change_list, publishable_incident_list
+
+# the dept converter is registered in cirs.departments
+
+urlpatterns = [
+    path('<dept:dept>/incidents/', publishable_incident_list, name='api_incidents'),
+    path('<dept:dept>/changes/', change_list, name='api_changes'),
+]
@@ -3,3 +3,13 @@ from django.apps import AppConfig
 
 class CirsConfig(AppConfig):
     name = 'cirs'
+
+    def ready(self):
+        # connect receivers of the change log
+        from . import changelog  # @UnusedImport
+        # connect receivers maintaining the counter fields
+        from . import counters  # @UnusedImport
+        # register the dept path converter
+        from . import departments  # @UnusedImport
+        # register the performance checks
+        from . import checks  # @UnusedImport
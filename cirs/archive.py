@@ -0,0 +1,106 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+"""
+Moves old, completed critical incidents with their comments into the archive
+tables, so that the tables used for reviewing stay small.
+
+Incidents whose publishable incident is published are not archived, they
+stay in the lists of published incidents. An unpublished publishable
+incident is kept with its translations in the archived incident.
+"""
+
+from django.db import transaction
+
+from .backup import dump_translations
+from .models import (ArchivedComment, ArchivedIncident, Comment, CriticalIncident,
+                     IncidentFields, PublishableIncident)
+
+INCIDENT_ATTNAMES = [field.attname for field in IncidentFields._meta.fields]
+COMMENT_ATTNAMES = ('id', 'author_id', 'created', 'text', 'status')
+
+
+def archivable_incidents(cutoff, department=None):
+    """Completed incidents reported before the date cutoff."""
+    incidents = CriticalIncident.objects.filter(
+        status='completed', reported__lt=cutoff).exclude(publishableincident__publish=True)
+    if department is not None:
+        incidents = incidents.filter(department=department)
+    return incidents
+
+
+def dump_publishable(publishable):
+    if publishable is None:
+        return None
+    return {'publish': publishable.publish, 'translations': dump_translations(publishable)}
+
+
+class IncidentArchiver(object):
+
+    batch_size = 500
+
+    def __init__(self, cutoff, department=None, batch_size=None, progress=None):
+        self.incidents = archivable_incidents(cutoff, department)
+        self.batch_size = batch_size or self.batch_size
+        self.progress = progress
+        self.archived = 0
+
+    def run(self):
+        while True:
+            ids = list(self.incidents.order_by('pk').values_list('pk', flat=True)[:self.batch_size])
+            if not ids:
+                break
+            self.archived += self.archive_batch(ids)
+            if self.progress:
+                self.progress(self)
+        return self.archived
+
+    @transaction.atomic
+    def archive_batch(self, ids):
+        # checked again, as a reviewer might have changed an incident meanwhile
+        return move_to_archive(list(self.incidents.filter(pk__in=ids).select_for_update()))
+
+
+def move_to_archive(incidents, restored=None):
+    """
+    Moves incidents with their comments into the archive tables. restored
+    maps ids to the values of archived and publishable_incident of restored
+    archived incidents (see cirs.backup), which get their ids this way.
+    """
+    restored = restored or {}
+    ids = [incident.pk for incident in incidents]
+    publishables = {
+        publishable.critical_incident_id: publishable
+        for publishable in PublishableIncident.objects.filter(
+            critical_incident_id__in=ids).prefetch_related('translations')}
+    ArchivedIncident.objects.bulk_create([
+        ArchivedIncident(id=incident.pk, **restored.get(incident.pk, {
+            'publishable_incident': dump_publishable(publishables.get(incident.pk))}),
+            **{attname: getattr(incident, attname) for attname in INCIDENT_ATTNAMES})
+        for incident in incidents])
+    comments = Comment.objects.filter(critical_incident_id__in=ids)
+    ArchivedComment.objects.bulk_create([
+        ArchivedComment(archived_incident_id=critical_incident_id,
+                        **dict(zip(COMMENT_ATTNAMES, values)))
+        for critical_incident_id, *values in comments.values_list(
+            'critical_incident_id', *COMMENT_ATTNAMES)])
+    comments.delete()
+    PublishableIncident.objects.filter(critical_incident_id__in=ids).delete()
+    CriticalIncident.objects.filter(pk__in=ids).delete()
+    return len(ids)
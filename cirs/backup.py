@@ -0,0 +1,410 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+"""
+Export of all data of one department into a single archive and restore into
+another LabCIRS instance.
+
+The archive is a gzip compressed tar file with the members
+
+* ``manifest.json`` - format version and number of records
+* ``media/<path>`` - photos of the incidents
+* ``records.jsonl`` - one JSON object per line: users, department,
+  configuration, incidents, comments, publishable incidents, archived
+  incidents and archived comments
+
+Records are read from the database with iterators and written to a temporary
+file first, so the memory consumption does not depend on the size of the
+department. Photos come before the records, because restoring them may
+change their names. Exported users contain the password hash, so the
+archive has to be protected like a database dump.
+
+Existing users with the username of an exported one are only reused if
+their email address matches or reuse_users is set, otherwise the archive
+could grant reviewer rights to somebody else.
+"""
+
+import io
+import json
+import tarfile
+import tempfile
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils.encoding import is_protected_type
+
+import cirs
+
+from .changelog import record_bulk_changes
+from .counters import reconcile_departments, reconcile_incidents
+from .models import (ArchivedComment, ArchivedIncident, Comment, CriticalIncident,
+                     Department, LabCIRSConfig, PublishableIncident, Reporter, Reviewer,
+                     generate_comment_codes, get_used_comment_codes)
+from .translations import forget_cached_translations
+
+FORMAT_VERSION = 1
+CHUNK_SIZE = 500
+USER_FIELDS = ('username', 'first_name', 'last_name', 'email', 'is_active', 'password')
+
+
+class BackupError(Exception):
+    pass
+
+
+def dump_fields(obj, exclude=()):
+    """Non relational field values, like Django's python serializer does it."""
+    data = {}
+    for field in obj._meta.concrete_fields:
+        if field.primary_key or field.is_relation or field.name in exclude:
+            continue
+        value = field.value_from_object(obj)
+        data[field.name] = value if is_protected_type(value) else field.value_to_string(obj)
+    return data
+
+
+def load_fields(model, data):
+    return {name: model._meta.get_field(name).to_python(value) for name, value in data.items()}
+
+
+def dump_translations(obj):
+    return [{'language_code': translation.language_code,
+             'fields': dump_fields(translation, exclude=('language_code',))}
+            for translation in obj.translations.all()]
+
+
+def _add_member(archive, name, fileobj, size):
+    info = tarfile.TarInfo(name)
+    info.size = size
+    archive.addfile(info, fileobj)
+
+
+def write_records(department, out):
+    """Writes JSON lines for all objects of department to out and counts them."""
+    counts = Counter()
+
+    def write(model, record):
+        record['model'] = model._meta.label_lower
+        out.write((json.dumps(record, cls=DjangoJSONEncoder) + '\n').encode('utf-8'))
+        counts[record['model']] += 1
+
+    config = department.labcirsconfig
+    incidents = CriticalIncident.objects.filter(department=department).order_by('pk')
+    comments = Comment.objects.filter(
+        critical_incident__department=department).select_related('author').order_by('pk')
+    publishables = PublishableIncident.objects.filter(
+        critical_incident__department=department).prefetch_related('translations').order_by('pk')
+    archived_incidents = ArchivedIncident.objects.filter(department=department).order_by('pk')
+    archived_comments = ArchivedComment.objects.filter(
+        archived_incident__department=department).select_related('author').order_by('pk')
+
+    reviewers = list(department.reviewers.values_list('user__username', flat=True))
+    usernames = set(reviewers) | set(comments.values_list('author__username', flat=True))
+    usernames |= set(archived_comments.values_list('author__username', flat=True))
+    usernames |= set(config.notification_recipients.values_list('username', flat=True))
+    usernames.add(department.reporter.user.username)
+    for user in User.objects.filter(username__in=usernames).select_related('reviewer'):
+        role = None
+        if user.username == department.reporter.user.username:
+            role = 'reporter'
+        elif hasattr(user, 'reviewer'):
+            role = 'reviewer'
+        write(User, {'fields': {field: getattr(user, field) for field in USER_FIELDS},
+                     'role': role})
+
+    write(Department, {'pk': department.pk, 'fields': dump_fields(department),
+                       'reporter': department.reporter.user.username, 'reviewers': reviewers})
+    write(LabCIRSConfig, {
+        'fields': dump_fields(config), 'translations': dump_translations(config),
+        'notification_recipients': list(
+            config.notification_recipients.values_list('username', flat=True))})
+    for incident in incidents.iterator(chunk_size=CHUNK_SIZE):
+        write(CriticalIncident, {'pk': incident.pk, 'fields': dump_fields(incident)})
+    for comment in comments.iterator(chunk_size=CHUNK_SIZE):
+        write(Comment, {'pk': comment.pk, 'critical_incident': comment.critical_incident_id,
+                        'author': comment.author.username, 'fields': dump_fields(comment)})
+    for publishable in publishables.iterator(chunk_size=CHUNK_SIZE):
+        write(PublishableIncident, {
+            'pk': publishable.pk, 'critical_incident': publishable.critical_incident_id,
+            'fields': dump_fields(publishable), 'translations': dump_translations(publishable)})
+    for incident in archived_incidents.iterator(chunk_size=CHUNK_SIZE):
+        write(ArchivedIncident, {'pk': incident.pk, 'fields': dump_fields(incident)})
+    for comment in archived_comments.iterator(chunk_size=CHUNK_SIZE):
+        write(ArchivedComment, {'pk': comment.pk, 'archived_incident': comment.archived_incident_id,
+                                'author': comment.author.username, 'fields': dump_fields(comment)})
+    return counts
+
+
+def export_department(department, fileobj):
+    """Writes the archive for department to the binary file object fileobj."""
+    with tempfile.TemporaryFile() as records:
+        counts = write_records(department, records)
+        manifest = json.dumps({
+            'format': FORMAT_VERSION, 'labcirs': cirs.__version__,
+            'department': department.label, 'counts': counts}).encode('utf-8')
+        photos = [model.objects.filter(department=department).exclude(photo='').exclude(
+            photo=None).values_list('photo', flat=True)
+            for model in (CriticalIncident, ArchivedIncident)]
+        with tarfile.open(fileobj=fileobj, mode='w|gz') as archive:
+            _add_member(archive, 'manifest.json', io.BytesIO(manifest), len(manifest))
+            for name in (name for queryset in photos for name in queryset.iterator()):
+                if default_storage.exists(name):
+                    with default_storage.open(name) as photo:
+                        _add_member(archive, 'media/' + name, photo, default_storage.size(name))
+            size = records.tell()
+            records.seek(0)
+            _add_member(archive, 'records.jsonl', records, size)
+    return counts
+
+
+class DepartmentRestorer(object):
+    """
+    Restores the records of an archive in a new department. All objects get
+    new primary keys, references between them are remapped.
+
+    Archived incidents keep the ids of critical incidents. So they and their
+    comments are restored as critical incidents and comments first and moved
+    into the archive at the end, like the archiver does it.
+    """
+
+    def __init__(self, label=None, name=None, reuse_users=False):
+        self.label = label
+        self.name = name
+        self.reuse_users = reuse_users
+        self.department = None
+        self.users = {}
+        self.conflicts = []
+        self.photo_names = {}
+        self.incident_ids = {}
+        self.archived_incident_ids = {}
+        # new id: archive fields of restored archived incidents
+        self.archived = {}
+        self.renewed_codes = 0
+        self.restored_comments = False
+        self.buffer = []
+        self.buffered_model = None
+
+    def restore_photo(self, name, fileobj):
+        self.photo_names[name] = default_storage.save(name, fileobj)
+
+    def delete_photos(self):
+        # files are not removed by the rollback of a failed restore
+        for name in self.photo_names.values():
+            default_storage.delete(name)
+
+    def restore(self, fileobj):
+        with tarfile.open(fileobj=fileobj, mode='r|gz') as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                if member.name == 'manifest.json':
+                    manifest = json.load(archive.extractfile(member))
+                    if manifest['format'] != FORMAT_VERSION:
+                        raise BackupError(
+                            'Unsupported archive format {}'.format(manifest['format']))
+                elif member.name.startswith('media/'):
+                    self.restore_photo(member.name[len('media/'):], archive.extractfile(member))
+                elif member.name == 'records.jsonl':
+                    for line in archive.extractfile(member):
+                        self.add(json.loads(line.decode('utf-8')))
+        self.finish()
+
+    def add(self, record):
+        model = record['model']
+        if model != self.buffered_model or len(self.buffer) >= CHUNK_SIZE:
+            self.flush()
+        if model == 'auth.user':
+            self.restore_user(record)
+        elif model == 'cirs.department':
+            self.restore_department(record)
+        elif model == 'cirs.labcirsconfig':
+            self.restore_config(record)
+        else:
+            self.buffered_model = model
+            self.buffer.append(record)
+
+    def flush(self):
+        restore = {'cirs.criticalincident': self.restore_incidents,
+                   'cirs.comment': self.restore_comments,
+                   'cirs.publishableincident': self.restore_publishables,
+                   'cirs.archivedincident': self.restore_archived_incidents,
+                   'cirs.archivedcomment': self.restore_archived_comments}
+        if self.buffer:
+            restore[self.buffered_model](self.buffer)
+        self.buffer = []
+        self.buffered_model = None
+
+    def finish(self):
+        self.flush()
+        if self.department is None:
+            raise BackupError('The archive contains no department')
+        if self.restored_comments:
+            # all comments of the new department are new, so their primary
+            # keys need not be returned by the bulk inserts
+            record_bulk_changes(
+                Comment.objects.filter(critical_incident__department=self.department),
+                [field.name for field in Comment._meta.concrete_fields], 'created')
+        # the counters of the archive are not valid for the restored rows
+        reconcile_incidents(CriticalIncident.objects.filter(department=self.department))
+        reconcile_departments(Department.objects.filter(pk=self.department.pk))
+        if self.archived:
+            # imported here, cirs.archive uses this module
+            from .archive import move_to_archive
+            move_to_archive(list(CriticalIncident.objects.filter(pk__in=self.archived)),
+                            restored=self.archived)
+
+    def restore_user(self, record):
+        fields = record['fields']
+        user = User.objects.filter(username=fields['username']).select_related(
+            'reporter', 'reviewer').first()
+        if user is None:
+            user = User.objects.create(**fields)
+        elif record['role'] == 'reporter':
+            raise BackupError('Reporter user {} already exists'.format(user.username))
+        elif not (self.reuse_users or (
+                user.email and user.email.lower() == fields['email'].lower())):
+            self.conflicts.append(user.username)
+            return
+        if record['role'] == 'reviewer' and not hasattr(user, 'reviewer'):
+            if user.is_superuser or hasattr(user, 'reporter'):
+                raise BackupError('User {} cannot become reviewer'.format(user.username))
+            Reviewer.objects.create(user=user)
+        self.users[user.username] = user
+
+    def restore_department(self, record):
+        # all users come before the department
+        if self.conflicts:
+            raise BackupError(
+                'Users {} already exist with other email addresses, use reuse_users to '
+                'take them over'.format(', '.join(sorted(self.conflicts))))
+        fields = load_fields(Department, record['fields'])
+        fields['label'] = self.label or fields['label']
+        fields['name'] = self.name or fields['name']
+        if Department.objects.filter(label=fields['label']).exists():
+            raise BackupError('Department with label {} already exists'.format(fields['label']))
+        if Department.objects.filter(name=fields['name']).exists():
+            raise BackupError('Department with name {} already exists'.format(fields['name']))
+        reporter = Reporter.objects.create(user=self.users[record['reporter']])
+        self.department = Department.objects.create(reporter=reporter, **fields)
+        self.department.reviewers.set(
+            Reviewer.objects.filter(user__username__in=record['reviewers']))
+
+    def restore_config(self, record):
+        config = self.department.labcirsconfig
+        for name, value in load_fields(LabCIRSConfig, record['fields']).items():
+            setattr(config, name, value)
+        config.save()
+        self.restore_translations(LabCIRSConfig, [(config.pk, record['translations'])])
+        config.notification_recipients.set(
+            [self.users[username] for username in record['notification_recipients']])
+
+    def restore_translations(self, model, translations):
+        translation_model = model._parler_meta.root_model
+        created = translation_model.objects.bulk_create([
+            translation_model(master_id=master_id, language_code=data['language_code'],
+                              **load_fields(translation_model, data['fields']))
+            for master_id, master_translations in translations
+            for data in master_translations])
+        forget_cached_translations(created)
+
+    def create_incidents(self, records, exclude=()):
+        """Saves the records as critical incidents and returns them."""
+        incidents = []
+        for record in records:
+            fields = {name: value for name, value in record['fields'].items()
+                      if name not in exclude}
+            incident = CriticalIncident(department=self.department,
+                                        **load_fields(CriticalIncident, fields))
+            incident.photo = self.photo_names.get(incident.photo.name, incident.photo.name)
+            incidents.append(incident)
+        # codes have to be unique in the whole installation
+        used = get_used_comment_codes([incident.comment_code for incident in incidents])
+        clashing = [incident for incident in incidents
+                    if incident.comment_code in used or not incident.comment_code]
+        for incident, code in zip(clashing, generate_comment_codes(len(clashing))):
+            incident.comment_code = code
+        self.renewed_codes += len(clashing)
+        CriticalIncident.objects.bulk_create(incidents)
+        if not connection.features.can_return_rows_from_bulk_insert:
+            pks = dict(CriticalIncident.objects.filter(
+                comment_code__in=[incident.comment_code for incident in incidents]
+            ).values_list('comment_code', 'pk'))
+            for incident in incidents:
+                incident.pk = pks[incident.comment_code]
+        record_bulk_changes(
+            CriticalIncident.objects.filter(pk__in=[incident.pk for incident in incidents]),
+            [field.name for field in CriticalIncident._meta.concrete_fields], 'created')
+        return incidents
+
+    def restore_incidents(self, records):
+        for record, incident in zip(records, self.create_incidents(records)):
+            self.incident_ids[record['pk']] = incident.pk
+
+    def restore_archived_incidents(self, records):
+        archive_fields = ('archived', 'publishable_incident')
+        for record, incident in zip(records, self.create_incidents(records, archive_fields)):
+            self.archived_incident_ids[record['pk']] = incident.pk
+            self.archived[incident.pk] = load_fields(ArchivedIncident, {
+                name: record['fields'][name] for name in archive_fields})
+
+    def restore_comments(self, records, incident_ids=None):
+        incident_ids = self.incident_ids if incident_ids is None else incident_ids
+        comments = [Comment(critical_incident_id=incident_ids[record['critical_incident']],
+                            author=self.users[record['author']],
+                            **load_fields(Comment, record['fields']))
+                    for record in records]
+        Comment.objects.bulk_create(comments)
+        self.restored_comments = True
+
+    def restore_archived_comments(self, records):
+        self.restore_comments([dict(record, critical_incident=record['archived_incident'])
+                               for record in records], self.archived_incident_ids)
+
+    def restore_publishables(self, records):
+        incident_ids = [self.incident_ids[record['critical_incident']] for record in records]
+        PublishableIncident.objects.bulk_create([
+            PublishableIncident(critical_incident_id=incident_id,
+                                **load_fields(PublishableIncident, record['fields']))
+            for record, incident_id in zip(records, incident_ids)])
+        # the incident is a natural key of publishable incidents
+        pks = dict(PublishableIncident.objects.filter(
+            critical_incident_id__in=incident_ids).values_list('critical_incident_id', 'pk'))
+        self.restore_translations(PublishableIncident, [
+            (pks[incident_id], record['translations'])
+            for record, incident_id in zip(records, incident_ids)])
+        record_bulk_changes(
+            PublishableIncident.objects.filter(pk__in=pks.values()),
+            [field.name for field in PublishableIncident._meta.concrete_fields], 'created')
+
+
+def import_department(fileobj, label=None, name=None, reuse_users=False):
+    """
+    Restores an archive written by export_department from the binary file
+    object fileobj. Returns the restorer with the new department.
+    """
+    restorer = DepartmentRestorer(label, name, reuse_users)
+    try:
+        with transaction.atomic():
+            restorer.restore(fileobj)
+    except Exception:
+        restorer.delete_photos()
+        raise
+    return restorer
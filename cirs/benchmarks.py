@@ -0,0 +1,377 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+"""
+Benchmarks of typical requests with concurrent clients, run by
+``manage.py benchmark``.
+
+Every run uses a temporary database, created like a test database from the
+configured default database. A variant changes the database settings of a
+run, e.g. the SQLite engine, so that configurations can be compared with the
+same scenario.
+
+With the ASGI handler, every client is an asyncio task sending requests with
+an AsyncClient instead of a thread, e.g. to compare 500 concurrent clients
+of both handlers with --threads 500.
+"""
+
+import asyncio
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import DatabaseError, close_old_connections, connection, connections
+from django.test import AsyncClient, Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from .models import (STATUS_CHOICES, APIToken, CriticalIncident, Department,
+                     PublishableIncident, Reporter, Reviewer)
+
+# changes of the default database settings
+VARIANTS = {
+    'configured': {},
+    'sqlite': {'ENGINE': 'django.db.backends.sqlite3', 'OPTIONS': {}},
+    'sqlite-production': {'ENGINE': 'labcirs.backends.sqlite3', 'OPTIONS': {'timeout': 20}},
+    'persistent': {'CONN_MAX_AGE': 600, 'CONN_HEALTH_CHECKS': True},
+    'non-persistent': {'CONN_MAX_AGE': 0},
+}
+
+HANDLERS = ('wsgi', 'asgi')
+
+SCENARIOS = {}
+
+
+def scenario(cls):
+    SCENARIOS[cls.name] = cls
+    return cls
+
+
+class Result(object):
+
+    def __init__(self, scenario, variant, threads, seconds, latencies, errors, handler='wsgi'):
+        self.scenario = scenario
+        self.variant = variant
+        self.handler = handler
+        self.threads = threads
+        self.seconds = seconds
+        self.latencies = sorted(latencies)
+        self.errors = errors
+
+    @property
+    def operations(self):
+        return len(self.latencies)
+
+    @property
+    def throughput(self):
+        return self.operations / self.seconds if self.seconds else 0
+
+    def percentile(self, percent):
+        """Latency in milliseconds."""
+        if not self.latencies:
+            return 0
+        index = min(len(self.latencies) * percent // 100, len(self.latencies) - 1)
+        return self.latencies[index] * 1000
+
+
+class Scenario(object):
+    """
+    An operation repeated by every thread. setup() creates the data in the
+    benchmark database, get_client() the client of one thread. Scenarios
+    implementing arun_once can be run with the ASGI handler.
+    """
+    name = None
+
+    def setup(self):
+        self.reporter = Reporter.objects.create(user=create_user('benchmark_reporter'))
+        self.department = Department.objects.create(
+            label='benchmark', name='Benchmark', reporter=self.reporter, active=True)
+        self.reviewer = Reviewer.objects.create(user=create_user('benchmark_reviewer'))
+        self.department.reviewers.add(self.reviewer)
+
+    def get_client(self, client_class=Client):
+        return client_class()
+
+    def run_once(self, client):
+        raise NotImplementedError
+
+    async def arun_once(self, client):
+        raise NotImplementedError
+
+    @classmethod
+    def supports_asgi(cls):
+        return cls.arun_once is not Scenario.arun_once
+
+    def check_response(self, response, status_code=302):
+        if response.status_code != status_code:
+            raise AssertionError('Unexpected status code {}'.format(response.status_code))
+
+
+def create_user(username):
+    return User.objects.create_user(username, '{}@localhost'.format(username), username)
+
+
+@scenario
+class IncidentCreation(Scenario):
+    """Reporters submit new incidents."""
+    name = 'create-incident'
+
+    def get_client(self, client_class=Client):
+        client = client_class()
+        client.force_login(self.reporter.user)
+        return client
+
+    def run_once(self, client):
+        response = client.post(
+            reverse('create_incident', kwargs={'dept': self.department.label}),
+            {'date': date.today().isoformat(), 'incident': 'Benchmark incident',
+             'reason': 'Benchmark', 'immediate_action': 'None',
+             'preventability': 'indistinct', 'public': True})
+        self.check_response(response)
+
+
+@scenario
+class CommentPosting(Scenario):
+    """Reviewers comment on an incident."""
+    name = 'post-comment'
+
+    def setup(self):
+        super(CommentPosting, self).setup()
+        self.incident = CriticalIncident.objects.create(
+            department=self.department, date=date.today(), incident='Benchmark incident',
+            reason='Benchmark', immediate_action='None', preventability='indistinct',
+            public=True)
+
+    def get_client(self, client_class=Client):
+        client = client_class()
+        client.force_login(self.reviewer.user)
+        return client
+
+    def run_once(self, client):
+        response = client.post(
+            reverse('incident_detail', kwargs={'dept': self.department.label,
+                                               'pk': self.incident.pk}),
+            {'text': 'Benchmark comment'})
+        self.check_response(response)
+
+
+@scenario
+class PublishableIncidentListing(Scenario):
+    """Reporters read the list of published incidents."""
+    name = 'list-incidents'
+
+    def setup(self):
+        super(PublishableIncidentListing, self).setup()
+        for number in range(20):
+            incident = CriticalIncident.objects.create(
+                department=self.department, date=date.today(), public=True,
+                incident='Benchmark incident', reason='Benchmark', immediate_action='None',
+                preventability='indistinct')
+            publishable = PublishableIncident(critical_incident=incident, publish=True)
+            publishable.set_current_language(settings.PARLER_DEFAULT_LANGUAGE_CODE)
+            publishable.incident = 'Published incident {}'.format(number)
+            publishable.description = 'Description'
+            publishable.measures_and_consequences = 'Measures'
+            publishable.save()
+
+    def get_client(self, client_class=Client):
+        client = client_class()
+        client.force_login(self.reporter.user)
+        return client
+
+    def get_url(self):
+        return reverse('incidents_for_department', kwargs={'dept': self.department.label})
+
+    def get_headers(self):
+        return {}
+
+    def run_once(self, client):
+        self.check_response(client.get(self.get_url(), headers=self.get_headers()), 200)
+
+    async def arun_once(self, client):
+        self.check_response(
+            await client.get(self.get_url(), headers=self.get_headers()), 200)
+
+
+@scenario
+class APIIncidentListing(PublishableIncidentListing):
+    """Other systems read published incidents from the JSON API."""
+    name = 'api-incidents'
+
+    def setup(self):
+        super(APIIncidentListing, self).setup()
+        self.token = APIToken.objects.create(name='Benchmark', department=self.department)
+
+    def get_client(self, client_class=Client):
+        return client_class()
+
+    def get_headers(self):
+        return {'authorization': 'Token {}'.format(self.token.key)}
+
+    def get_url(self):
+        return reverse('api_incidents', kwargs={'dept': self.department.label})
+
+
+@scenario
+class AdminIncidentListing(Scenario):
+    """Reviewers filter the admin list of a large incidents table."""
+    name = 'admin-incidents'
+    rows = 100000
+    batch_size = 5000
+
+    def setup(self):
+        super(AdminIncidentListing, self).setup()
+        other = Department.objects.create(
+            label='benchmark_other', name='Benchmark other', active=True,
+            reporter=Reporter.objects.create(user=create_user('benchmark_other')))
+        statuses = [status for status, _ in STATUS_CHOICES]
+        text = 'Long description of the benchmark incident. ' * 40
+        for start in range(0, self.rows, self.batch_size):
+            CriticalIncident.objects.bulk_create([
+                CriticalIncident(
+                    department=self.department if number % 2 else other,
+                    date=date.today(), reported=date.today() - timedelta(days=number % 1000),
+                    incident=text, reason=text, immediate_action=text, action=text,
+                    preventability='indistinct', public=True,
+                    status=statuses[number % len(statuses)],
+                    comment_code='bm{}'.format(number))
+                for number in range(start, min(start + self.batch_size, self.rows))])
+        self.url = '{}?has_publishable_incident=0&status__exact=in+process'.format(
+            reverse('admin:cirs_criticalincident_changelist'))
+
+    def get_client(self, client_class=Client):
+        client = client_class()
+        client.force_login(self.reviewer.user)
+        return client
+
+    def run_once(self, client):
+        self.check_response(client.get(self.url), 200)
+
+
+@contextmanager
+def benchmark_database(**overrides):
+    """
+    Replaces the default database by a new, migrated database with changed
+    settings, like the test runner does. SQLite uses a temporary file, as an
+    in-memory database does not show the locking behaviour.
+    """
+    settings_dict = connections.settings['default']
+    saved = dict(settings_dict, TEST=dict(settings_dict['TEST']))
+    directory = tempfile.mkdtemp()
+    settings_dict.update(overrides)
+    settings_dict['TEST'] = dict(settings_dict['TEST'])
+    if 'sqlite3' in settings_dict['ENGINE']:
+        settings_dict['TEST']['NAME'] = '{}/benchmark.sqlite3'.format(directory)
+    connections['default'].close()
+    del connections['default']
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        del connections['default']
+        settings_dict.clear()
+        settings_dict.update(saved)
+        shutil.rmtree(directory)
+
+
+def run_scenario(scenario, threads=4, duration=5.0, variant='configured'):
+    """Repeats the operation of scenario in parallel threads for duration seconds."""
+    scenario.setup()
+    clients = [scenario.get_client() for _ in range(threads)]
+    deadline = time.monotonic() + duration
+
+    def work(client):
+        latencies = []
+        errors = 0
+        try:
+            while time.monotonic() < deadline:
+                # the test client does not close connections like a server
+                close_old_connections()
+                start = time.perf_counter()
+                try:
+                    scenario.run_once(client)
+                except (DatabaseError, AssertionError):
+                    errors += 1
+                else:
+                    latencies.append(time.perf_counter() - start)
+                close_old_connections()
+        finally:
+            connection.close()
+        return latencies, errors
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        outcomes = list(executor.map(work, clients))
+    seconds = time.monotonic() - start
+    return Result(scenario.name, variant, threads, seconds,
+                  [latency for latencies, _ in outcomes for latency in latencies],
+                  sum(errors for _, errors in outcomes))
+
+
+def run_scenario_async(scenario, tasks=4, duration=5.0, variant='configured'):
+    """Repeats the operation of scenario in concurrent tasks using the ASGI handler."""
+    scenario.setup()
+    clients = [scenario.get_client(AsyncClient) for _ in range(tasks)]
+    deadline = time.monotonic() + duration
+
+    async def work(client):
+        latencies = []
+        errors = 0
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                await scenario.arun_once(client)
+            except (DatabaseError, AssertionError):
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+        return latencies, errors
+
+    async def work_all():
+        try:
+            return await asyncio.gather(*[work(client) for client in clients])
+        finally:
+            # closes the connection of the thread running the synchronous code
+            await sync_to_async(connections.close_all)()
+
+    start = time.monotonic()
+    outcomes = asyncio.run(work_all())
+    seconds = time.monotonic() - start
+    connection.close()
+    return Result(scenario.name, variant, tasks, seconds,
+                  [latency for latencies, _ in outcomes for latency in latencies],
+                  sum(errors for _, errors in outcomes), handler='asgi')
+
+
+def run_benchmark(name, variant='configured', threads=4, duration=5.0, handler='wsgi'):
+    run = run_scenario_async if handler == 'asgi' else run_scenario
+    # allows the test client's host and keeps notification emails in memory
+    setup_test_environment()
+    try:
+        with benchmark_database(**VARIANTS[variant]):
+            return run(SCENARIOS[name](), threads, duration, variant)
+    finally:
+        teardown_test_environment()
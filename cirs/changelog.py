@@ -0,0 +1,163 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Receivers which fill the change log (ChangeLogEntry) for external systems.
+
+Set based operations (QuerySet.update, bulk_create) do not send signals, so
+code using them has to call record_bulk_changes itself.
+
+Sequence numbers are assigned when an entry is inserted, not when its
+transaction commits. A consumer may therefore see a number before a lower one
+of a transaction which was still running. get_settled_sequence returns a
+cursor which does not pass entries younger than CHANGELOG_SETTLE_SECONDS, so
+entries after it are read again, and consumers ignore known sequence numbers.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.utils import timezone
+
+from .models import (ChangeLogEntry, Comment, CriticalIncident, Department,
+                     PublishableIncident, PublishableIncidentTranslation)
+
+# lookup from the tracked model to the id of its department
+DEPARTMENT_LOOKUPS = {
+    CriticalIncident: 'department_id',
+    PublishableIncident: 'critical_incident__department_id',
+    Comment: 'critical_incident__department_id',
+    Department: 'pk',
+}
+
+
+def get_settle_seconds():
+    return getattr(settings, 'CHANGELOG_SETTLE_SECONDS', 60)
+
+
+def get_settled_sequence(entries, since, now=None):
+    """
+    Returns the sequence number of the last entry in entries (ordered by id)
+    before the first one which may still be preceded by uncommitted entries.
+    """
+    settled_before = (now or timezone.now()) - timedelta(seconds=get_settle_seconds())
+    for entry in entries:
+        if entry.timestamp > settled_before:
+            break
+        since = entry.id
+    return since
+
+
+def get_department_pk(instance):
+    value = instance
+    for attr in DEPARTMENT_LOOKUPS[type(instance)].split('__'):
+        value = getattr(value, attr)
+    return value
+
+
+def record_change(instance, action, changed_fields):
+    return ChangeLogEntry.objects.create(
+        model=instance._meta.label_lower, object_pk=instance.pk, action=action,
+        changed_fields=changed_fields, department_pk=get_department_pk(instance))
+
+
+def record_bulk_changes(queryset, changed_fields, action='changed'):
+    """Writes one entry per object in queryset with a single insert."""
+    model = queryset.model
+    entries = [
+        ChangeLogEntry(model=model._meta.label_lower, object_pk=pk, action=action,
+                       changed_fields=list(changed_fields), department_pk=department_pk)
+        for pk, department_pk in queryset.values_list(
+            'pk', DEPARTMENT_LOOKUPS[model]).iterator()
+    ]
+    ChangeLogEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+def take_snapshot(sender, instance, raw=False, **kwargs):
+    instance._changelog_snapshot = None
+    if not raw and instance.pk is not None:
+        attnames = [field.attname for field in sender._meta.concrete_fields]
+        instance._changelog_snapshot = sender._default_manager.filter(
+            pk=instance.pk).values(*attnames).first()
+
+
+def get_changed_fields(instance, created, update_fields):
+    fields = instance._meta.concrete_fields
+    snapshot = getattr(instance, '_changelog_snapshot', None)
+    if created or snapshot is None:
+        changed = [field.name for field in fields]
+    else:
+        # compare database representations, e.g. FieldFile and its name;
+        # timestamps set on every save are no change by themselves
+        changed = [field.name for field in fields
+                   if not getattr(field, 'auto_now', False)
+                   and field.get_prep_value(snapshot[field.attname])
+                   != field.get_prep_value(getattr(instance, field.attname))]
+    if update_fields:
+        changed = [name for name in changed if name in update_fields]
+    return changed
+
+
+def record_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    changed_fields = get_changed_fields(instance, created, update_fields)
+    if changed_fields:
+        record_change(instance, 'created' if created else 'changed', changed_fields)
+
+
+def record_delete(sender, instance, **kwargs):
+    record_change(instance, 'deleted', [])
+
+
+def record_translation_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Translations are reported as changes of their publishable incident."""
+    if raw:
+        return
+    changed_fields = [
+        '{}:{}'.format(name, instance.language_code)
+        for name in get_changed_fields(instance, created, update_fields)
+        if name in instance.get_translated_fields()]
+    if changed_fields:
+        record_change(instance.master, 'changed', changed_fields)
+
+
+def record_reviewers_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # reviewer.departments was changed
+        departments = Department.objects.filter(pk__in=pk_set or [])
+    else:
+        departments = [instance]
+    for department in departments:
+        record_change(department, 'changed', ['reviewers'])
+
+
+for model in DEPARTMENT_LOOKUPS:
+    pre_save.connect(take_snapshot, sender=model, dispatch_uid='changelog_snapshot')
+    post_save.connect(record_save, sender=model, dispatch_uid='changelog_save')
+    post_delete.connect(record_delete, sender=model, dispatch_uid='changelog_delete')
+
+pre_save.connect(take_snapshot, sender=PublishableIncidentTranslation,
+                 dispatch_uid='changelog_snapshot')
+post_save.connect(record_translation_save, sender=PublishableIncidentTranslation,
+                  dispatch_uid='changelog_translation_save')
+m2m_changed.connect(record_reviewers_change, sender=Department.reviewers.through,
+                    dispatch_uid='changelog_reviewers')
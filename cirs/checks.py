@@ -0,0 +1,245 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+"""
+Checks for configurations which slow LabCIRS down in production.
+
+The checks of the settings are registered with the tag "performance" for
+deployments (manage.py check --deploy). manage.py perfcheck runs them
+together with inspections of the database, the media directory and
+optionally the mail server, which are too slow for every management
+command, and prints the findings ordered by their level.
+"""
+
+import os
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core import checks, mail
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connections
+
+from .models import CriticalIncident, Department, LabCIRSConfig
+
+SQLITE_MAX_DEPARTMENTS = 20
+SQLITE_MAX_INCIDENTS = 50000
+MEDIA_WARNING_BYTES = 2 * 1024 ** 3
+SMTP_WARNING_SECONDS = 1.0
+
+
+def format_size(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            break
+        size /= 1024.0
+    return '{:.1f} {}'.format(size, unit)
+
+
+def is_sqlite(database):
+    return 'sqlite3' in database['ENGINE']
+
+
+@checks.register('performance', deploy=True)
+def check_debug(app_configs=None, **kwargs):
+    if settings.DEBUG:
+        return [checks.Warning(
+            'DEBUG is True, every SQL query is kept in memory and errors render slow '
+            'debug pages.',
+            hint='Use labcirs.settings.production or set DEBUG = False.', id='cirs.W001')]
+    return []
+
+
+@checks.register('performance', deploy=True)
+def check_sessions(app_configs=None, **kwargs):
+    if (settings.SESSION_SAVE_EVERY_REQUEST
+            and settings.SESSION_ENGINE == 'django.contrib.sessions.backends.db'):
+        return [checks.Warning(
+            'Sessions are written to the database with every request '
+            '(SESSION_SAVE_EVERY_REQUEST).',
+            hint='Use SESSION_ENGINE = "django.contrib.sessions.backends.cached_db" '
+                 'with a shared CACHE.', id='cirs.W002')]
+    return []
+
+
+@checks.register('performance', deploy=True)
+def check_connections(app_configs=None, **kwargs):
+    return [checks.Warning(
+        'Database "{}" opens a new connection for every request.'.format(alias),
+        hint='Set DB_CONN_MAX_AGE, e.g. to 60, or use a connection pooler.', id='cirs.W003')
+        for alias, database in settings.DATABASES.items()
+        # the target of migrate_database is not used by requests
+        if alias != 'target' and not is_sqlite(database)
+        and database.get('CONN_MAX_AGE', 0) == 0]
+
+
+@checks.register('performance', deploy=True)
+def check_cache(app_configs=None, **kwargs):
+    if isinstance(caches['default'], LocMemCache):
+        return [checks.Warning(
+            'The local memory cache is not shared by the processes of the web server, '
+            'so throttling and cached work queues work per process.',
+            hint='Configure a shared CACHE, e.g. Redis or Memcached, if the web server '
+                 'runs more than one process.', id='cirs.W004')]
+    return []
+
+
+@checks.register('performance', deploy=True)
+def check_sqlite_profile(app_configs=None, **kwargs):
+    if settings.DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+        return [checks.Warning(
+            'SQLite runs without the production profile and fails with "database is '
+            'locked" under concurrent writes.',
+            hint='Set SQLITE_PRODUCTION_PROFILE to true.', id='cirs.W005')]
+    return []
+
+
+def check_sqlite_size(using='default'):
+    connection = connections[using]
+    tables = connection.introspection.table_names()
+    if (not is_sqlite(connection.settings_dict)
+            or CriticalIncident._meta.db_table not in tables):
+        # missing tables are reported by check_indexes
+        return []
+    departments = Department.objects.using(using).count()
+    incidents = CriticalIncident.objects.using(using).count()
+    if departments > SQLITE_MAX_DEPARTMENTS or incidents > SQLITE_MAX_INCIDENTS:
+        return [checks.Warning(
+            'SQLite serves {} departments with {} incidents and allows only one writer '
+            'at a time.'.format(departments, incidents),
+            hint='Move to PostgreSQL with manage.py migrate_database.', id='cirs.W006')]
+    return []
+
+
+def get_missing_indexes(using='default'):
+    """Returns (table, columns) of indexes defined by the models but missing."""
+    connection = connections[using]
+    missing = []
+    with connection.cursor() as cursor:
+        tables = set(connection.introspection.table_names(cursor))
+        for model in apps.get_app_config('cirs').get_models():
+            table = model._meta.db_table
+            if table not in tables:
+                missing.append((table, ()))
+                continue
+            indexed = [tuple(constraint['columns']) for constraint in
+                       connection.introspection.get_constraints(cursor, table).values()
+                       if constraint['index'] or constraint['unique']
+                       or constraint['primary_key']]
+            expected = [tuple(model._meta.get_field(name.lstrip('-')).column
+                              for name in index.fields)
+                        for index in model._meta.indexes if index.fields]
+            expected += [(field.column,) for field in model._meta.local_fields
+                         if field.db_index or field.unique]
+            for columns in expected:
+                # an index on several columns serves lookups of its first ones
+                if not any(existing[:len(columns)] == columns for existing in indexed):
+                    missing.append((table, columns))
+    return missing
+
+
+def check_indexes(using='default'):
+    return [checks.Warning(
+        'Table {} is missing.'.format(table) if not columns else
+        'Index on {}({}) is missing.'.format(table, ', '.join(columns)),
+        hint='Run manage.py migrate.', id='cirs.W007')
+        for table, columns in get_missing_indexes(using)]
+
+
+def get_database_size(using='default'):
+    """Returns the size in bytes or None if unknown."""
+    connection = connections[using]
+    if is_sqlite(connection.settings_dict):
+        name = str(connection.settings_dict['NAME'])
+        return sum(os.path.getsize(path) for path in (name, name + '-wal')
+                   if os.path.isfile(path)) or None
+    queries = {
+        'postgresql': 'SELECT pg_database_size(current_database())',
+        'mysql': 'SELECT SUM(data_length + index_length) FROM information_schema.tables '
+                 'WHERE table_schema = DATABASE()',
+    }
+    if connection.vendor not in queries:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(queries[connection.vendor])
+        return cursor.fetchone()[0]
+
+
+def check_database_size(using='default'):
+    size = get_database_size(using)
+    if size is None:
+        return []
+    return [checks.Info('The database has {}.'.format(format_size(size)), id='cirs.I008')]
+
+
+def get_directory_size(path):
+    size = 0
+    for directory, _, names in os.walk(path):
+        for name in names:
+            try:
+                size += os.path.getsize(os.path.join(directory, name))
+            except OSError:
+                # removed in the meantime
+                pass
+    return size
+
+
+def check_media(path=None):
+    path = path or settings.MEDIA_ROOT
+    size = get_directory_size(path)
+    if size > MEDIA_WARNING_BYTES:
+        return [checks.Warning(
+            'The media directory has {}, which slows down backups.'.format(format_size(size)),
+            hint='Archive old incidents with manage.py archive_incidents.', id='cirs.W009')]
+    return [checks.Info('The media directory has {}.'.format(format_size(size)),
+                        id='cirs.I009')]
+
+
+def check_smtp():
+    """Measures opening and closing a connection to the mail server."""
+    start = time.perf_counter()
+    try:
+        connection = mail.get_connection(fail_silently=False)
+        connection.open()
+        connection.close()
+    except OSError as error:
+        return [checks.Error('The mail server cannot be reached: {}'.format(error),
+                             hint='Check EMAIL_HOST and EMAIL_PORT.', id='cirs.E010')]
+    seconds = time.perf_counter() - start
+    immediate = LabCIRSConfig.objects.filter(
+        send_notification=True, notification_mode='immediate').count()
+    if seconds > SMTP_WARNING_SECONDS and immediate:
+        return [checks.Warning(
+            'Connecting to the mail server takes {:.1f} s, {} departments send '
+            'notifications immediately within the request.'.format(seconds, immediate),
+            hint='Use hourly or daily notification digests in the configuration.',
+            id='cirs.W010')]
+    return [checks.Info('Connecting to the mail server takes {:.2f} s.'.format(seconds),
+                        id='cirs.I010')]
+
+
+def run_performance_checks(using='default', smtp=False):
+    """Returns all findings, the most severe first."""
+    messages = checks.run_checks(tags=['performance'], include_deployment_checks=True)
+    messages += check_indexes(using) + check_sqlite_size(using) + check_database_size(using)
+    messages += check_media()
+    if smtp:
+        messages += check_smtp()
+    return sorted(messages, key=lambda message: -message.level)
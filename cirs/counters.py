@@ -0,0 +1,167 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+"""
+Maintains the counter fields of critical incidents and departments, so that
+lists and dashboards need no aggregation queries.
+
+The receivers compare the counted values of a saved or deleted comment,
+incident or publishable incident with the stored ones and apply the
+differences with atomic updates. Set based operations (QuerySet.update,
+bulk_create) do not send signals, so code using them calls the reconcile
+functions, which are also used by ``manage.py reconcile_counters``.
+"""
+
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .models import (OPEN_COMMENT_STATUSES, Comment, CriticalIncident, Department,
+                     PublishableIncident)
+
+
+def comment_counts(incident_pk, department_pk, status):
+    is_open = int(status in OPEN_COMMENT_STATUSES)
+    return [(CriticalIncident, incident_pk, 'comment_count', 1),
+            (CriticalIncident, incident_pk, 'open_comment_count', is_open),
+            (Department, department_pk, 'open_comment_count', is_open)]
+
+
+def incident_counts(department_pk, status):
+    return [(Department, department_pk, 'new_incident_count', int(status == 'new'))]
+
+
+def publishable_counts(department_pk, publish):
+    return [(Department, department_pk, 'unpublished_count', int(not publish))]
+
+
+# counted model: (lookups of the counted values, function returning the counts)
+COUNTED_MODELS = {
+    Comment: (('critical_incident_id', 'critical_incident__department_id', 'status'),
+              comment_counts),
+    CriticalIncident: (('department_id', 'status'), incident_counts),
+    PublishableIncident: (('critical_incident__department_id', 'publish'), publishable_counts),
+}
+
+
+def get_values(instance):
+    values = []
+    for lookup in COUNTED_MODELS[type(instance)][0]:
+        value = instance
+        for attr in lookup.split('__'):
+            value = getattr(value, attr)
+        values.append(value)
+    return values
+
+
+def apply_counts(counts, using):
+    """Adds the amounts of (model, pk, field, amount) tuples to the rows."""
+    changes = defaultdict(lambda: defaultdict(int))
+    for model, pk, field, amount in counts:
+        if pk is not None:
+            changes[model, pk][field] += amount
+    for (model, pk), fields in changes.items():
+        fields = {field: F(field) + amount for field, amount in fields.items() if amount}
+        if fields:
+            model._default_manager.using(using).filter(pk=pk).update(**fields)
+
+
+def negate(counts):
+    return [(model, pk, field, -amount) for model, pk, field, amount in counts]
+
+
+def take_snapshot(sender, instance, raw=False, using=None, **kwargs):
+    instance._counters_snapshot = None
+    if not raw and not instance._state.adding:
+        instance._counters_snapshot = sender._default_manager.using(using).filter(
+            pk=instance.pk).values_list(*COUNTED_MODELS[sender][0]).first()
+
+
+def update_counts(sender, instance, raw=False, using=None, **kwargs):
+    if raw:
+        return
+    count = COUNTED_MODELS[sender][1]
+    counts = count(*get_values(instance))
+    snapshot = getattr(instance, '_counters_snapshot', None)
+    if snapshot is not None:
+        counts += negate(count(*snapshot))
+    apply_counts(counts, using)
+
+
+def remove_counts(sender, instance, using=None, **kwargs):
+    apply_counts(negate(COUNTED_MODELS[sender][1](*get_values(instance))), using)
+
+
+def count_of(queryset, lookup, **filters):
+    """Subquery counting the rows of queryset related by lookup to the outer row."""
+    return Coalesce(Subquery(
+        queryset.filter(**{lookup: OuterRef('pk')}, **filters).order_by().values(
+            lookup).annotate(count=Count('pk')).values('count')), 0)
+
+
+def incident_counters():
+    return {
+        'comment_count': count_of(Comment.objects.all(), 'critical_incident'),
+        'open_comment_count': count_of(Comment.objects.all(), 'critical_incident',
+                                       status__in=OPEN_COMMENT_STATUSES),
+    }
+
+
+def department_counters():
+    return {
+        'new_incident_count': count_of(CriticalIncident.objects.all(), 'department',
+                                       status='new'),
+        'open_comment_count': count_of(Comment.objects.all(), 'critical_incident__department',
+                                       status__in=OPEN_COMMENT_STATUSES),
+        'unpublished_count': count_of(PublishableIncident.objects.all(),
+                                      'critical_incident__department', publish=False),
+    }
+
+
+def reconcile(queryset, counters):
+    """Sets wrong counters of queryset to the counted values, returns their number."""
+    stale = queryset.annotate(**{'counted_' + name: expression
+                                 for name, expression in counters.items()}).filter(
+        reduce(or_, [~Q(**{name: F('counted_' + name)}) for name in counters]))
+    pks = list(stale.values_list('pk', flat=True))
+    if pks:
+        queryset.model._default_manager.filter(pk__in=pks).update(**counters)
+    return len(pks)
+
+
+def reconcile_incidents(queryset=None):
+    if queryset is None:
+        queryset = CriticalIncident.objects.all()
+    return reconcile(queryset, incident_counters())
+
+
+def reconcile_departments(queryset=None):
+    if queryset is None:
+        queryset = Department.objects.all()
+    return reconcile(queryset, department_counters())
+
+
+for model in COUNTED_MODELS:
+    pre_save.connect(take_snapshot, sender=model, dispatch_uid='counters_snapshot')
+    post_save.connect(update_counts, sender=model, dispatch_uid='counters_update')
+    post_delete.connect(remove_counts, sender=model, dispatch_uid='counters_remove')
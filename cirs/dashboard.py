@@ -0,0 +1,100 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+"""
+Work queues of reviewers: pending work in each of their departments with
+links into the admin changelists filtered accordingly.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import CharField, Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Concat, Length, Replace
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from .models import PublishableIncident
+
+CACHE_KEY = 'cirs:work_queues:{}'
+
+
+def incomplete_translations(queryset):
+    """
+    Publishable incidents of queryset with mandatory languages of their
+    department lacking a translation of all fields (see translation_status).
+    """
+    translation_model = PublishableIncident._parler_meta.root_model
+    languages = 'critical_incident__department__labcirsconfig__mandatory_languages'
+    complete = translation_model.objects.filter(master=OuterRef('pk'))
+    for field in translation_model.get_translated_fields():
+        complete = complete.exclude(**{field: ''})
+    # mandatory languages are stored comma separated
+    complete = complete.annotate(
+        languages=Concat(Value(','), OuterRef(languages), Value(','),
+                         output_field=CharField())
+    ).filter(languages__contains=Concat(Value(','), 'language_code', Value(','),
+                                        output_field=CharField()))
+    return queryset.annotate(
+        complete_translations=Coalesce(Subquery(
+            complete.order_by().values('master').annotate(
+                count=Count('pk')).values('count')), 0),
+        mandatory_languages_count=Length(languages) - Length(
+            Replace(F(languages), Value(','), Value(''), output_field=CharField())) + 1,
+    ).filter(complete_translations__lt=F('mandatory_languages_count'))
+
+
+def changelist_url(model_name, **params):
+    return '{}?{}'.format(reverse('admin:cirs_{}_changelist'.format(model_name)),
+                          urlencode(params))
+
+
+def get_work_queues(reviewer):
+    """Counts of pending work per department of reviewer, read with one query."""
+    untranslated = incomplete_translations(PublishableIncident.objects.filter(
+        critical_incident__department=OuterRef('pk')))
+    departments = reviewer.departments.annotate(
+        in_process_count=Count('criticalincident',
+                               filter=Q(criticalincident__status='in process')),
+        untranslated_count=Coalesce(Subquery(
+            untranslated.order_by().values('critical_incident__department').annotate(
+                count=Count('pk')).values('count')), 0),
+    ).order_by('label').values('pk', 'label', 'name', 'new_incident_count',
+                               'in_process_count', 'open_comment_count',
+                               'untranslated_count')
+    queues = []
+    for department in departments:
+        pk = department['pk']
+        queues.append(dict(department, urls={
+            'new': changelist_url('criticalincident', department__id__exact=pk,
+                                  status__exact='new'),
+            'in_process': changelist_url('criticalincident', department__id__exact=pk,
+                                         status__exact='in process'),
+            'open_comments': changelist_url('criticalincident', department__id__exact=pk,
+                                            open_comments='1'),
+            'untranslated': changelist_url(
+                'publishableincident', critical_incident__department__id__exact=pk,
+                translation='incomplete'),
+        }))
+    return queues
+
+
+def cached_work_queues(reviewer):
+    """Work queues cached for WORK_QUEUES_CACHE_SECONDS, the counts may lag behind."""
+    return cache.get_or_set(CACHE_KEY.format(reviewer.pk), lambda: get_work_queues(reviewer),
+                            getattr(settings, 'WORK_QUEUES_CACHE_SECONDS', 60))
@@ -0,0 +1,146 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+"""
+Copy of all data from one database to another, e.g. from SQLite to PostgreSQL.
+
+Tables are copied in chunks and in the order of their foreign keys, so that
+the memory consumption does not depend on the size of the database. Primary
+keys are kept, so sequences of the target database are reset afterwards.
+Row counts and checksums of both databases are compared at the end.
+"""
+
+import hashlib
+import json
+
+from django.apps import apps
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, router, transaction
+
+# filled by post_migrate in every migrated database, but with other ids
+REPLACED_MODELS = (ContentType, Permission)
+
+
+def sort_models(models):
+    """Orders models so that every model follows the models it references."""
+    remaining = list(models)
+    ordered = []
+    while remaining:
+        for model in remaining:
+            references = set(field.related_model for field in model._meta.concrete_fields
+                             if field.is_relation and field.related_model is not model)
+            if all(reference in ordered or reference not in models for reference in references):
+                ordered.append(model)
+                remaining.remove(model)
+                break
+        else:
+            raise ValueError('Circular foreign keys between {}'.format(
+                ', '.join(model._meta.label for model in remaining)))
+    return ordered
+
+
+def get_models(source, target):
+    """All tables, including many to many tables, stored in both databases."""
+    return sort_models([
+        model for model in apps.get_models(include_auto_created=True)
+        if model._meta.managed and not model._meta.proxy
+        and router.allow_migrate_model(source, model)
+        and router.allow_migrate_model(target, model)])
+
+
+class DatabaseCopier(object):
+
+    chunk_size = 2000
+
+    def __init__(self, source, target, chunk_size=None, progress=None):
+        self.source = source
+        self.target = target
+        self.chunk_size = chunk_size or self.chunk_size
+        self.progress = progress
+        self.models = get_models(source, target)
+        self.copied = {}
+
+    def rows(self, model, using):
+        # parent tables of multi-table inheritance are copied on their own
+        fields = model._meta.local_concrete_fields
+        return fields, model._base_manager.using(using).order_by('pk').values_list(
+            *[field.attname for field in fields]).iterator(chunk_size=self.chunk_size)
+
+    def get_filled_models(self):
+        return [model for model in self.models if model not in REPLACED_MODELS
+                and model._base_manager.using(self.target).exists()]
+
+    def copy_model(self, model):
+        connection = connections[self.target]
+        fields, rows = self.rows(model, self.source)
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            connection.ops.quote_name(model._meta.db_table),
+            ', '.join(connection.ops.quote_name(field.column) for field in fields),
+            ', '.join(['%s'] * len(fields)))
+        count = 0
+        with connection.cursor() as cursor:
+            batch = []
+            for row in rows:
+                batch.append([field.get_db_prep_save(value, connection)
+                              for field, value in zip(fields, row)])
+                if len(batch) == self.chunk_size:
+                    cursor.executemany(sql, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                cursor.executemany(sql, batch)
+        return count + len(batch)
+
+    def reset_sequences(self):
+        connection = connections[self.target]
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), self.models):
+                cursor.execute(sql)
+
+    def run(self):
+        with transaction.atomic(using=self.source), transaction.atomic(using=self.target):
+            for model in reversed(self.models):
+                if model in REPLACED_MODELS:
+                    model._base_manager.using(self.target).all().delete()
+            for model in self.models:
+                self.copied[model] = self.copy_model(model)
+                if self.progress:
+                    self.progress(model, self.copied[model])
+            self.reset_sequences()
+        return self.copied
+
+    def checksum(self, model, using):
+        digest = hashlib.sha256()
+        count = 0
+        for row in self.rows(model, using)[1]:
+            # binary fields are bytes or memoryview, which JSON does not support
+            row = [bytes(value).hex() if isinstance(value, (bytes, memoryview)) else value
+                   for value in row]
+            digest.update(json.dumps(row, cls=DjangoJSONEncoder, sort_keys=True).encode('utf-8'))
+            digest.update(b'\n')
+            count += 1
+        return count, digest.hexdigest()
+
+    def verify(self):
+        """Returns the models whose rows differ between both databases."""
+        return [model for model in self.models
+                if self.checksum(model, self.source) != self.checksum(model, self.target)]
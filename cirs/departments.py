@@ -0,0 +1,99 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+"""
+Resolution of the department in URLs like /incidents/<dept>/.
+
+The dept path converter matches only valid labels. DepartmentMiddleware
+looks the department up together with its configuration once per request,
+answers with 404 for unknown and inactive departments and stores it as
+request.department for views and templates. Under ASGI the lookup uses the
+asynchronous ORM, so that coroutine views like the API stay on the event
+loop.
+"""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.http import Http404
+from django.urls import register_converter
+
+from .models import Department
+
+
+class DepartmentLabelConverter(object):
+    # characters allowed by the SlugField Department.label
+    regex = '[-a-zA-Z0-9_]+'
+
+    def to_python(self, value):
+        return value
+
+    def to_url(self, value):
+        return getattr(value, 'label', value)
+
+
+register_converter(DepartmentLabelConverter, 'dept')
+
+
+def active_departments(label):
+    return Department.objects.select_related('labcirsconfig').filter(label=label, active=True)
+
+
+def resolve_department(request, label):
+    """Returns request.department and looks it up first if necessary."""
+    if getattr(request, 'department', None) is None:
+        request.department = active_departments(label).first()
+        if request.department is None:
+            raise Http404('Unknown department')
+    return request.department
+
+
+async def aresolve_department(request, label):
+    """Asynchronous version of resolve_department."""
+    if getattr(request, 'department', None) is None:
+        request.department = await active_departments(label).afirst()
+        if request.department is None:
+            raise Http404('Unknown department')
+    return request.department
+
+
+class DepartmentMiddleware(object):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+            # Django awaits a coroutine process_view without a thread
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if 'dept' in view_kwargs:
+            resolve_department(request, view_kwargs['dept'])
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        if 'dept' in view_kwargs:
+            await aresolve_department(request, view_kwargs['dept'])
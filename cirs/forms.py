@@ -21,16 +21,20 @@ from django import forms
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.core import mail
-from django.forms import (CharField, ClearableFileInput, DateInput, Form,
+from django.forms import (BooleanField, CharField, ChoiceField, ClearableFileInput,
+                          DateInput, FileField, Form, ModelChoiceField,
                           ModelForm, RadioSelect, Select, Textarea,
                           ValidationError)
 from django.utils.translation import gettext
 from django.utils.translation import gettext_lazy as _
+from parler.utils import get_language_title
 from registration.forms import (RegistrationFormTermsOfService,
                                 RegistrationFormUniqueEmail,
                                 RegistrationFormUsernameLowercase)
 
 from .models import Comment, CriticalIncident, Department
+from .notifications import queue_notifications
+from .translations import get_target_languages
 
 
 def notify_on_creation(form, department, subject='', excluded_user_id=None):
@@ -38,6 +42,10 @@ def notify_on_creation(form, department, subject='', excluded_user_id=None):
     if config.send_notification:
         # send only if incident was saved
         if form.instance.pk is not None:
+            if config.notification_mode != 'immediate':
+                queue_notifications(department, config.notification_recipients.exclude(
+                    id=excluded_user_id), subject)
+                return
             try:
                 # TODO: add comment notification
                 mail_body = config.notification_text
@@ -89,7 +97,9 @@ class IncidentSearchForm(Form):
     def clean_incident_code(self):
         comment_code = self.cleaned_data.get('incident_code')
         try:
-            CriticalIncident.objects.get(comment_code=comment_code)
+            # kept for the view, which needs the department for the URL
+            self.incident = CriticalIncident.objects.select_related('department').get(
+                comment_code=comment_code)
             return comment_code
         except CriticalIncident.DoesNotExist:
             raise ValidationError(_('No matching critical incident found!'), code='invalid_id')
@@ -109,6 +119,80 @@ class CommentForm(ModelForm):
         return result
 
 
+class IncidentImportForm(Form):
+    department = ModelChoiceField(Department.objects.none(), label=_('Department'))
+    file = FileField(label=_('File'), help_text=_('CSV, JSON or JSON lines file'))
+    dry_run = BooleanField(label=_('Dry run'), required=False, initial=True,
+                           help_text=_('Only validate the file without saving incidents'))
+
+    def __init__(self, *args, **kwargs):
+        departments = kwargs.pop('departments')
+        super(IncidentImportForm, self).__init__(*args, **kwargs)
+        self.fields['department'].queryset = departments
+
+
+class IncidentBulkUpdateForm(Form):
+    """
+    Values for a set based update of critical incidents. Empty fields are not
+    changed.
+    """
+    field_names = ()
+    required_fields = ()
+
+    def __init__(self, *args, **kwargs):
+        super(IncidentBulkUpdateForm, self).__init__(*args, **kwargs)
+        for name in self.field_names:
+            self.fields[name] = CriticalIncident._meta.get_field(name).formfield(
+                required=name in self.required_fields)
+
+    def get_values(self):
+        return {name: value for name, value in self.cleaned_data.items()
+                if value not in (None, '')}
+
+    def clean(self):
+        cleaned_data = super(IncidentBulkUpdateForm, self).clean()
+        if not self.errors and not self.get_values():
+            raise ValidationError(_('Please fill at least one field.'))
+        return cleaned_data
+
+
+class IncidentStatusForm(IncidentBulkUpdateForm):
+    field_names = ('status', 'review_date', 'responsibilty')
+    required_fields = ('status',)
+
+    def __init__(self, *args, **kwargs):
+        super(IncidentStatusForm, self).__init__(*args, **kwargs)
+        self.fields['status'].choices = [
+            choice for choice in self.fields['status'].choices if choice[0] != 'new']
+
+
+class IncidentClassificationForm(IncidentBulkUpdateForm):
+    field_names = ('risk', 'frequency', 'hazard')
+
+
+class TranslationBatchForm(Form):
+    department = ModelChoiceField(Department.objects.none(), label=_('Department'))
+    language = ChoiceField(label=_('Language'), choices=())
+
+    def __init__(self, *args, **kwargs):
+        departments = kwargs.pop('departments')
+        super(TranslationBatchForm, self).__init__(*args, **kwargs)
+        self.fields['department'].queryset = departments
+        self.fields['language'].choices = [
+            (code, get_language_title(code)) for code in get_target_languages()]
+
+
+class TranslationImportForm(Form):
+    file = FileField(label=_('File'), help_text=_(
+        'XLIFF (.xlf) or PO file with translations exported from this page'))
+
+
+class DepartmentProvisioningForm(Form):
+    file = FileField(label=_('File'), help_text=_(
+        'CSV file with the columns label, name, reporter, reporter_password, '
+        'reviewers (username or username:email, separated by ;) and active'))
+
+
 class DivErrorList(forms.utils.ErrorList):
     
     def __unicode__(self):
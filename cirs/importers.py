@@ -0,0 +1,220 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+"""
+Bulk import of historical critical incidents, e.g. from spreadsheets or
+other CIRS tools.
+
+Every row is validated like an incident entered in the admin (full_clean)
+and the valid rows are saved batch by batch with bulk_create. Comments are
+given per row as a JSON list in the ``comments`` column/key, e.g.::
+
+    [{"author": "rev1", "text": "Checked", "created": "2020-01-31", "status": "closed"}]
+"""
+
+import csv
+import io
+import json
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+
+from .changelog import record_bulk_changes
+from .counters import reconcile_departments, reconcile_incidents
+from .models import Comment, CriticalIncident, Department, generate_comment_codes
+
+IMPORT_FIELDS = ('date', 'incident', 'reason', 'immediate_action', 'preventability',
+                 'public', 'reported', 'action', 'responsibilty', 'review_date',
+                 'status', 'risk', 'frequency', 'hazard', 'category')
+COMMENT_FIELDS = ('text', 'created', 'status')
+FORMATS = ('csv', 'json', 'jsonl')
+
+
+def read_rows(stream, file_format):
+    """Yields rows as dictionaries from a text stream."""
+    if file_format == 'csv':
+        # the JSON of the comments column is parsed per row by the importer
+        for row in csv.DictReader(stream):
+            yield row
+    elif file_format == 'json':
+        for row in json.load(stream):
+            yield row
+    elif file_format == 'jsonl':
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        raise ValueError('Unsupported format {}'.format(file_format))
+
+
+def incident_to_row(incident, comments=()):
+    """Row for an incident in the import format, e.g. for exports."""
+    row = {field: incident._meta.get_field(field).value_to_string(incident)
+           for field in IMPORT_FIELDS}
+    row['comments'] = [{'author': comment.author.username, 'text': comment.text,
+                        'created': comment.created.isoformat(), 'status': comment.status}
+                       for comment in comments]
+    return row
+
+
+def write_csv(rows, stream):
+    writer = csv.DictWriter(stream, IMPORT_FIELDS + ('comments',))
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(dict(row, comments=json.dumps(row['comments'])))
+
+
+def get_format(file_name):
+    extension = file_name.rsplit('.', 1)[-1].lower()
+    if extension not in FORMATS:
+        raise ValueError('Unsupported file type {}. Use one of: {}'.format(
+            extension, ', '.join(FORMATS)))
+    return extension
+
+
+def open_text(uploaded_file):
+    """Wraps a binary upload, BOM of spreadsheet exports is removed."""
+    return io.TextIOWrapper(uploaded_file, encoding='utf-8-sig', newline='')
+
+
+class IncidentImporter(object):
+    """
+    Imports incidents with their comments into one department.
+
+    Invalid rows are skipped and reported in errors as (row number, message).
+    In dry run mode the rows are only validated.
+    """
+    batch_size = 500
+
+    def __init__(self, department, dry_run=False, batch_size=None, progress=None):
+        self.department = department
+        self.dry_run = dry_run
+        self.batch_size = batch_size or self.batch_size
+        self.progress = progress
+        self.imported = 0
+        self.processed = 0
+        self.errors = []
+
+    def run(self, rows):
+        batch = []
+        for number, row in enumerate(rows, start=1):
+            batch.append((number, row))
+            if len(batch) == self.batch_size:
+                self.process_batch(batch)
+                batch = []
+        if batch:
+            self.process_batch(batch)
+        return self
+
+    def build_incident(self, row):
+        incident = CriticalIncident(department=self.department)
+        for field in IMPORT_FIELDS:
+            value = row.get(field)
+            if value not in (None, ''):
+                setattr(incident, field, value)
+        # comment code is generated for the whole batch later
+        incident.full_clean(exclude=['comment_code'], validate_unique=False)
+        return incident
+
+    def parse_comments(self, row):
+        comments = row.get('comments') or []
+        if isinstance(comments, str):
+            try:
+                comments = json.loads(comments)
+            except ValueError as error:
+                raise ValidationError('Invalid JSON in comments: {}'.format(error))
+        if not isinstance(comments, list) or not all(
+                isinstance(comment, dict) for comment in comments):
+            raise ValidationError('Comments have to be a list of objects')
+        return comments
+
+    def build_comments(self, comments, authors):
+        result = []
+        for data in comments:
+            try:
+                author = authors[data.get('author')]
+            except KeyError:
+                raise ValidationError('Unknown comment author "{}"'.format(data.get('author')))
+            comment = Comment(author=author, **{field: data[field] for field in COMMENT_FIELDS
+                                                if data.get(field) not in (None, '')})
+            comment.full_clean(exclude=['critical_incident'], validate_unique=False)
+            result.append(comment)
+        return result
+
+    def get_authors(self, comment_lists):
+        usernames = set(comment.get('author') for comments in comment_lists
+                        for comment in comments)
+        return {user.username: user for user in User.objects.filter(username__in=usernames)}
+
+    def process_batch(self, batch):
+        # parsed first to look up the authors of the batch at once
+        comment_lists = {}
+        for number, row in batch:
+            try:
+                comment_lists[number] = self.parse_comments(row)
+            except ValidationError as error:
+                comment_lists[number] = error
+        authors = self.get_authors(comments for comments in comment_lists.values()
+                                   if isinstance(comments, list))
+        valid = []
+        for number, row in batch:
+            try:
+                if isinstance(comment_lists[number], ValidationError):
+                    raise comment_lists[number]
+                valid.append((self.build_incident(row),
+                              self.build_comments(comment_lists[number], authors)))
+            except (ValidationError, TypeError, ValueError) as error:
+                messages = getattr(error, 'messages', [str(error)])
+                self.errors.append((number, '; '.join(messages)))
+        if valid and not self.dry_run:
+            self.save(valid)
+        self.imported += len(valid)
+        self.processed += len(batch)
+        if self.progress:
+            self.progress(self)
+
+    @transaction.atomic
+    def save(self, valid):
+        incidents = [incident for incident, _ in valid]
+        for incident, code in zip(incidents, generate_comment_codes(len(incidents))):
+            incident.comment_code = code
+        CriticalIncident.objects.bulk_create(incidents)
+        if not connection.features.can_return_rows_from_bulk_insert:
+            pks = dict(CriticalIncident.objects.filter(
+                comment_code__in=[incident.comment_code for incident in incidents]
+            ).values_list('comment_code', 'pk'))
+            for incident in incidents:
+                incident.pk = pks[incident.comment_code]
+        comments = []
+        for incident, incident_comments in valid:
+            for comment in incident_comments:
+                comment.critical_incident = incident
+                comments.append(comment)
+        Comment.objects.bulk_create(comments)
+        # signals are not sent by bulk_create
+        record_bulk_changes(
+            CriticalIncident.objects.filter(pk__in=[incident.pk for incident in incidents]),
+            [field.name for field in CriticalIncident._meta.concrete_fields], 'created')
+        record_bulk_changes(
+            Comment.objects.filter(critical_incident__in=incidents),
+            [field.name for field in Comment._meta.concrete_fields], 'created')
+        reconcile_incidents(
+            CriticalIncident.objects.filter(pk__in=[incident.pk for incident in incidents]))
+        reconcile_departments(Department.objects.filter(pk=self.department.pk))
@@ -0,0 +1,70 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from cirs.archive import IncidentArchiver, archivable_incidents
+from cirs.models import Department
+
+
+def parse_cutoff(value):
+    """Number of days before today or an ISO date."""
+    try:
+        if value.isdigit():
+            return date.today() - timedelta(days=int(value))
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError('--older-than needs a number of days or a date like 2020-12-31')
+
+
+class Command(BaseCommand):
+    help = ("Moves completed incidents reported before the given date with their comments "
+            "into the read-only archive. Published incidents are not archived.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', required=True, dest='older_than',
+                            help='Number of days or date (YYYY-MM-DD)')
+        parser.add_argument('--department', help='Label of the department (default: all)')
+        parser.add_argument('--batch-size', type=int, default=IncidentArchiver.batch_size)
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only count the incidents which would be archived')
+
+    def report_progress(self, archiver):
+        self.stdout.write('{} incidents archived'.format(archiver.archived))
+
+    def handle(self, *args, **options):
+        cutoff = parse_cutoff(options['older_than'])
+        department = None
+        if options['department']:
+            try:
+                department = Department.objects.get(label=options['department'])
+            except Department.DoesNotExist:
+                raise CommandError('Department "{}" does not exist'.format(
+                    options['department']))
+        if options['dry_run']:
+            self.stdout.write('Dry run: {} incidents reported before {} would be archived.'.format(
+                archivable_incidents(cutoff, department).count(), cutoff))
+            return
+        archiver = IncidentArchiver(cutoff, department, batch_size=options['batch_size'],
+                                    progress=self.report_progress)
+        archiver.run()
+        self.stdout.write(self.style.SUCCESS('Archived {} incidents reported before {}.'.format(
+            archiver.archived, cutoff)))
@@ -0,0 +1,67 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+from django.core.management.base import BaseCommand, CommandError
+
+from cirs.benchmarks import HANDLERS, SCENARIOS, VARIANTS, run_benchmark
+
+
+class Command(BaseCommand):
+    help = ("Measures throughput and latency of typical requests with concurrent "
+            "clients in a temporary database. Run it on the production server to "
+            "compare database configurations (variants).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenarios', nargs='*', metavar='scenario',
+                            help='One of {} (default: all)'.format(', '.join(sorted(SCENARIOS))))
+        parser.add_argument('--variant', action='append', choices=sorted(VARIANTS),
+                            dest='variants',
+                            help='Database settings to use, may be repeated (default: configured)')
+        parser.add_argument('--handler', action='append', choices=HANDLERS, dest='handlers',
+                            help='Request handler, may be repeated (default: wsgi). With asgi '
+                                 'every client is an asyncio task instead of a thread')
+        parser.add_argument('--threads', type=int, default=4, help='Concurrent clients')
+        parser.add_argument('--duration', type=float, default=5.0, help='Seconds per run')
+
+    def handle(self, *args, **options):
+        unknown = set(options['scenarios']) - set(SCENARIOS)
+        if unknown:
+            raise CommandError('Unknown scenario: {}'.format(', '.join(sorted(unknown))))
+        handlers = options['handlers'] or ['wsgi']
+        scenarios = options['scenarios'] or sorted(SCENARIOS)
+        if 'asgi' in handlers:
+            unsupported = [name for name in scenarios if not SCENARIOS[name].supports_asgi()]
+            if options['scenarios'] and unsupported:
+                raise CommandError('Scenario without ASGI support: {}'.format(
+                    ', '.join(unsupported)))
+        self.stdout.write('{:<20} {:<20} {:<7} {:>7} {:>8} {:>9} {:>7} {:>8} {:>8}'.format(
+            'scenario', 'variant', 'handler', 'threads', 'requests', 'req/s', 'errors',
+            'p50 ms', 'p95 ms'))
+        for name in scenarios:
+            for variant in options['variants'] or ['configured']:
+                for handler in handlers:
+                    if handler == 'asgi' and not SCENARIOS[name].supports_asgi():
+                        continue
+                    result = run_benchmark(name, variant, options['threads'],
+                                           options['duration'], handler)
+                    self.stdout.write(
+                        '{:<20} {:<20} {:<7} {:>7} {:>8} {:>9.1f} {:>7} {:>8.1f} {:>8.1f}'.format(
+                            result.scenario, result.variant, result.handler, result.threads,
+                            result.operations, result.throughput, result.errors,
+                            result.percentile(50), result.percentile(95)))
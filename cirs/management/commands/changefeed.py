@@ -0,0 +1,51 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from cirs.models import ChangeLogEntry, Department
+
+
+class Command(BaseCommand):
+    help = ("Writes change log entries with a sequence number greater than "
+            "--since as JSON lines to stdout. Entries younger than "
+            "CHANGELOG_SETTLE_SECONDS may be followed by lower sequence numbers "
+            "committed later, so read them again next time.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=int, default=0,
+                            help='Last sequence number known to the consumer')
+        parser.add_argument('--department', help='Limit output to the department with this label')
+        parser.add_argument('--limit', type=int, help='Maximal number of entries')
+
+    def handle(self, *args, **options):
+        entries = ChangeLogEntry.objects.filter(id__gt=options['since'])
+        if options['department']:
+            try:
+                department = Department.objects.get(label=options['department'])
+            except Department.DoesNotExist:
+                raise CommandError('Department "{}" does not exist'.format(
+                    options['department']))
+            entries = entries.filter(department_pk=department.pk)
+        if options['limit']:
+            entries = entries[:options['limit']]
+        for entry in entries.iterator(chunk_size=2000):
+            self.stdout.write(json.dumps(entry.as_dict()))
@@ -0,0 +1,49 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from cirs.backup import export_department
+from cirs.models import Department
+
+
+class Command(BaseCommand):
+    help = ("Writes all incidents, comments, publishable incidents, photos and the "
+            "configuration of a department into a compressed archive. The archive "
+            "contains password hashes of the users and has to be stored securely.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('department', help='Label of the department')
+        parser.add_argument('--output', help='Archive file, by default <label>-<date>.tar.gz')
+
+    def handle(self, *args, **options):
+        try:
+            department = Department.objects.get(label=options['department'])
+        except Department.DoesNotExist:
+            raise CommandError('Department "{}" does not exist'.format(options['department']))
+        output = options['output'] or '{}-{}.tar.gz'.format(
+            department.label, date.today().isoformat())
+        with open(output, 'wb') as archive:
+            counts = export_department(department, archive)
+        for model, count in sorted(counts.items()):
+            self.stdout.write('{}: {}'.format(model, count))
+        self.stdout.write(self.style.SUCCESS('Exported {} to {}.'.format(
+            department.label, output)))
@@ -0,0 +1,50 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+from django.core.management.base import BaseCommand, CommandError
+
+from cirs.backup import BackupError, import_department
+
+
+class Command(BaseCommand):
+    help = ("Restores a department from an archive written by export_department. "
+            "All objects get new ids. Existing users are reused if their email "
+            "address matches or with --reuse-users.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='Archive written by export_department')
+        parser.add_argument('--label', help='New label of the department')
+        parser.add_argument('--name', help='New name of the department')
+        parser.add_argument('--reuse-users', action='store_true',
+                            help='Take over existing users with the same username even if '
+                                 'their email address differs')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['file'], 'rb') as archive:
+                restorer = import_department(archive, label=options['label'],
+                                             name=options['name'],
+                                             reuse_users=options['reuse_users'])
+        except BackupError as error:
+            raise CommandError(error)
+        if restorer.renewed_codes:
+            self.stderr.write('{} comment codes were already in use and had to be '
+                              'replaced.'.format(restorer.renewed_codes))
+        self.stdout.write(self.style.SUCCESS('Imported department {} with {} incidents.'.format(
+            restorer.department.label, len(restorer.incident_ids))))
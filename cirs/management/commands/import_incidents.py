@@ -0,0 +1,66 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+from django.core.management.base import BaseCommand, CommandError
+
+from cirs.importers import FORMATS, IncidentImporter, get_format, read_rows
+from cirs.models import Department
+
+
+class Command(BaseCommand):
+    help = ("Imports critical incidents with reviews and comments from a CSV, "
+            "JSON or JSON lines file into a department.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('department', help='Label of the department')
+        parser.add_argument('file', help='File with one incident per row/object')
+        parser.add_argument('--format', choices=FORMATS,
+                            help='File format, by default guessed from the file extension')
+        parser.add_argument('--batch-size', type=int, default=IncidentImporter.batch_size)
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Validate the rows without saving them')
+
+    def report_progress(self, importer):
+        self.stdout.write('{} rows processed, {} valid, {} invalid'.format(
+            importer.processed, importer.imported, len(importer.errors)))
+
+    def handle(self, *args, **options):
+        try:
+            department = Department.objects.get(label=options['department'])
+        except Department.DoesNotExist:
+            raise CommandError('Department "{}" does not exist'.format(options['department']))
+        try:
+            file_format = options['format'] or get_format(options['file'])
+        except ValueError as error:
+            raise CommandError(error)
+
+        importer = IncidentImporter(department, dry_run=options['dry_run'],
+                                    batch_size=options['batch_size'],
+                                    progress=self.report_progress)
+        with open(options['file'], encoding='utf-8-sig', newline='') as stream:
+            importer.run(read_rows(stream, file_format))
+
+        for number, message in importer.errors:
+            self.stderr.write('Row {}: {}'.format(number, message))
+        if options['dry_run']:
+            self.stdout.write('Dry run: {} incidents are valid, nothing was saved.'.format(
+                importer.imported))
+        else:
+            self.stdout.write(self.style.SUCCESS('Imported {} incidents into {}.'.format(
+                importer.imported, department.label)))
@@ -0,0 +1,68 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from cirs.dbcopy import DatabaseCopier
+
+
+class Command(BaseCommand):
+    help = ("Copies all data into another database configured in DATABASES, e.g. from "
+            "SQLite to PostgreSQL. The target is migrated first and has to be empty.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--to', required=True, dest='target',
+                            help='Alias of the target database')
+        parser.add_argument('--from', default='default', dest='source',
+                            help='Alias of the source database (default: "default")')
+        parser.add_argument('--chunk-size', type=int, default=DatabaseCopier.chunk_size)
+        parser.add_argument('--no-verify', action='store_false', dest='verify',
+                            help='Skip the comparison of row counts and checksums')
+
+    def report_progress(self, model, count):
+        self.stdout.write('{}: {} rows'.format(model._meta.label_lower, count))
+
+    def handle(self, *args, **options):
+        source, target = options['source'], options['target']
+        for alias in (source, target):
+            if alias not in settings.DATABASES:
+                raise CommandError('Database "{}" is not configured'.format(alias))
+        if source == target:
+            raise CommandError('Source and target database have to differ')
+
+        call_command('migrate', database=target, interactive=False,
+                     verbosity=max(options['verbosity'] - 1, 0))
+        copier = DatabaseCopier(source, target, chunk_size=options['chunk_size'],
+                                progress=self.report_progress)
+        filled = copier.get_filled_models()
+        if filled:
+            raise CommandError('Target database is not empty: {}'.format(
+                ', '.join(model._meta.label_lower for model in filled)))
+        copier.run()
+
+        if options['verify']:
+            differing = copier.verify()
+            if differing:
+                raise CommandError('Rows differ after the copy: {}'.format(
+                    ', '.join(model._meta.label_lower for model in differing)))
+            self.stdout.write('Row counts and checksums are equal.')
+        self.stdout.write(self.style.SUCCESS('Copied {} tables from {} to {}.'.format(
+            len(copier.models), source, target)))
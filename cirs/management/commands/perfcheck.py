@@ -0,0 +1,60 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+import json
+
+from django.core.checks import ERROR, WARNING
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from cirs.checks import run_performance_checks
+
+LEVEL_TAGS = {ERROR: 'E', WARNING: 'W'}
+
+
+class Command(BaseCommand):
+    help = ("Inspects the settings, the database, the media directory and optionally "
+            "the mail server and lists performance problems, the most severe first.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS,
+                            help='Database to inspect (default: "default")')
+        parser.add_argument('--smtp', action='store_true',
+                            help='Measure the time to connect to the mail server')
+        parser.add_argument('--json', action='store_true', help='Output as JSON')
+
+    def handle(self, *args, **options):
+        messages = run_performance_checks(options['database'], smtp=options['smtp'])
+        if options['json']:
+            self.stdout.write(json.dumps([
+                {'id': message.id, 'level': message.level, 'msg': message.msg,
+                 'hint': message.hint} for message in messages]))
+            return
+        if not messages:
+            self.stdout.write('No performance problems found.')
+        for message in messages:
+            line = '[{}] {}: {}'.format(LEVEL_TAGS.get(message.level, 'I'), message.id,
+                                        message.msg)
+            if message.level >= ERROR:
+                line = self.style.ERROR(line)
+            elif message.level >= WARNING:
+                line = self.style.WARNING(line)
+            self.stdout.write(line)
+            if message.hint:
+                self.stdout.write('    HINT: {}'.format(message.hint))
@@ -0,0 +1,47 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from cirs.provisioning import provision_departments, read_department_specs
+
+
+class Command(BaseCommand):
+    help = ("Creates departments with reporter, reviewers and configuration from "
+            "a CSV file with the columns label, name, reporter, reporter_password, "
+            "reviewers (username or username:email, separated by ;) and active.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='CSV file with one department per row')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['file'], encoding='utf-8-sig', newline='') as stream:
+                specs = list(read_department_specs(stream))
+            provisioned = provision_departments(specs)
+        except ValidationError as error:
+            raise CommandError('\n'.join(error.messages))
+        for (department, password), spec in zip(provisioned, specs):
+            if spec['reporter_password']:
+                password = '(as given)'
+            self.stdout.write('{}: reporter {} password {}'.format(
+                department.label, department.reporter, password))
+        self.stdout.write(self.style.SUCCESS(
+            'Provisioned {} departments.'.format(len(provisioned))))
@@ -0,0 +1,43 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+from django.core.management.base import BaseCommand, CommandError
+
+from cirs.counters import reconcile_departments, reconcile_incidents
+from cirs.models import CriticalIncident, Department
+
+
+class Command(BaseCommand):
+    help = ("Counts comments, new incidents and unpublished incidents again and "
+            "corrects the stored counters which differ.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--department', help='Label of the department (default: all)')
+
+    def handle(self, *args, **options):
+        incidents = CriticalIncident.objects.all()
+        departments = Department.objects.all()
+        if options['department']:
+            departments = departments.filter(label=options['department'])
+            if not departments.exists():
+                raise CommandError('Department "{}" does not exist'.format(
+                    options['department']))
+            incidents = incidents.filter(department__label=options['department'])
+        self.stdout.write('Corrected counters of {} incidents and {} departments.'.format(
+            reconcile_incidents(incidents), reconcile_departments(departments)))
@@ -0,0 +1,30 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+from django.core.management.base import BaseCommand
+
+from cirs.notifications import send_digests
+
+
+class Command(BaseCommand):
+    help = ("Sends the due notification digests of departments with hourly or daily "
+            "notifications. Run it regularly, e.g. every 10 minutes.")
+
+    def handle(self, *args, **options):
+        self.stdout.write('Sent {} notification digests.'.format(send_digests()))
@@ -0,0 +1,40 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+import json
+
+from django.core.management.base import BaseCommand
+
+from cirs.throttling import get_counters
+
+
+class Command(BaseCommand):
+    help = ("Shows the numbers of allowed and refused login attempts and incident "
+            "code searches counted in the shared cache (CACHE), e.g. for monitoring.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true', help='Output as JSON')
+
+    def handle(self, *args, **options):
+        counters = get_counters()
+        if options['json']:
+            self.stdout.write(json.dumps(counters, sort_keys=True))
+            return
+        for scope, values in counters.items():
+            self.stdout.write('{}: {allowed} allowed, {refused} refused'.format(scope, **values))
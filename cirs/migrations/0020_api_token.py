@@ -0,0 +1,35 @@
+# Generated by Django 4.2.20 on 2026-10-19 02:41
+
+import datetime
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cirs', '0001_squashed_0019_reinitialized'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publishableincident',
+            name='modified',
+            field=models.DateTimeField(auto_now=True, verbose_name='Modified'),
+        ),
+        migrations.CreateModel(
+            name='APIToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(editable=False, max_length=40, unique=True, verbose_name='Key')),
+                ('name', models.CharField(help_text='Name of the system which uses this token', max_length=255, verbose_name='Name')),
+                ('created', models.DateField(default=datetime.date.today, verbose_name='Created at')),
+                ('active', models.BooleanField(default=True, verbose_name='Active')),
+                ('department', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='api_tokens', to='cirs.department', verbose_name='Department')),
+            ],
+            options={
+                'verbose_name': 'API token',
+                'verbose_name_plural': 'API tokens',
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.20 on 2026-10-19 02:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cirs', '0020_api_token'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField(auto_now_add=True, verbose_name='Timestamp')),
+                ('model', models.CharField(max_length=64, verbose_name='Model')),
+                ('object_pk', models.BigIntegerField(verbose_name='Object ID')),
+                ('action', models.CharField(choices=[('created', 'created'), ('changed', 'changed'), ('deleted', 'deleted')], max_length=16, verbose_name='Action')),
+                ('changed_fields', models.JSONField(default=list, verbose_name='Changed fields')),
+                ('department_pk', models.BigIntegerField(null=True, verbose_name='Department ID')),
+            ],
+            options={
+                'verbose_name': 'Change log entry',
+                'verbose_name_plural': 'Change log entries',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['department_pk', 'id'], name='cirs_change_departm_1b74fe_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.20 on 2026-10-19 03:20
+
+import datetime
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import multiselectfield.db.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('cirs', '0021_change_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedIncident',
+            fields=[
+                ('date', models.DateField(verbose_name='Date of incident')),
+                ('incident', models.TextField(verbose_name='Mistake / problem / critical incident')),
+                ('reason', models.TextField(verbose_name='Cause of failure')),
+                ('immediate_action', models.TextField(help_text='Immediate action or suggestion regarding prevention / troubleshooting', verbose_name='Immediate action / suggestion')),
+                ('preventability', models.CharField(choices=[('indistinct', 'appraisal not possible'), ('avoidable', 'The incident was avoidable'), ('not avoidable', 'The incident was not avoidable')], help_text='In your opinion, was the incident avoidable or not?', max_length=255, verbose_name='Preventability')),
+                ('photo', models.ImageField(blank=True, null=True, upload_to='photos/%Y/%m/%d', verbose_name='Photo')),
+                ('public', models.BooleanField(choices=[(True, 'I agree that this report will be made public to people outside the quality management team after copyedit.'), (False, 'I DO NOT agree that this report will be made public to people outside the quality management team even after copyedit.')], default=None, verbose_name='Publication')),
+                ('comment_code', models.CharField(blank=True, max_length=16)),
+                ('reported', models.DateField(default=datetime.date.today, verbose_name='Date of report')),
+                ('action', models.TextField(blank=True, verbose_name='Action')),
+                ('responsibilty', models.CharField(blank=True, max_length=255, verbose_name='Responsibility')),
+                ('review_date', models.DateField(blank=True, null=True, verbose_name='Review date')),
+                ('status', models.CharField(choices=[('new', 'new'), ('in process', 'in process'), ('under supervision', 'under supervision'), ('completed', 'completed')], default='new', max_length=255, verbose_name='Status')),
+                ('risk', models.CharField(blank=True, choices=[('low', 'low'), ('middle', 'middle'), ('high', 'high')], max_length=255, verbose_name='Risk classification')),
+                ('frequency', models.CharField(blank=True, choices=[('singular case', 'singular case (for the first time)'), ('seldom', 'seldom (once per year)'), ('occasional', 'occasional (once per month)'), ('frequent', 'frequent (once per Week)'), ('regular', 'regular (daily)')], max_length=255, verbose_name='Frequency')),
+                ('hazard', models.CharField(blank=True, choices=[('very low', 'very low'), ('low', 'low'), ('moderate', 'moderate'), ('high', 'high'), ('very high', 'very high')], help_text='For emploees or science', max_length=255, verbose_name='Hazard')),
+                ('category', multiselectfield.db.fields.MultiSelectField(blank=True, choices=[('organisation/communication', 'organisation/communication'), ('technique/methods', 'technique/methods'), ('knowledge/training', 'knowledge/training'), ('concentration/attention (mistake/slip)', 'concentration/attention (mistake/slip)'), ('infrastructure', 'infrastructure'), ('other', 'other')], max_length=255, verbose_name='Category')),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('archived', models.DateField(default=datetime.date.today, verbose_name='Archived at')),
+                ('publishable_incident', models.JSONField(blank=True, null=True, verbose_name='Publishable incident')),
+                ('department', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='cirs.department', verbose_name='Department')),
+            ],
+            options={
+                'verbose_name': 'Archived incident',
+                'verbose_name_plural': 'Archived incidents',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedComment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateField(verbose_name='Created at')),
+                ('text', models.TextField(verbose_name='Text')),
+                ('status', models.CharField(choices=[('open', 'open'), ('in process', 'in process'), ('closed', 'closed')], max_length=255, verbose_name='Status')),
+                ('archived_incident', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='cirs.archivedincident', verbose_name='Archived incident')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to=settings.AUTH_USER_MODEL, verbose_name='Author')),
+            ],
+            options={
+                'verbose_name': 'Archived comment',
+                'verbose_name_plural': 'Archived comments',
+            },
+        ),
+    ]
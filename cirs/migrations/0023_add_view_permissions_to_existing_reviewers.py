@@ -0,0 +1,44 @@
+from django.contrib.auth.management import create_permissions
+from django.db import migrations
+
+# added to Reviewer.REVIEWER_PERM_CODES for the archive and the comment inline
+CODENAMES = ('view_archivedincident', 'view_archivedcomment', 'view_comment')
+
+
+def get_permissions(apps):
+    # permissions are created after all migrations ran, but needed now
+    app_config = apps.get_app_config('cirs')
+    app_config.models_module = True
+    create_permissions(app_config, apps=apps, verbosity=0)
+    app_config.models_module = None
+    Permission = apps.get_model('auth', 'Permission')
+    return Permission.objects.filter(content_type__app_label='cirs', codename__in=CODENAMES)
+
+
+def add_permissions(apps, schema_editor):
+    Reviewer = apps.get_model('cirs', 'Reviewer')
+    permissions = list(get_permissions(apps))
+    for reviewer in Reviewer.objects.select_related('user'):
+        reviewer.user.user_permissions.add(*permissions)
+
+
+def remove_permissions(apps, schema_editor):
+    Reviewer = apps.get_model('cirs', 'Reviewer')
+    Permission = apps.get_model('auth', 'Permission')
+    permissions = list(Permission.objects.filter(content_type__app_label='cirs',
+                                                 codename__in=CODENAMES))
+    for reviewer in Reviewer.objects.select_related('user'):
+        reviewer.user.user_permissions.remove(*permissions)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cirs', '0022_archive'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_permissions, remove_permissions),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 4.2.20 on 2026-10-19 03:26
+
+from django.db import migrations, models, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+OPEN_COMMENT_STATUSES = ('open', 'in process')
+
+
+def count_of(queryset, lookup, **filters):
+    return Coalesce(Subquery(
+        queryset.filter(**{lookup: OuterRef('pk')}, **filters).order_by().values(
+            lookup).annotate(count=Count('pk')).values('count')), 0)
+
+
+def fill_counters(apps, schema_editor):
+    Comment = apps.get_model('cirs', 'Comment')
+    CriticalIncident = apps.get_model('cirs', 'CriticalIncident')
+    Department = apps.get_model('cirs', 'Department')
+    PublishableIncident = apps.get_model('cirs', 'PublishableIncident')
+    db = schema_editor.connection.alias
+    with transaction.atomic(using=db):
+        # counter updates of running instances wait for the snapshot instead of
+        # being overwritten by it; remaining drift is fixed by reconcile_counters
+        list(Department.objects.using(db).select_for_update().values_list('pk'))
+        list(CriticalIncident.objects.using(db).select_for_update().values_list('pk'))
+        fill_snapshot(db, Comment, CriticalIncident, Department, PublishableIncident)
+
+
+def fill_snapshot(db, Comment, CriticalIncident, Department, PublishableIncident):
+    CriticalIncident.objects.using(db).update(
+        comment_count=count_of(Comment.objects.all(), 'critical_incident'),
+        open_comment_count=count_of(Comment.objects.all(), 'critical_incident',
+                                    status__in=OPEN_COMMENT_STATUSES))
+    Department.objects.using(db).update(
+        new_incident_count=count_of(CriticalIncident.objects.all(), 'department',
+                                    status='new'),
+        open_comment_count=count_of(Comment.objects.all(), 'critical_incident__department',
+                                    status__in=OPEN_COMMENT_STATUSES),
+        unpublished_count=count_of(PublishableIncident.objects.all(),
+                                   'critical_incident__department', publish=False))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cirs', '0023_add_view_permissions_to_existing_reviewers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='criticalincident',
+            name='comment_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Comments'),
+        ),
+        migrations.AddField(
+            model_name='criticalincident',
+            name='open_comment_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Open comments'),
+        ),
+        migrations.AddField(
+            model_name='department',
+            name='new_incident_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='New incidents'),
+        ),
+        migrations.AddField(
+            model_name='department',
+            name='open_comment_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Open comments'),
+        ),
+        migrations.AddField(
+            model_name='department',
+            name='unpublished_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Unpublished incidents'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
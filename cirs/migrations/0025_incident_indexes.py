@@ -0,0 +1,21 @@
+# Generated by Django 4.2.20 on 2026-10-19 03:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cirs', '0024_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='criticalincident',
+            index=models.Index(fields=['department', 'status', 'reported'], name='cirs_ci_dept_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='criticalincident',
+            index=models.Index(fields=['department', 'reported'], name='cirs_ci_dept_reported_idx'),
+        ),
+    ]
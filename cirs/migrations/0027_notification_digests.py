@@ -0,0 +1,37 @@
+# Generated by Django 4.2.20 on 2026-10-19 04:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('cirs', '0025_incident_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='labcirsconfig',
+            name='notification_mode',
+            field=models.CharField(choices=[('immediate', 'immediately'), ('hourly', 'hourly digest'), ('daily', 'daily digest')], default='immediate', help_text='Digests combine all notifications of an hour or a day into one email per recipient', max_length=16, verbose_name='Notification mode'),
+        ),
+        migrations.CreateModel(
+            name='NotificationEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255, verbose_name='Subject')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Created')),
+                ('department', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='cirs.department', verbose_name='Department')),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Recipient')),
+            ],
+            options={
+                'verbose_name': 'Notification event',
+                'verbose_name_plural': 'Notification events',
+                'ordering': ['created', 'id'],
+                'indexes': [models.Index(fields=['department', 'created'], name='cirs_notification_dept_idx')],
+            },
+        ),
+    ]
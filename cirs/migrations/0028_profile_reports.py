@@ -0,0 +1,37 @@
+# Generated by Django 4.2.20 on 2026-10-19 04:44
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('cirs', '0027_notification_digests'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('method', models.CharField(max_length=8, verbose_name='Method')),
+                ('path', models.CharField(max_length=255, verbose_name='Path')),
+                ('status_code', models.PositiveSmallIntegerField(verbose_name='Status code')),
+                ('duration', models.FloatField(verbose_name='Duration (ms)')),
+                ('query_count', models.PositiveIntegerField(verbose_name='Queries')),
+                ('query_duration', models.FloatField(verbose_name='Query duration (ms)')),
+                ('stats', models.BinaryField(verbose_name='Statistics')),
+                ('queries', models.JSONField(default=list, verbose_name='Queries')),
+                ('user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Profile report',
+                'verbose_name_plural': 'Profile reports',
+                'ordering': ['-created'],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.20 on 2026-10-19 05:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cirs', '0028_profile_reports'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='archivedincident',
+            index=models.Index(fields=['comment_code'], name='cirs_archived_code_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.20 on 2026-10-19 05:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cirs', '0029_archived_incident_code_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='criticalincident',
+            name='modified',
+            field=models.DateTimeField(auto_now=True, verbose_name='Modified'),
+        ),
+    ]
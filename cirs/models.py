@@ -21,7 +21,7 @@ from datetime import date
 from django.conf import settings
 from django.contrib.auth.models import Permission, User
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, router, transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.urls import reverse
@@ -66,7 +66,8 @@ class Reporter(Role):
 class Reviewer(Role):
     REVIEWER_PERM_CODES = ('change_criticalincident', 'add_publishableincident', 
                            'change_publishableincident', 'change_labcirsconfig',
-                           'change_user')
+                           'change_user', 'view_archivedincident', 'view_archivedcomment',
+                           'view_comment')
     
     def clean(self):
         super(Reviewer, self).clean()
@@ -86,7 +87,26 @@ class Reviewer(Role):
         verbose_name_plural = _('Reviewers')      
 
 
-class Department(models.Model):
+class CountedModelMixin(object):
+    """
+    Saves in one transaction with the counter updates done by the receivers
+    in cirs.counters. The counter fields themselves are maintained with
+    atomic updates and left out on saves, as loaded values may be outdated.
+    """
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if (self.counter_fields and not self._state.adding
+                and kwargs.get('update_fields') is None and not kwargs.get('force_insert')):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields]
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super(CountedModelMixin, self).save(*args, **kwargs)
+
+
+class Department(CountedModelMixin, models.Model):
     label = models.SlugField(_('Label'), max_length=32, unique=True,
             help_text=_('Label can only consist of letters, numbers, underscores and hyphens.'))
     name = models.CharField(_('Name'), max_length=255, unique=True)
@@ -95,6 +115,15 @@ class Department(models.Model):
     reviewers = models.ManyToManyField(Reviewer, verbose_name=_("Reviewers"), related_name='departments')
     active = models.BooleanField(_("Active"), 
             help_text='Incidents can be created only if department is active.')
+    # maintained by cirs.counters
+    new_incident_count = models.IntegerField(
+        _('New incidents'), default=0, editable=False)
+    open_comment_count = models.IntegerField(
+        _('Open comments'), default=0, editable=False)
+    unpublished_count = models.IntegerField(
+        _('Unpublished incidents'), default=0, editable=False)
+
+    counter_fields = ('new_incident_count', 'open_comment_count', 'unpublished_count')
 
     class Meta:
         verbose_name = _('Department')
@@ -152,11 +181,11 @@ CATEGORY_CHOICES = (('organisation/communication', _('organisation/communication
                     )
 
 
-class CriticalIncident(models.Model):
+class IncidentFields(models.Model):
     """
-    Generate incident objects. The first part is generated by the reporter,
-    the second, separated by #review in the source code
-    may be generated by the reviewer.
+    Fields of critical incidents, shared with archived incidents. The first part
+    is generated by the reporter, the second, separated by #review in the source
+    code may be generated by the reviewer.
     """
     today = date.today
     # general part, visible to all
@@ -200,8 +229,7 @@ class CriticalIncident(models.Model):
         _("Category"), max_length=255, choices=CATEGORY_CHOICES, blank=True)
 
     class Meta:
-        verbose_name = _("Critical incident")
-        verbose_name_plural = _("Critical incidents")
+        abstract = True
 
     def photo_tag(self):
         photo_html_tag = ''
@@ -215,6 +243,30 @@ class CriticalIncident(models.Model):
     photo_tag.help_text = _("Click to see full size in new window/tab")
     photo_tag.allow_tags = True
 
+    def __str__(self):
+        info = (self.incident[:25] + '..') if len(self.incident) > 25 else self.incident
+        return info
+
+
+class CriticalIncident(CountedModelMixin, IncidentFields):
+    modified = models.DateTimeField(_("Modified"), auto_now=True)
+    # maintained by cirs.counters
+    comment_count = models.IntegerField(_('Comments'), default=0, editable=False)
+    open_comment_count = models.IntegerField(
+        _('Open comments'), default=0, editable=False)
+
+    counter_fields = ('comment_count', 'open_comment_count')
+
+    class Meta:
+        verbose_name = _("Critical incident")
+        verbose_name_plural = _("Critical incidents")
+        # filters of the admin changelist within the departments of a reviewer
+        indexes = [
+            models.Index(fields=['department', 'status', 'reported'],
+                         name='cirs_ci_dept_status_idx'),
+            models.Index(fields=['department', 'reported'], name='cirs_ci_dept_reported_idx'),
+        ]
+
     def clean(self):
         today = date.today()
         if self.date and self.date > today:
@@ -231,19 +283,31 @@ class CriticalIncident(models.Model):
     def get_absolute_url(self):
         return reverse('incident_detail', kwargs={'dept': self.department.label, 'pk':self.id})
     
-    def __str__(self):
-        info = (self.incident[:25] + '..') if len(self.incident) > 25 else self.incident
-        return info
-    
     def save(self, *agrs, **kwargs):
-        chars = 'abcdefghijklmnopqrstuvwxyz0123456789@#$%&*-_=+'
-        while not self.comment_code:
-            random_string = get_random_string(8, chars)
-            if CriticalIncident.objects.filter(comment_code=random_string).count() == 0:
-                self.comment_code = random_string
+        if not self.comment_code:
+            self.comment_code = generate_comment_codes(1)[0]
         super(CriticalIncident, self).save(*agrs, **kwargs)
 
 
+COMMENT_CODE_CHARS = 'abcdefghijklmnopqrstuvwxyz0123456789@#$%&*-_=+'
+
+def get_used_comment_codes(codes):
+    """Returns the codes used by critical or archived incidents."""
+    return set(CriticalIncident.objects.filter(comment_code__in=codes).values_list(
+        'comment_code', flat=True)) | set(ArchivedIncident.objects.filter(
+            comment_code__in=codes).values_list('comment_code', flat=True))
+
+
+def generate_comment_codes(count):
+    """Returns count unique comment codes which are not used yet."""
+    codes = set()
+    while len(codes) < count:
+        candidates = set(get_random_string(8, COMMENT_CODE_CHARS)
+                         for _ in range(count - len(codes))) - codes
+        codes |= candidates - get_used_comment_codes(candidates)
+    return list(codes)
+
+
 class TranslationStatusMixin(object):
     
     mandatory_fields = None
@@ -280,7 +344,7 @@ class TranslationStatusMixin(object):
 
     translation_info = property(_translation_info)
 
-class PublishableIncident(TranslationStatusMixin, TranslatableModel):
+class PublishableIncident(CountedModelMixin, TranslationStatusMixin, TranslatableModel):
     critical_incident = models.OneToOneField(CriticalIncident,
                                              verbose_name=_("Critical incident"),
                                              on_delete=models.CASCADE)
@@ -291,6 +355,7 @@ class PublishableIncident(TranslationStatusMixin, TranslatableModel):
         measures_and_consequences=models.TextField(_("Measures and consequences"), blank=True)
     )
     publish = models.BooleanField(_("Publish"), default=False)
+    modified = models.DateTimeField(_("Modified"), auto_now=True)
 
     def _mandatory_languages(self):
         return self.critical_incident.department.labcirsconfig.mandatory_languages
@@ -319,6 +384,11 @@ class PublishableIncident(TranslationStatusMixin, TranslatableModel):
         return self.incident
 
 
+NOTIFICATION_MODE_CHOICES = (('immediate', _('immediately')),
+                             ('hourly', _('hourly digest')),
+                             ('daily', _('daily digest')))
+
+
 class LabCIRSConfig(TranslationStatusMixin, TranslatableModel):
     EMAIL_HOST_ERROR = _(
         'If you want to send notifications, an existing email server distinct '
@@ -365,6 +435,11 @@ class LabCIRSConfig(TranslationStatusMixin, TranslatableModel):
         help_text=('Enter the message which will be send to the reviewer(s) '
                    'when a new incident is reported')
         )
+    notification_mode = models.CharField(
+        _('Notification mode'), max_length=16, choices=NOTIFICATION_MODE_CHOICES,
+        default='immediate',
+        help_text=_('Digests combine all notifications of an hour or a day into one email '
+                    'per recipient'))
 
     # auto filled part, invisible for reviewer
     department = models.OneToOneField(Department, verbose_name=_('Department'),
@@ -399,6 +474,27 @@ class LabCIRSConfig(TranslationStatusMixin, TranslatableModel):
     def __str__(self):
         return 'LabCIRS configuration for {}'.format(self.department.label)
 
+
+class NotificationEvent(models.Model):
+    """Notification of one recipient waiting for the next digest."""
+    department = models.ForeignKey(Department, verbose_name=_('Department'),
+                                   on_delete=models.CASCADE)
+    recipient = models.ForeignKey(User, verbose_name=_('Recipient'),
+                                  on_delete=models.CASCADE)
+    subject = models.CharField(_('Subject'), max_length=255)
+    created = models.DateTimeField(_('Created'), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('Notification event')
+        verbose_name_plural = _('Notification events')
+        ordering = ['created', 'id']
+        indexes = [models.Index(fields=['department', 'created'],
+                                name='cirs_notification_dept_idx')]
+
+    def __str__(self):
+        return self.subject
+
+
 @receiver(post_save, sender=Department)
 def create_config_for_department(sender, instance, created, **kwargs):
     if created:
@@ -407,8 +503,9 @@ def create_config_for_department(sender, instance, created, **kwargs):
 
 COMMENT_STATUS_CHOICES = (('open', _('open')), ('in process', _('in process')),
                   ('closed', _('closed')))
+OPEN_COMMENT_STATUSES = ('open', 'in process')
 
-class Comment(models.Model):
+class Comment(CountedModelMixin, models.Model):
     critical_incident = models.ForeignKey(CriticalIncident, 
                                           verbose_name=_("Critical incident"),
                                           related_name='comments',
@@ -423,3 +520,124 @@ class Comment(models.Model):
     
     def __str__(self):
         return self.text[:64]
+
+
+class ArchivedIncident(IncidentFields):
+    """
+    Completed critical incident moved out of the tables used for reviewing.
+    Archived incidents are read-only and keep the id of the critical incident.
+    """
+    id = models.BigIntegerField(_('ID'), primary_key=True)
+    archived = models.DateField(_('Archived at'), default=date.today)
+    # unpublished publishable incident with its translations
+    publishable_incident = models.JSONField(_('Publishable incident'), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('Archived incident')
+        verbose_name_plural = _('Archived incidents')
+        # new comment codes must not be used in the archive
+        indexes = [models.Index(fields=['comment_code'], name='cirs_archived_code_idx')]
+
+
+class ArchivedComment(models.Model):
+    id = models.BigIntegerField(_('ID'), primary_key=True)
+    archived_incident = models.ForeignKey(ArchivedIncident, verbose_name=_('Archived incident'),
+                                          related_name='comments', on_delete=models.CASCADE)
+    author = models.ForeignKey(User, verbose_name=_("Author"), on_delete=models.PROTECT)
+    created = models.DateField(_("Created at"))
+    text = models.TextField(_("Text"))
+    status = models.CharField(_("Status"), max_length=255, choices=COMMENT_STATUS_CHOICES)
+
+    class Meta:
+        verbose_name = _('Archived comment')
+        verbose_name_plural = _('Archived comments')
+
+    def __str__(self):
+        return self.text[:64]
+
+
+
+class APIToken(models.Model):
+    """
+    Grants read-only access to the JSON API for the publishable incidents
+    of exactly one department.
+    """
+    key = models.CharField(_("Key"), max_length=40, unique=True, editable=False)
+    name = models.CharField(_("Name"), max_length=255,
+                            help_text=_("Name of the system which uses this token"))
+    department = models.ForeignKey(Department, verbose_name=_("Department"),
+                                   related_name='api_tokens',
+                                   on_delete=models.CASCADE)
+    created = models.DateField(_("Created at"), default=date.today)
+    active = models.BooleanField(_("Active"), default=True)
+
+    class Meta:
+        verbose_name = _("API token")
+        verbose_name_plural = _("API tokens")
+
+    def save(self, *args, **kwargs):
+        if not self.key:
+            self.key = get_random_string(40)
+        super(APIToken, self).save(*args, **kwargs)
+
+    def __str__(self):
+        return '{} ({})'.format(self.name, self.department.label)
+
+
+
+CHANGELOG_ACTION_CHOICES = (('created', _('created')), ('changed', _('changed')),
+                            ('deleted', _('deleted')))
+
+class ChangeLogEntry(models.Model):
+    """
+    Append-only log of changes for external synchronization. The id serves as
+    sequence number. Entries are written by the receivers in cirs.changelog.
+    """
+    timestamp = models.DateTimeField(_("Timestamp"), auto_now_add=True)
+    model = models.CharField(_("Model"), max_length=64)
+    object_pk = models.BigIntegerField(_("Object ID"))
+    action = models.CharField(_("Action"), max_length=16, choices=CHANGELOG_ACTION_CHOICES)
+    changed_fields = models.JSONField(_("Changed fields"), default=list)
+    # plain id instead of foreign key, entries have to outlive deleted departments
+    department_pk = models.BigIntegerField(_("Department ID"), null=True)
+
+    class Meta:
+        verbose_name = _("Change log entry")
+        verbose_name_plural = _("Change log entries")
+        ordering = ['id']
+        indexes = [models.Index(fields=['department_pk', 'id'])]
+
+    def as_dict(self):
+        return {'sequence': self.id, 'timestamp': self.timestamp.isoformat(),
+                'model': self.model, 'pk': self.object_pk, 'action': self.action,
+                'fields': self.changed_fields}
+
+    def __str__(self):
+        return '{} {} {} {}'.format(self.id, self.model, self.object_pk, self.action)
+
+
+class ProfileReport(models.Model):
+    """
+    Profile of one request of a superuser, recorded by
+    cirs.profiling.ProfilingMiddleware.
+    """
+    created = models.DateTimeField(_("Created at"), auto_now_add=True)
+    user = models.ForeignKey(User, verbose_name=_("User"), null=True,
+                             on_delete=models.SET_NULL)
+    method = models.CharField(_("Method"), max_length=8)
+    path = models.CharField(_("Path"), max_length=255)
+    status_code = models.PositiveSmallIntegerField(_("Status code"))
+    duration = models.FloatField(_("Duration (ms)"))
+    query_count = models.PositiveIntegerField(_("Queries"))
+    query_duration = models.FloatField(_("Query duration (ms)"))
+    # marshalled cProfile statistics, the format of .prof files
+    stats = models.BinaryField(_("Statistics"))
+    queries = models.JSONField(_("Queries"), default=list)
+
+    class Meta:
+        verbose_name = _("Profile report")
+        verbose_name_plural = _("Profile reports")
+        ordering = ['-created']
+
+    def __str__(self):
+        return '{} {} ({:.0f} ms)'.format(self.method, self.path, self.duration)
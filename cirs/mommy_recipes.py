@@ -27,13 +27,15 @@ REPORTER_NAME = 'rep'
 
 public_ci = Recipe(CriticalIncident,
     incident = seq('Critical Incident '),
-    public = True
+    public = True,
+    department__active = True
 )
 
 published_incident = Recipe(PublishableIncident,
     publish = True,
     critical_incident__public = True,
     critical_incident__department__label = seq('Dept_'),
+    critical_incident__department__active = True,
     critical_incident__department__reporter__user__username = seq(REPORTER_NAME),
 )
 
@@ -0,0 +1,103 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+"""
+Email digests for departments which do not want a message per event.
+
+Events are queued per recipient. ``manage.py send_notification_digests``,
+run e.g. every 10 minutes by cron, sends all events of a department as soon
+as its oldest event is older than the digest interval, combined into one
+message per recipient.
+"""
+
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.core import mail
+from django.db.models import F, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .models import NotificationEvent
+
+DIGEST_INTERVALS = OrderedDict([('hourly', timedelta(hours=1)), ('daily', timedelta(days=1))])
+
+
+def queue_notifications(department, recipients, subject):
+    return NotificationEvent.objects.bulk_create([
+        NotificationEvent(department=department, recipient=recipient, subject=subject)
+        for recipient in recipients])
+
+
+def due_events(now=None):
+    """Events of all departments with a due digest, read with one query."""
+    now = now or timezone.now()
+    mode = 'department__labcirsconfig__notification_mode'
+    # left over after switching back to immediate notifications
+    due = Q(**{mode: 'immediate'})
+    for name, interval in DIGEST_INTERVALS.items():
+        due |= Q(**{mode: name, 'first_created__lte': now - interval})
+    first_created = NotificationEvent.objects.filter(
+        department=OuterRef('department')).order_by('created').values('created')[:1]
+    return NotificationEvent.objects.annotate(
+        first_created=Subquery(first_created),
+        sender=F('department__labcirsconfig__notification_sender_email'),
+        text=F('department__labcirsconfig__notification_text'),
+    ).filter(due).select_related('recipient', 'department').order_by(
+        'recipient', 'sender', 'created', 'pk')
+
+
+def format_digest(events):
+    lines = [events[0].text, ''] if events[0].text else []
+    lines.extend('{:%Y-%m-%d %H:%M} {}: {}'.format(
+        timezone.localtime(event.created), event.department.label, event.subject)
+        for event in events)
+    return '\n'.join(lines)
+
+
+def build_digests(events):
+    """Groups events by recipient and sender, yields messages with their events."""
+    groups = OrderedDict()
+    for event in events:
+        groups.setdefault((event.recipient_id, event.sender), []).append(event)
+    for group in groups.values():
+        subject = 'LabCIRS: {} new notification{}'.format(
+            len(group), '' if len(group) == 1 else 's')
+        yield mail.EmailMessage(subject, format_digest(group), group[0].sender or None,
+                                [group[0].recipient.email]), group
+
+
+def send_digests(now=None, connection=None):
+    """
+    Sends one message per recipient for all due events and removes them.
+    Events of failed messages stay queued. Returns the number of messages.
+    """
+    sent, messages = [], 0
+    connection = connection or mail.get_connection()
+    try:
+        with connection:
+            for message, events in build_digests(due_events(now)):
+                # users without email address can not be notified anyway
+                if message.to[0]:
+                    message.connection = connection
+                    message.send()
+                    messages += 1
+                sent.extend(event.pk for event in events)
+    finally:
+        NotificationEvent.objects.filter(pk__in=sent).delete()
+    return messages
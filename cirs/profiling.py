@@ -0,0 +1,206 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+"""
+Profiling of single requests on demand, safe to keep installed in production.
+
+A superuser starts profiling in the admin (profile reports). This sets a
+signed cookie for PROFILING_MAX_AGE seconds. Alternatively the signed token is
+passed as query parameter, e.g. ?_profile=<token>, to profile one URL only.
+ProfilingMiddleware runs these requests under cProfile, records the SQL
+queries together with the code which issued them and stores a ProfileReport.
+Requests without a valid token are not affected.
+
+The number of profiled requests per user is limited by the throttle rate
+profiling:user and only the newest PROFILING_KEEP_REPORTS are kept.
+
+Under ASGI requests without a token pass the middleware on the event loop.
+Profiled requests run in a thread like under WSGI, because the profiler and
+the query recorder work per thread.
+"""
+
+import cProfile
+import io
+import marshal
+import pstats
+import time
+import traceback
+from contextlib import ExitStack
+
+from asgiref.sync import (async_to_sync, iscoroutinefunction, markcoroutinefunction,
+                          sync_to_async)
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+from django.urls import reverse
+
+from .models import ProfileReport
+from .throttling import Throttle
+
+SALT = 'cirs.profiling'
+COOKIE_NAME = 'labcirs_profile'
+QUERY_PARAMETER = '_profile'
+MAX_QUERIES = 500
+MAX_SQL_LENGTH = 2000
+# frames of LabCIRS shown as origin of a query
+ORIGIN_DEPTH = 5
+SORT_KEYS = ('cumulative', 'tottime', 'calls')
+
+
+def get_max_age():
+    return getattr(settings, 'PROFILING_MAX_AGE', 30 * 60)
+
+
+def get_token(user):
+    return signing.dumps(user.pk, salt=SALT)
+
+
+def start_profiling(response, user):
+    response.set_cookie(COOKIE_NAME, get_token(user), max_age=get_max_age(), httponly=True,
+                        secure=settings.SESSION_COOKIE_SECURE, samesite='Lax')
+    return response
+
+
+def stop_profiling(response):
+    response.delete_cookie(COOKIE_NAME, samesite='Lax')
+    return response
+
+
+def get_request_token(request):
+    return request.GET.get(QUERY_PARAMETER) or request.COOKIES.get(COOKIE_NAME)
+
+
+def is_requested(request):
+    """True if a superuser sent a valid token of their own."""
+    token = get_request_token(request)
+    if not token or not request.user.is_superuser:
+        return False
+    try:
+        return signing.loads(token, salt=SALT, max_age=get_max_age()) == request.user.pk
+    except signing.BadSignature:
+        return False
+
+
+def get_origin():
+    """The innermost frames of LabCIRS code in the current stack."""
+    frames = [frame for frame in traceback.extract_stack()[:-2]
+              if frame.filename.startswith(settings.BASE_DIR)
+              and 'site-packages' not in frame.filename
+              and not frame.filename.endswith('profiling.py')]
+    return ['{}:{} in {}'.format(frame.filename[len(settings.BASE_DIR) + 1:], frame.lineno,
+                                 frame.name) for frame in frames[-ORIGIN_DEPTH:]]
+
+
+class QueryRecorder(object):
+    """Execute wrapper which records the queries of all connections."""
+
+    def __init__(self):
+        self.queries = []
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            self.count += 1
+            self.duration += duration
+            if len(self.queries) < MAX_QUERIES:
+                self.queries.append({'sql': sql[:MAX_SQL_LENGTH], 'duration': round(duration, 3),
+                                     'origin': get_origin()})
+
+
+class _LoadedProfile(object):
+    # the interface pstats.Stats expects from a profiler
+    def __init__(self, data):
+        self.stats = marshal.loads(data)
+
+    def create_stats(self):
+        pass
+
+
+def format_stats(report, sort=SORT_KEYS[0], limit=40):
+    """Returns the functions with the highest times as text like pstats prints it."""
+    stream = io.StringIO()
+    stats = pstats.Stats(_LoadedProfile(bytes(report.stats)), stream=stream)
+    stats.sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+
+def prune_reports(keep=None):
+    keep = getattr(settings, 'PROFILING_KEEP_REPORTS', 50) if keep is None else keep
+    outdated = list(ProfileReport.objects.values_list('pk', flat=True)[keep:])
+    if outdated:
+        ProfileReport.objects.filter(pk__in=outdated).delete()
+
+
+class ProfilingMiddleware(object):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.handle(request, self.get_response)
+
+    async def __acall__(self, request):
+        # checked first to avoid a thread for the user lookup
+        if not get_request_token(request):
+            return await self.get_response(request)
+        return await sync_to_async(self.handle)(request, async_to_sync(self.get_response))
+
+    def handle(self, request, get_response):
+        if not is_requested(request):
+            return get_response(request)
+        throttle = Throttle('profiling', user=request.user.pk)
+        if throttle.get_retry_after():
+            return get_response(request)
+        throttle.consume()
+        return self.profile(request, get_response)
+
+    def profile(self, request, get_response):
+        recorder = QueryRecorder()
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            profiler.enable()
+            try:
+                response = get_response(request)
+            finally:
+                profiler.disable()
+        duration = (time.perf_counter() - start) * 1000
+        profiler.create_stats()
+        report = ProfileReport.objects.create(
+            user=request.user, method=request.method, path=request.path[:255],
+            status_code=response.status_code, duration=duration,
+            query_count=recorder.count, query_duration=recorder.duration,
+            stats=marshal.dumps(profiler.stats), queries=recorder.queries)
+        prune_reports()
+        response['X-Profile-Report'] = reverse('admin:cirs_profilereport_change',
+                                               args=[report.pk])
+        return response
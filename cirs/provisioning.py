@@ -0,0 +1,207 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+"""
+Creation of departments together with their reporter users, reviewers and
+configurations.
+
+Everything is created with a few batched queries inside one transaction,
+so either all departments are provisioned completely or none at all.
+bulk_create does not send post_save, thus configurations are created here
+instead of by create_config_for_department.
+"""
+
+import csv
+
+from django.contrib.auth.models import Permission, User
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils.crypto import get_random_string
+
+from .changelog import record_bulk_changes
+from .models import Department, LabCIRSConfig, Reporter, Reviewer
+
+BATCH_SIZE = 500
+REQUIRED_COLUMNS = ('label', 'name', 'reporter')
+
+
+def read_department_specs(stream):
+    """
+    Reads departments from CSV with the columns label, name, reporter,
+    reporter_password, reviewers and active. Reviewers are separated by
+    semicolons, new reviewers may be given as username:email.
+    """
+    reader = csv.DictReader(stream)
+    missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or ())]
+    if missing:
+        raise ValidationError('Missing columns: {}.'.format(', '.join(missing)))
+    for row in reader:
+        reviewers = []
+        for entry in (row.get('reviewers') or '').split(';'):
+            if entry.strip():
+                username, _, email = entry.strip().partition(':')
+                reviewers.append((username, email))
+        yield {
+            'label': (row['label'] or '').strip(),
+            'name': (row['name'] or '').strip(),
+            'reporter': (row['reporter'] or '').strip().lower(),
+            'reporter_password': row.get('reporter_password') or None,
+            'reviewers': reviewers,
+            'active': (row.get('active') or 'true').strip().lower() in ('1', 'true', 'yes'),
+        }
+
+
+def _duplicates(values):
+    seen = set()
+    return set(value for value in values if value in seen or seen.add(value))
+
+
+def _field_errors(instance, exclude, prefix):
+    # the same validation as in the admin forms, uniqueness is checked below
+    # with one query for all specs
+    try:
+        instance.full_clean(exclude=exclude, validate_unique=False)
+    except ValidationError as error:
+        return ['{} {}: {}'.format(prefix, field, message)
+                for field, field_messages in error.message_dict.items()
+                for message in field_messages]
+    return []
+
+
+def check_specs(specs):
+    """Raises ValidationError before anything is written to the database."""
+    errors = []
+    for spec in specs:
+        errors += _field_errors(
+            Department(label=spec['label'], name=spec['name'], active=spec.get('active', True)),
+            ['reporter'], 'Department "{}"'.format(spec['label']))
+        errors += _field_errors(User(username=spec['reporter']), ['password'],
+                                'Reporter "{}"'.format(spec['reporter']))
+        for username, email in spec['reviewers']:
+            errors += _field_errors(User(username=username, email=email), ['password'],
+                                    'Reviewer "{}"'.format(username))
+    for key in ('label', 'name', 'reporter'):
+        for value in _duplicates(spec[key] for spec in specs):
+            errors.append('{} "{}" is used more than once.'.format(key, value))
+    labels = [spec['label'] for spec in specs]
+    names = [spec['name'] for spec in specs]
+    reporters = set(spec['reporter'] for spec in specs)
+    for label in Department.objects.filter(label__in=labels).values_list('label', flat=True):
+        errors.append('Department with label "{}" already exists.'.format(label))
+    for name in Department.objects.filter(name__in=names).values_list('name', flat=True):
+        errors.append('Department with name "{}" already exists.'.format(name))
+    for username in User.objects.filter(username__in=reporters).values_list('username', flat=True):
+        errors.append('User "{}" already exists.'.format(username))
+    reviewers = set(username for spec in specs for username, _ in spec['reviewers'])
+    for username in reviewers & reporters:
+        errors.append('User "{}" cannot be reporter and reviewer.'.format(username))
+    for user in User.objects.filter(username__in=reviewers).select_related('reporter'):
+        if user.is_superuser or hasattr(user, 'reporter'):
+            errors.append('User "{}" cannot become reviewer.'.format(user.username))
+    if errors:
+        raise ValidationError(errors)
+
+
+def ensure_reviewers(reviewers):
+    """
+    Returns reviewers for (username, email) pairs. Missing users are created
+    without usable password, they have to reset it before the first login.
+    """
+    usernames = set(username for username, _ in reviewers)
+    emails = dict(reviewers)
+    existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+    new_users = []
+    for username in sorted(usernames - existing):
+        user = User(username=username, email=emails[username])
+        user.set_unusable_password()
+        new_users.append(user)
+    User.objects.bulk_create(new_users, batch_size=BATCH_SIZE)
+    users = User.objects.filter(username__in=usernames)
+    Reviewer.objects.bulk_create(
+        [Reviewer(user=user) for user in users.filter(reviewer=None)], batch_size=BATCH_SIZE)
+    # what Reviewer.save does for a single reviewer
+    users.update(is_staff=True)
+    through = User.user_permissions.through
+    permissions = Permission.objects.filter(codename__in=Reviewer.REVIEWER_PERM_CODES)
+    through.objects.bulk_create(
+        [through(user_id=user_id, permission_id=permission.id)
+         for user_id in users.values_list('id', flat=True) for permission in permissions],
+        batch_size=BATCH_SIZE, ignore_conflicts=True)
+    return {reviewer.user.username: reviewer for reviewer in
+            Reviewer.objects.filter(user__username__in=usernames).select_related('user')}
+
+
+@transaction.atomic
+def provision_departments(specs):
+    """
+    Creates departments from specs (see read_department_specs) and returns
+    them as list of (department, reporter password) tuples. The password is
+    generated if the spec does not contain one.
+    """
+    specs = list(specs)
+    check_specs(specs)
+    passwords = {}
+    reporter_users = []
+    for spec in specs:
+        password = spec.get('reporter_password') or get_random_string(12)
+        passwords[spec['label']] = password
+        user = User(username=spec['reporter'], is_active=spec.get('active', True))
+        user.set_password(password)
+        reporter_users.append(user)
+    User.objects.bulk_create(reporter_users, batch_size=BATCH_SIZE)
+    # fetch again, not all databases return primary keys from bulk_create
+    users = User.objects.filter(username__in=[spec['reporter'] for spec in specs])
+    Reporter.objects.bulk_create([Reporter(user=user) for user in users], batch_size=BATCH_SIZE)
+    reporters = {reporter.user.username: reporter for reporter in
+                 Reporter.objects.filter(user__in=users).select_related('user')}
+
+    Department.objects.bulk_create(
+        [Department(label=spec['label'], name=spec['name'], active=spec.get('active', True),
+                    reporter=reporters[spec['reporter']]) for spec in specs],
+        batch_size=BATCH_SIZE)
+    departments = Department.objects.filter(label__in=[spec['label'] for spec in specs])
+    LabCIRSConfig.objects.bulk_create(
+        [LabCIRSConfig(department=department) for department in departments],
+        batch_size=BATCH_SIZE)
+
+    departments = {department.label: department for department in departments}
+    reviewers = ensure_reviewers(
+        [reviewer for spec in specs for reviewer in spec.get('reviewers', [])])
+    through = Department.reviewers.through
+    through.objects.bulk_create(
+        [through(department_id=departments[spec['label']].pk,
+                 reviewer_id=reviewers[username].pk)
+         for spec in specs for username, _ in spec.get('reviewers', [])],
+        batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+    record_bulk_changes(
+        Department.objects.filter(pk__in=[dept.pk for dept in departments.values()]),
+        [field.name for field in Department._meta.concrete_fields] + ['reviewers'], 'created')
+    return [(departments[spec['label']], passwords[spec['label']]) for spec in specs]
+
+
+def provision_department(label, name, reporter, reporter_password=None, reviewers=(),
+                         active=True):
+    """Single department version of provision_departments."""
+    return provision_departments([{
+        'label': label, 'name': name, 'reporter': reporter,
+        'reporter_password': reporter_password, 'active': active,
+        'reviewers': [(user.username, user.email) if isinstance(user, User) else (user, '')
+                      for user in reviewers],
+    }])[0]
@@ -0,0 +1,126 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+"""
+Routing of read-only requests to a read replica of the database.
+
+Reads go to the replica only during GET requests to views marked with
+replica_allowed and to admin changelists. Everything else uses the primary
+(default) database: writes, reads after a write in the same request, reads
+inside transactions and sessions. After a client wrote, a cookie keeps its
+requests on the primary for REPLICA_PIN_SECONDS, so it sees its own changes
+despite the replication lag.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_ALIAS = 'replica'
+PIN_COOKIE = 'labcirs_primary'
+
+_replica_reads = ContextVar('replica_reads', default=False)
+_wrote = ContextVar('wrote', default=False)
+
+
+def replica_allowed(view_func):
+    """Marks a view which only reads and may use slightly outdated data."""
+    view_func.replica_allowed = True
+    return view_func
+
+
+@contextmanager
+def replica_reads():
+    """Sends reads to the replica until the first write."""
+    reads_token, wrote_token = _replica_reads.set(True), _wrote.set(False)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(reads_token)
+        _wrote.reset(wrote_token)
+
+
+class ReplicaRouter(object):
+
+    def db_for_read(self, model, **hints):
+        if (_replica_reads.get() and model._meta.app_label != 'sessions'
+                and not connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return REPLICA_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        _replica_reads.set(False)
+        _wrote.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # the replica gets its schema from the primary
+        return db != REPLICA_ALIAS
+
+
+class ReplicaMiddleware(object):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        reads_token, wrote_token = _replica_reads.set(False), _wrote.set(False)
+        try:
+            return self.pin(request, self.get_response(request))
+        finally:
+            _replica_reads.reset(reads_token)
+            _wrote.reset(wrote_token)
+
+    async def __acall__(self, request):
+        reads_token, wrote_token = _replica_reads.set(False), _wrote.set(False)
+        try:
+            return self.pin(request, await self.get_response(request))
+        finally:
+            _replica_reads.reset(reads_token)
+            _wrote.reset(wrote_token)
+
+    def pin(self, request, response):
+        if _wrote.get() or request.method not in ('GET', 'HEAD'):
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=getattr(settings, 'REPLICA_PIN_SECONDS', 10),
+                secure=settings.SESSION_COOKIE_SECURE, httponly=True, samesite='Lax')
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (request.method in ('GET', 'HEAD') and PIN_COOKIE not in request.COOKIES
+                and self.is_read_only(request, view_func)):
+            _replica_reads.set(True)
+
+    def is_read_only(self, request, view_func):
+        match = request.resolver_match
+        return (getattr(view_func, 'replica_allowed', False)
+                or ('admin' in match.app_names and match.url_name is not None
+                    and match.url_name.endswith('_changelist')))
@@ -0,0 +1,162 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+"""
+Fingerprinted and precompressed static files.
+
+collectstatic stores every file with the hash of its content in the name
+(css/signin.55e7cf7a.css) together with a gzip (.gz) and, if the brotli
+package is installed, a brotli (.br) variant. Web servers can deliver the
+variants directly, e.g. Apache with mod_rewrite or nginx with gzip_static.
+Without such a server serve_static can deliver them if SERVE_STATIC is set.
+"""
+
+import gzip
+import mimetypes
+import os
+import re
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import (ManifestStaticFilesStorage,
+                                                staticfiles_storage)
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.json', '.map', '.svg', '.txt', '.html',
+                           '.xml', '.eot', '.ttf')
+# variants saving less are not worth an additional file
+MIN_SAVING = 0.05
+# hashed names never change their content
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+# encoding: (extension, compress function), preferred first
+ENCODINGS = {}
+if brotli is not None:
+    ENCODINGS['br'] = ('.br', brotli.compress)
+ENCODINGS['gzip'] = ('.gz', lambda data: gzip.compress(data, mtime=0))
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def stored_name(self, name):
+        # Without collectstatic (development, tests) or for files which do not
+        # exist, e.g. DataTables translations of some languages, the plain
+        # name is used instead of breaking the page.
+        try:
+            return super(CompressedManifestStaticFilesStorage, self).stored_name(name)
+        except ValueError:
+            return name
+
+    def hashed_name(self, name, content=None, filename=None):
+        # Third party CSS refers to files not shipped with LabCIRS, e.g. unused
+        # jQuery UI icons. These references are kept instead of failing.
+        if content is None and not self.exists(urlsplit(unquote(name)).path.strip()):
+            return name
+        return super(CompressedManifestStaticFilesStorage, self).hashed_name(
+            name, content, filename)
+
+    def post_process(self, paths, dry_run=False, **options):
+        hashed_names = set()
+        for name, hashed_name, processed in super(
+                CompressedManifestStaticFilesStorage, self).post_process(
+                    paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names.update((name, hashed_name))
+            yield name, hashed_name, processed
+        if not dry_run:
+            for name in sorted(hashed_names):
+                for compressed_name in self.compress(name):
+                    yield name, compressed_name, True
+
+    def compress(self, name):
+        """Writes the compressed variants of name and returns their names."""
+        if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+            return []
+        path = self.path(name)
+        with open(path, 'rb') as source:
+            data = source.read()
+        names = []
+        for extension, compress in ENCODINGS.values():
+            compressed = compress(data)
+            if len(compressed) <= len(data) * (1 - MIN_SAVING):
+                with open(path + extension, 'wb') as target:
+                    target.write(compressed)
+                names.append(name + extension)
+            elif os.path.exists(path + extension):
+                os.remove(path + extension)
+        return names
+
+
+def get_accepted_encodings(request):
+    """Returns the content codings accepted by the client, ignoring q=0."""
+    accepted = set()
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, params = item.strip().partition(';')
+        if not re.match(r'^\s*q\s*=\s*0(\.0*)?\s*$', params):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def is_hashed(path):
+    return path in getattr(staticfiles_storage, 'hashed_files', {}).values()
+
+
+@require_safe
+def serve_static(request, path):
+    """
+    Delivers collected static files with their precompressed variant, if the
+    client accepts it. Fingerprinted files are cached by clients for a year.
+    """
+    try:
+        fullpath = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404('Invalid path')
+    if not os.path.isfile(fullpath):
+        raise Http404('File not found')
+    stat = os.stat(fullpath)
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime):
+        return HttpResponseNotModified()
+    content_type, _ = mimetypes.guess_type(fullpath)
+    accepted = get_accepted_encodings(request)
+    encoding = None
+    for coding, (extension, _) in ENCODINGS.items():
+        if coding in accepted and os.path.isfile(fullpath + extension):
+            encoding, fullpath = coding, fullpath + extension
+            break
+    response = FileResponse(open(fullpath, 'rb'),
+                            content_type=content_type or 'application/octet-stream')
+    if encoding:
+        response['Content-Encoding'] = encoding
+    if path.endswith(COMPRESSIBLE_EXTENSIONS):
+        response['Vary'] = 'Accept-Encoding'
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    if is_hashed(path):
+        response['Cache-Control'] = 'public, max-age={}, immutable'.format(IMMUTABLE_MAX_AGE)
+    else:
+        response['Cache-Control'] = 'no-cache'
+    return response
@@ -0,0 +1,74 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from model_mommy import mommy
+
+from cirs.models import PublishableIncident
+
+
+# parler caches translations by ids, which are reused after rollbacks
+@override_settings(CACHES={'default': {
+    'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+class CriticalIncidentChangeListTest(TestCase):
+
+    url = reverse('admin:cirs_criticalincident_changelist')
+
+    def setUp(self):
+        self.dept = mommy.make_recipe('cirs.department')
+        self.reviewer = mommy.make_recipe('cirs.reviewer')
+        self.dept.reviewers.add(self.reviewer)
+        self.client.force_login(self.reviewer.user)
+
+    def make_incident(self, **kwargs):
+        return mommy.make_recipe('cirs.public_ci', department=self.dept, **kwargs)
+
+    def test_long_texts_are_not_loaded(self):
+        self.make_incident(incident='x' * 500)
+        response = self.client.get(self.url)
+        incident = response.context['cl'].result_list[0]
+        self.assertTrue({'incident', 'reason', 'action'} <= incident.get_deferred_fields())
+        self.assertContains(response, 'x' * 80 + '…')
+        self.assertNotContains(response, 'x' * 81)
+
+    def test_department_filter_offers_only_own_departments(self):
+        second = mommy.make_recipe('cirs.department')
+        second.reviewers.add(self.reviewer)
+        other = mommy.make_recipe('cirs.department')
+        response = self.client.get(self.url)
+        spec = [spec for spec in response.context['cl'].filter_specs
+                if getattr(spec, 'field_path', None) == 'department'][0]
+        self.assertEqual(set(spec.lookup_choices), {(self.dept.pk, self.dept.label),
+                                                    (second.pk, second.label)})
+        self.assertNotContains(response, other.label)
+
+    def test_has_publishable_incident_filter(self):
+        published = self.make_incident(status='completed')
+        PublishableIncident.objects.create(critical_incident=published, incident='Published')
+        unpublished = self.make_incident()
+        for value, incident in (('1', published), ('0', unpublished)):
+            response = self.client.get(self.url, {'has_publishable_incident': value})
+            self.assertEqual(list(response.context['cl'].result_list), [incident])
+
+    def test_full_result_count_is_not_computed(self):
+        self.make_incident()
+        response = self.client.get(self.url, {'status__exact': 'new'})
+        self.assertIsNone(response.context['cl'].full_result_count)
+        self.assertEqual(response.context['cl'].result_count, 1)
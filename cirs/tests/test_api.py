@@ -0,0 +1,142 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+from unittest import mock
+
+from django.core.handlers import base
+from django.test import AsyncClient, TestCase
+from django.urls import reverse
+from model_mommy import mommy
+
+from cirs.models import APIToken, PublishableIncident
+
+
+class PublishableIncidentAPITest(TestCase):
+
+    def setUp(self):
+        self.dept = mommy.make_recipe('cirs.department')
+        self.token = APIToken.objects.create(name='Intranet', department=self.dept)
+        self.url = reverse('api_incidents', kwargs={'dept': self.dept.label})
+        self.auth = {'HTTP_AUTHORIZATION': 'Token {}'.format(self.token.key)}
+
+    def make_incidents(self, quantity, dept=None, publish=True):
+        incidents = []
+        for i in range(quantity):
+            ci = mommy.make_recipe('cirs.public_ci', department=dept or self.dept)
+            incidents.append(PublishableIncident.objects.create(
+                critical_incident=ci, incident='Incident {}'.format(i), publish=publish))
+        return incidents
+
+    def test_token_is_generated_on_creation(self):
+        self.assertEqual(len(self.token.key), 40)
+
+    def test_request_without_token_is_unauthorized(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+
+    def test_inactive_token_is_unauthorized(self):
+        self.token.active = False
+        self.token.save()
+        response = self.client.get(self.url, **self.auth)
+        self.assertEqual(response.status_code, 401)
+
+    def test_token_is_scoped_to_its_department(self):
+        other_dept = mommy.make_recipe('cirs.department')
+        response = self.client.get(
+            reverse('api_incidents', kwargs={'dept': other_dept.label}), **self.auth)
+        self.assertEqual(response.status_code, 404)
+
+    def test_only_published_incidents_of_department_are_listed(self):
+        published = self.make_incidents(2)
+        self.make_incidents(1, publish=False)
+        self.make_incidents(1, dept=mommy.make_recipe('cirs.department'))
+        response = self.client.get(self.url, **self.auth)
+        self.assertEqual([item['id'] for item in response.json()['results']],
+                         [incident.id for incident in published])
+        self.assertEqual(response.json()['results'][0]['incident'], 'Incident 0')
+
+    def test_keyset_pagination_follows_next_link(self):
+        incidents = self.make_incidents(5)
+        response = self.client.get(self.url, {'limit': 2}, **self.auth)
+        ids = [item['id'] for item in response.json()['results']]
+        while response.json()['next'] is not None:
+            response = self.client.get(response.json()['next'], **self.auth)
+            ids.extend(item['id'] for item in response.json()['results'])
+        self.assertEqual(ids, [incident.id for incident in incidents])
+
+    def test_after_returns_only_newer_incidents(self):
+        incidents = self.make_incidents(3)
+        response = self.client.get(self.url, {'after': incidents[0].id}, **self.auth)
+        self.assertEqual([item['id'] for item in response.json()['results']],
+                         [incident.id for incident in incidents[1:]])
+
+    def test_conditional_get_returns_not_modified(self):
+        self.make_incidents(2)
+        response = self.client.get(self.url, **self.auth)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'], **self.auth)
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_after_publishing(self):
+        incident = self.make_incidents(1, publish=False)[0]
+        etag = self.client.get(self.url, **self.auth)['ETag']
+        incident.publish = True
+        incident.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag, **self.auth)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_changes_after_critical_incident_changed(self):
+        incident = self.make_incidents(1)[0]
+        etag = self.client.get(self.url, **self.auth)['ETag']
+        ci = incident.critical_incident
+        ci.date = ci.date.replace(year=ci.date.year - 1)
+        ci.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag, **self.auth)
+        self.assertEqual(response.status_code, 200)
+
+    def test_invalid_pagination_parameters_are_bad_request(self):
+        for params in ({'after': 'x'}, {'limit': '1.5'}):
+            response = self.client.get(self.url, params, **self.auth)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()['detail'], 'Invalid pagination parameters.')
+        response = self.client.get(reverse('api_changes', kwargs={'dept': self.dept.label}),
+                                   {'since': 'x'}, **self.auth)
+        self.assertEqual(response.status_code, 400)
+
+    def test_unsupported_language_is_not_found(self):
+        response = self.client.get(self.url, {'language': 'xx'}, **self.auth)
+        self.assertEqual(response.status_code, 404)
+
+    def test_post_is_not_allowed(self):
+        response = self.client.post(self.url, **self.auth)
+        self.assertEqual(response.status_code, 405)
+
+    async def test_incidents_are_listed_by_asgi_handler(self):
+        response = await self.async_client.get(
+            self.url, headers={'authorization': 'Token {}'.format(self.token.key)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [])
+        self.assertTrue(response.has_header('ETag'))
+
+    async def test_view_runs_on_event_loop_under_asgi(self):
+        # A synchronous middleware makes Django wrap the rest of the chain
+        # with async_to_sync, which blocks a thread for the whole request.
+        with mock.patch.object(base, 'async_to_sync', wraps=base.async_to_sync) as adapter:
+            response = await AsyncClient().get(
+                self.url, headers={'authorization': 'Token {}'.format(self.token.key)})
+        self.assertEqual(response.status_code, 200)
+        adapter.assert_not_called()
@@ -0,0 +1,161 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from model_mommy import mommy
+
+from cirs.archive import IncidentArchiver
+from cirs.importers import IncidentImporter, read_rows
+from cirs.models import (ArchivedIncident, Comment, CriticalIncident,
+                         PublishableIncident, generate_comment_codes)
+
+OLD = date.today() - timedelta(days=3 * 365)
+
+
+class ArchiveTest(TestCase):
+
+    def setUp(self):
+        # parler caches translations by ids, which are reused after rollbacks
+        cache.clear()
+        self.dept = mommy.make_recipe('cirs.department')
+        self.reviewer = mommy.make_recipe('cirs.reviewer')
+        self.dept.reviewers.add(self.reviewer)
+
+    def make_incident(self, reported=OLD, status='completed', **kwargs):
+        return mommy.make_recipe('cirs.public_ci', department=self.dept, reported=reported,
+                                 status=status, category=['other'], **kwargs)
+
+    def archive(self, **kwargs):
+        return IncidentArchiver(date.today() - timedelta(days=365), **kwargs).run()
+
+    def test_old_completed_incidents_are_moved_with_comments(self):
+        incident = self.make_incident()
+        Comment.objects.create(critical_incident=incident, author=self.reviewer.user,
+                               text='Done', status='closed')
+        self.make_incident(status='in process')
+        self.make_incident(reported=date.today())
+        self.assertEqual(self.archive(), 1)
+        self.assertFalse(CriticalIncident.objects.filter(pk=incident.pk).exists())
+        archived = ArchivedIncident.objects.get(pk=incident.pk)
+        self.assertEqual(archived.comment_code, incident.comment_code)
+        self.assertEqual(archived.comments.get().text, 'Done')
+        self.assertEqual(CriticalIncident.objects.count(), 2)
+
+    def test_archived_comment_codes_are_not_generated_again(self):
+        incident = self.make_incident()
+        self.archive()
+        with mock.patch('cirs.models.get_random_string',
+                        side_effect=[incident.comment_code, 'newcode1']):
+            self.assertEqual(generate_comment_codes(1), ['newcode1'])
+
+    def test_published_incidents_stay(self):
+        published = self.make_incident()
+        PublishableIncident.objects.create(critical_incident=published, publish=True,
+                                           incident='Published')
+        self.assertEqual(self.archive(), 0)
+        self.client.force_login(self.dept.reporter.user)
+        response = self.client.get(reverse('incidents_for_department',
+                                           kwargs={'dept': self.dept.label}))
+        self.assertContains(response, 'Published')
+
+    def test_unpublished_translations_are_kept(self):
+        incident = self.make_incident()
+        PublishableIncident.objects.create(critical_incident=incident, publish=False,
+                                           incident='Draft')
+        self.archive()
+        data = ArchivedIncident.objects.get().publishable_incident
+        self.assertFalse(data['publish'])
+        self.assertEqual(data['translations'][0]['fields']['incident'], 'Draft')
+        self.assertEqual(PublishableIncident.objects.count(), 0)
+
+    def test_incidents_are_archived_in_batches(self):
+        for _ in range(5):
+            self.make_incident()
+        batches = []
+        self.archive(batch_size=2, progress=lambda archiver: batches.append(archiver.archived))
+        self.assertEqual(batches, [2, 4, 5])
+
+    def test_command_dry_run_only_counts(self):
+        self.make_incident()
+        out = StringIO()
+        call_command('archive_incidents', '--older-than', '365', '--dry-run', stdout=out)
+        self.assertIn('1 incidents', out.getvalue())
+        self.assertEqual(ArchivedIncident.objects.count(), 0)
+
+    def test_command_accepts_date(self):
+        self.make_incident()
+        call_command('archive_incidents', '--older-than', OLD.isoformat(), stdout=StringIO())
+        self.assertEqual(ArchivedIncident.objects.count(), 0)
+        call_command('archive_incidents', '--older-than',
+                     (OLD + timedelta(days=1)).isoformat(), stdout=StringIO())
+        self.assertEqual(ArchivedIncident.objects.count(), 1)
+
+    def test_reviewers_get_view_permission(self):
+        self.assertTrue(self.reviewer.user.user_permissions.filter(
+            codename='view_archivedincident').exists())
+
+    def test_admin_is_read_only_for_reviewer(self):
+        self.make_incident()
+        self.archive()
+        archived = ArchivedIncident.objects.get()
+        self.client.force_login(self.reviewer.user)
+        response = self.client.get(reverse('admin:cirs_archivedincident_change',
+                                           args=[archived.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'name="_save"')
+        response = self.client.post(reverse('admin:cirs_archivedincident_delete',
+                                            args=[archived.pk]), {'post': 'yes'})
+        self.assertEqual(response.status_code, 403)
+
+    def test_admin_shows_only_own_departments(self):
+        self.make_incident()
+        self.archive()
+        other = mommy.make_recipe('cirs.reviewer')
+        other_depts = mommy.make_recipe('cirs.department', _quantity=2)
+        other.departments.add(*other_depts)
+        self.client.force_login(other.user)
+        response = self.client.get(reverse('admin:cirs_archivedincident_changelist'))
+        self.assertEqual(response.context['cl'].result_count, 0)
+        # the department filter does not reveal other departments
+        choices = [pk for spec in response.context['cl'].filter_specs
+                   for pk, _name in getattr(spec, 'lookup_choices', [])]
+        self.assertEqual(sorted(choices), sorted(dept.pk for dept in other_depts))
+
+    def test_csv_export_can_be_imported(self):
+        incident = self.make_incident()
+        Comment.objects.create(critical_incident=incident, author=self.reviewer.user,
+                               text='Done', status='closed')
+        self.archive()
+        self.client.force_login(self.reviewer.user)
+        response = self.client.post(reverse('admin:cirs_archivedincident_changelist'), {
+            'action': 'export_csv', '_selected_action': [incident.pk]})
+        rows = list(read_rows(StringIO(response.content.decode()), 'csv'))
+        importer = IncidentImporter(self.dept).run(rows)
+        self.assertEqual(importer.errors, [])
+        imported = CriticalIncident.objects.get()
+        self.assertEqual(imported.incident, incident.incident)
+        self.assertEqual(imported.comments.get().text, 'Done')
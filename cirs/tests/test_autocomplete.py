@@ -0,0 +1,88 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+from django.test import TestCase
+from django.urls import reverse
+from model_mommy import mommy
+
+from cirs.models import PublishableIncident
+
+from .helpers import create_user
+
+
+class AutocompleteTest(TestCase):
+
+    url = reverse('admin:autocomplete')
+
+    def setUp(self):
+        self.dept = mommy.make_recipe('cirs.department')
+        self.reviewer = mommy.make_recipe('cirs.reviewer')
+        self.dept.reviewers.add(self.reviewer)
+
+    def get_ids(self, model_name, field_name, **params):
+        response = self.client.get(self.url, dict(
+            app_label='cirs', model_name=model_name, field_name=field_name, **params))
+        self.assertEqual(response.status_code, 200)
+        return [int(result['id']) for result in response.json()['results']]
+
+    def make_incident(self, dept=None, status='in process', **kwargs):
+        return mommy.make_recipe('cirs.public_ci', department=dept or self.dept,
+                                 status=status, **kwargs)
+
+    def test_incidents_for_publishing_are_scoped_to_own_departments(self):
+        incident = self.make_incident(incident='Broken flask')
+        self.make_incident(incident='Broken pipe', dept=mommy.make_recipe('cirs.department'))
+        self.make_incident(incident='Broken glass', status='new')
+        published = self.make_incident(incident='Broken window')
+        PublishableIncident.objects.create(critical_incident=published, incident='Window')
+        self.client.force_login(self.reviewer.user)
+        self.assertEqual(self.get_ids('publishableincident', 'critical_incident', term='Broken'),
+                         [incident.pk])
+
+    def test_results_are_paginated(self):
+        for _ in range(25):
+            self.make_incident()
+        self.client.force_login(self.reviewer.user)
+        response = self.client.get(self.url, {
+            'app_label': 'cirs', 'model_name': 'publishableincident',
+            'field_name': 'critical_incident'})
+        self.assertEqual(len(response.json()['results']), 20)
+        self.assertTrue(response.json()['pagination']['more'])
+
+    def test_notification_recipients_are_reviewers_of_own_departments(self):
+        mommy.make_recipe('cirs.reviewer')
+        self.client.force_login(self.reviewer.user)
+        self.assertEqual(self.get_ids('labcirsconfig', 'notification_recipients'),
+                         [self.reviewer.user.pk])
+
+    def test_only_unassigned_users_are_offered_for_roles(self):
+        user = create_user('free')
+        self.client.force_login(create_user('admin', superuser=True))
+        self.assertEqual(self.get_ids('reviewer', 'user'), [user.pk])
+
+    def test_only_unassigned_reporters_are_offered_for_departments(self):
+        reporter = mommy.make_recipe('cirs.reporter', user__username='free')
+        self.client.force_login(create_user('admin', superuser=True))
+        self.assertEqual(self.get_ids('department', 'reporter'), [reporter.pk])
+
+    def test_publishable_incident_form_renders_autocomplete(self):
+        self.make_incident()
+        self.client.force_login(self.reviewer.user)
+        response = self.client.get(reverse('admin:cirs_publishableincident_add'))
+        self.assertContains(response, 'admin-autocomplete')
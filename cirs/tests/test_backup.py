@@ -0,0 +1,245 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+import io
+import os
+import shutil
+import tempfile
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from model_mommy import mommy
+
+from cirs.archive import move_to_archive
+from cirs.backup import BackupError, export_department, import_department
+from cirs.models import (ArchivedIncident, ChangeLogEntry, Comment, CriticalIncident,
+                         Department, LabCIRSConfig, PublishableIncident, Reporter)
+
+from .helpers import create_role, create_user
+
+
+class DepartmentBackupTest(TestCase):
+
+    def setUp(self):
+        # parler caches translations by ids, which are reused after rollbacks
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(shutil.rmtree, self.media_root)
+
+        self.dept = mommy.make_recipe('cirs.department', name='Lab')
+        self.reviewer = mommy.make_recipe('cirs.reviewer')
+        self.dept.reviewers.add(self.reviewer)
+        config = self.dept.labcirsconfig
+        config.set_current_language('en')
+        config.login_info = 'Ask the lab manager'
+        config.notification_text = 'New incident'
+        config.save()
+        config.notification_recipients.add(self.reviewer.user)
+
+        self.incidents = mommy.make_recipe('cirs.public_ci', department=self.dept, _quantity=3)
+        self.incidents[0].photo.save('photo.jpg', ContentFile(b'jpeg data'))
+        self.commenter = create_user('commenter')
+        Comment.objects.create(critical_incident=self.incidents[0], author=self.commenter,
+                               text='Reviewed')
+        Comment.objects.create(critical_incident=self.incidents[1],
+                               author=self.reviewer.user, text='Done', status='closed')
+        publishable = PublishableIncident(critical_incident=self.incidents[1], publish=True)
+        publishable.set_current_language('en')
+        publishable.incident = 'Published incident'
+        publishable.save()
+
+    def export(self):
+        archive = io.BytesIO()
+        export_department(self.dept, archive)
+        archive.seek(0)
+        return archive
+
+    def remove_department(self):
+        """Simulates a restore into another installation."""
+        users = [self.dept.reporter.user, self.reviewer.user, self.commenter]
+        ArchivedIncident.objects.all().delete()
+        PublishableIncident.objects.all().delete()
+        Comment.objects.all().delete()
+        CriticalIncident.objects.all().delete()
+        LabCIRSConfig.objects.all().delete()
+        Department.objects.all().delete()
+        Reporter.objects.all().delete()
+        self.reviewer.delete()
+        for user in users:
+            user.delete()
+        shutil.rmtree(self.media_root)
+
+    def test_restored_department_equals_exported_one(self):
+        archive = self.export()
+        old_codes = sorted(incident.comment_code for incident in self.incidents)
+        self.remove_department()
+        restorer = import_department(archive)
+
+        dept = Department.objects.get()
+        self.assertEqual((dept.label, dept.name), (self.dept.label, 'Lab'))
+        self.assertEqual(dept.reviewers.get().user.username, self.reviewer.user.username)
+        config = dept.labcirsconfig
+        self.assertEqual(config.safe_translation_getter('login_info', language_code='en'),
+                         'Ask the lab manager')
+        self.assertEqual(config.notification_recipients.get().username,
+                         self.reviewer.user.username)
+        self.assertEqual(sorted(dept.criticalincident_set.values_list(
+            'comment_code', flat=True)), old_codes)
+        self.assertEqual(restorer.renewed_codes, 0)
+        self.assertEqual(
+            sorted(Comment.objects.values_list('author__username', 'text', 'status')),
+            [('commenter', 'Reviewed', 'open'), (self.reviewer.user.username, 'Done', 'closed')])
+        publishable = PublishableIncident.objects.get()
+        self.assertEqual(publishable.safe_translation_getter('incident', language_code='en'),
+                         'Published incident')
+        self.assertEqual(publishable.critical_incident.comments.get().text, 'Done')
+
+    def test_photos_are_restored(self):
+        archive = self.export()
+        self.remove_department()
+        import_department(archive)
+        incident = CriticalIncident.objects.exclude(photo='').get()
+        with incident.photo.open() as photo:
+            self.assertEqual(photo.read(), b'jpeg data')
+
+    def test_archived_incidents_are_restored_with_comments(self):
+        archived = mommy.make_recipe('cirs.public_ci', department=self.dept, status='completed')
+        Comment.objects.create(critical_incident=archived, author=self.commenter, text='Old')
+        move_to_archive([archived])
+        archive = self.export()
+        self.remove_department()
+        import_department(archive)
+        restored = ArchivedIncident.objects.get()
+        self.assertEqual((restored.comment_code, restored.archived),
+                         (archived.comment_code, date.today()))
+        self.assertEqual(restored.comments.get().author.username, 'commenter')
+        self.assertEqual(CriticalIncident.objects.count(), 3)
+        self.assertEqual(restored.department.open_comment_count, 1)
+
+    def test_restored_incidents_do_not_reuse_archived_comment_codes(self):
+        move_to_archive([self.incidents[2]])
+        archive = self.export()
+        self.rename_reporter()
+        restorer = import_department(archive, label='copy', name='Copy', reuse_users=True)
+        self.assertEqual(restorer.renewed_codes, 3)
+        self.assertEqual(ArchivedIncident.objects.values('comment_code').distinct().count(), 2)
+
+    def test_users_can_log_in_with_their_old_passwords(self):
+        archive = self.export()
+        username = self.commenter.username
+        self.remove_department()
+        import_department(archive)
+        self.assertTrue(User.objects.get(username=username).check_password(username))
+
+    def test_existing_reporter_is_rejected_without_changes(self):
+        archive = self.export()
+        with self.assertRaises(BackupError):
+            import_department(archive, label='copy', name='Copy')
+        self.assertEqual(Department.objects.count(), 1)
+
+    def test_restore_as_copy_with_new_reporter_renews_comment_codes(self):
+        archive = self.export()
+        self.rename_reporter()
+        restorer = import_department(archive, label='copy', name='Copy', reuse_users=True)
+        self.assertEqual(restorer.renewed_codes, 3)
+        self.assertEqual(restorer.department.criticalincident_set.count(), 3)
+        self.assertEqual(CriticalIncident.objects.values('comment_code').distinct().count(), 6)
+
+    def rename_reporter(self):
+        self.dept.reporter.user.username = 'old_reporter'
+        self.dept.reporter.user.save()
+
+    def test_existing_reviewer_is_reused_on_request(self):
+        archive = self.export()
+        self.rename_reporter()
+        self.reviewer.user.email = ''
+        self.reviewer.user.save()
+        restorer = import_department(archive, label='copy', name='Copy', reuse_users=True)
+        self.assertEqual(restorer.department.reviewers.get(), self.reviewer)
+
+    def test_existing_reviewer_with_matching_email_is_reused(self):
+        self.reviewer.user.email = 'reviewer@localhost'
+        self.reviewer.user.save()
+        archive = self.export()
+        self.rename_reporter()
+        restorer = import_department(archive, label='copy', name='Copy')
+        self.assertEqual(restorer.department.reviewers.get(), self.reviewer)
+
+    def test_existing_user_with_other_email_is_a_conflict(self):
+        archive = self.export()
+        self.rename_reporter()
+        self.reviewer.user.email = 'somebody.else@localhost'
+        self.reviewer.user.save()
+        with self.assertRaisesMessage(BackupError, self.reviewer.user.username):
+            import_department(archive, label='copy', name='Copy')
+        self.assertFalse(Department.objects.filter(label='copy').exists())
+
+    def test_photos_are_removed_if_restore_fails(self):
+        archive = self.export()
+        files = [names for _, _, names in os.walk(self.media_root)]
+        with self.assertRaises(BackupError):
+            import_department(archive, label='copy', name='Copy')
+        self.assertEqual([names for _, _, names in os.walk(self.media_root)], files)
+
+    def test_restored_objects_are_in_change_log(self):
+        archive = self.export()
+        self.remove_department()
+        ChangeLogEntry.objects.all().delete()
+        restorer = import_department(archive)
+        entries = ChangeLogEntry.objects.filter(department_pk=restorer.department.pk,
+                                                action='created')
+        self.assertEqual(entries.filter(model='cirs.criticalincident').count(), 3)
+        self.assertEqual(entries.filter(model='cirs.comment').count(), 2)
+        self.assertEqual(entries.filter(model='cirs.publishableincident').count(), 1)
+
+    def test_user_with_other_role_cannot_become_reviewer(self):
+        archive = self.export()
+        reviewer_name = self.reviewer.user.username
+        for user, name in ((self.dept.reporter.user, 'old_reporter'),
+                           (self.reviewer.user, 'old_reviewer')):
+            user.username = name
+            user.save()
+        create_role(Reporter, reviewer_name)
+        with self.assertRaises(BackupError):
+            import_department(archive, label='copy', name='Copy')
+
+    def test_commands_export_and_import_department(self):
+        archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, archive_dir)
+        path = os.path.join(archive_dir, 'archive.tar.gz')
+        call_command('export_department', self.dept.label, output=path, stdout=StringIO())
+        self.remove_department()
+        out = StringIO()
+        call_command('import_department', path, label='restored', stdout=out)
+        self.assertIn('Imported department restored with 3 incidents', out.getvalue())
+
+    def test_import_command_reports_conflicts(self):
+        path = os.path.join(self.media_root, 'archive.tar.gz')
+        call_command('export_department', self.dept.label, output=path, stdout=StringIO())
+        with self.assertRaisesMessage(CommandError, 'already exists'):
+            call_command('import_department', path, label='copy', name='Copy')
@@ -0,0 +1,112 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import OperationalError, connections
+from django.db.utils import load_backend
+from django.test import SimpleTestCase, TransactionTestCase
+
+from cirs.benchmarks import SCENARIOS, run_scenario, run_scenario_async
+from cirs.models import Comment, CriticalIncident
+
+
+class ScenarioTest(TransactionTestCase):
+
+    def run_scenario(self, name, run=run_scenario, **attributes):
+        scenario = SCENARIOS[name]()
+        scenario.__dict__.update(attributes)
+        # the shared in-memory test database has no busy timeout
+        result = run(scenario, 1, 0.3)
+        self.assertEqual(result.errors, 0)
+        self.assertGreater(result.operations, 0)
+        return result
+
+    def test_incidents_are_created(self):
+        result = self.run_scenario('create-incident')
+        self.assertEqual(CriticalIncident.objects.count(), result.operations)
+
+    def test_comments_are_posted(self):
+        result = self.run_scenario('post-comment')
+        self.assertEqual(Comment.objects.count(), result.operations)
+
+    def test_published_incidents_are_listed(self):
+        self.run_scenario('list-incidents')
+
+    def test_api_incidents_are_listed(self):
+        self.run_scenario('api-incidents')
+
+    def test_api_incidents_are_listed_with_asgi_handler(self):
+        result = self.run_scenario('api-incidents', run=run_scenario_async)
+        self.assertEqual(result.handler, 'asgi')
+
+    def test_published_incidents_are_listed_with_asgi_handler(self):
+        self.run_scenario('list-incidents', run=run_scenario_async)
+
+    def test_admin_incidents_are_listed(self):
+        self.run_scenario('admin-incidents', rows=50, batch_size=20)
+        self.assertEqual(CriticalIncident.objects.count(), 50)
+
+    def test_unknown_scenario_is_rejected(self):
+        with self.assertRaisesMessage(CommandError, 'Unknown scenario'):
+            call_command('benchmark', 'missing', stdout=StringIO())
+
+    def test_scenario_without_asgi_support_is_rejected(self):
+        with self.assertRaisesMessage(CommandError, 'without ASGI support'):
+            call_command('benchmark', 'create-incident', handlers=['asgi'], stdout=StringIO())
+
+
+class SQLiteProductionBackendTest(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.settings_dict = connections.configure_settings({'default': {
+            'ENGINE': 'labcirs.backends.sqlite3',
+            'NAME': os.path.join(directory, 'db.sqlite3'),
+            'OPTIONS': {'timeout': 0, 'pragmas': {'cache_size': -1000}}}})['default']
+
+    def get_connection(self, alias):
+        connection = load_backend(self.settings_dict['ENGINE']).DatabaseWrapper(
+            dict(self.settings_dict), alias)
+        self.addCleanup(connection.close)
+        return connection
+
+    def query(self, connection, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+            return cursor.fetchone()[0]
+
+    def test_pragmas_are_applied(self):
+        connection = self.get_connection('first')
+        self.assertEqual(self.query(connection, 'PRAGMA journal_mode'), 'wal')
+        self.assertEqual(self.query(connection, 'PRAGMA synchronous'), 1)
+        self.assertEqual(self.query(connection, 'PRAGMA cache_size'), -1000)
+
+    def test_atomic_blocks_take_the_write_lock_at_once(self):
+        first, second = self.get_connection('first'), self.get_connection('second')
+        first._start_transaction_under_autocommit()
+        with self.assertRaisesMessage(OperationalError, 'locked'):
+            second._start_transaction_under_autocommit()
+        first.connection.rollback()
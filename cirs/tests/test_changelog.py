@@ -0,0 +1,127 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+import json
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from model_mommy import mommy
+
+from cirs.changelog import record_bulk_changes
+from cirs.models import (APIToken, ChangeLogEntry, Comment, CriticalIncident,
+                         PublishableIncident)
+
+
+class ChangeLogTest(TestCase):
+
+    def setUp(self):
+        self.dept = mommy.make_recipe('cirs.department')
+        self.ci = mommy.make_recipe('cirs.public_ci', department=self.dept)
+
+    def entries_for(self, instance):
+        return ChangeLogEntry.objects.filter(model=instance._meta.label_lower,
+                                             object_pk=instance.pk)
+
+    def test_creation_is_logged_with_department(self):
+        entry = self.entries_for(self.ci).get()
+        self.assertEqual(entry.action, 'created')
+        self.assertEqual(entry.department_pk, self.dept.pk)
+        self.assertIn('incident', entry.changed_fields)
+
+    def test_only_changed_fields_are_logged(self):
+        self.ci.status = 'in process'
+        self.ci.save()
+        entry = self.entries_for(self.ci).last()
+        self.assertEqual((entry.action, entry.changed_fields), ('changed', ['status']))
+
+    def test_save_without_changes_is_not_logged(self):
+        self.ci.save()
+        self.assertEqual(self.entries_for(self.ci).count(), 1)
+
+    def test_deletion_is_logged(self):
+        pk = self.ci.pk
+        self.ci.delete()
+        self.assertEqual(ChangeLogEntry.objects.filter(
+            object_pk=pk, model='cirs.criticalincident').last().action, 'deleted')
+
+    def test_comment_gets_department_of_incident(self):
+        comment = Comment.objects.create(critical_incident=self.ci, text='Text',
+                                         author=User.objects.create_user('author'))
+        self.assertEqual(self.entries_for(comment).get().department_pk, self.dept.pk)
+
+    def test_translation_change_is_logged_for_publishable_incident(self):
+        pi = PublishableIncident.objects.create(critical_incident=self.ci, incident='Old')
+        pi.incident = 'New'
+        pi.save()
+        self.assertIn('incident:en', self.entries_for(pi).last().changed_fields)
+
+    def test_reviewer_assignment_is_logged_for_department(self):
+        self.dept.reviewers.add(mommy.make_recipe('cirs.reviewer'))
+        self.assertEqual(self.entries_for(self.dept).last().changed_fields, ['reviewers'])
+
+    def test_bulk_changes_are_logged(self):
+        mommy.make_recipe('cirs.public_ci', department=self.dept, _quantity=2)
+        queryset = CriticalIncident.objects.filter(department=self.dept)
+        queryset.update(status='completed')
+        record_bulk_changes(queryset, ['status'])
+        self.assertEqual(ChangeLogEntry.objects.filter(changed_fields=['status']).count(), 3)
+
+
+class ChangeFeedTest(TestCase):
+
+    def setUp(self):
+        self.dept, self.other_dept = mommy.make_recipe('cirs.department', _quantity=2)
+        mommy.make_recipe('cirs.public_ci', department=self.dept, _quantity=3)
+        mommy.make_recipe('cirs.public_ci', department=self.other_dept)
+        self.token = APIToken.objects.create(name='QM', department=self.dept)
+
+    def get_changes(self, since=0):
+        return self.client.get(
+            reverse('api_changes', kwargs={'dept': self.dept.label}), {'since': since},
+            HTTP_AUTHORIZATION='Token {}'.format(self.token.key)).json()
+
+    def test_api_returns_only_changes_of_publishable_incidents_since_sequence(self):
+        for ci in CriticalIncident.objects.all():
+            PublishableIncident.objects.create(critical_incident=ci, incident='Incident')
+        expected = ChangeLogEntry.objects.filter(
+            department_pk=self.dept.pk, model='cirs.publishableincident')
+        results = self.get_changes(expected.first().id)['results']
+        self.assertEqual([entry['sequence'] for entry in results],
+                         [entry.id for entry in expected[1:]])
+
+    def test_api_does_not_reveal_unpublished_models(self):
+        self.assertEqual(self.get_changes()['results'], [])
+
+    def test_last_sequence_does_not_pass_recent_changes(self):
+        PublishableIncident.objects.create(
+            critical_incident=CriticalIncident.objects.filter(department=self.dept).first())
+        self.assertEqual(self.get_changes()['last_sequence'], 0)
+        with override_settings(CHANGELOG_SETTLE_SECONDS=0):
+            self.assertEqual(self.get_changes()['last_sequence'],
+                             ChangeLogEntry.objects.get(model='cirs.publishableincident').id)
+
+    def test_management_command_streams_json_lines(self):
+        out = StringIO()
+        call_command('changefeed', '--department', self.dept.label, stdout=out)
+        sequences = [json.loads(line)['sequence'] for line in out.getvalue().splitlines()]
+        self.assertEqual(sequences, list(ChangeLogEntry.objects.filter(
+            department_pk=self.dept.pk).values_list('id', flat=True)))
@@ -0,0 +1,136 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from cirs import checks
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+DUMMY = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+def get_ids(messages):
+    return [message.id for message in messages]
+
+
+class SettingsChecksTest(TestCase):
+
+    @override_settings(DEBUG=True)
+    def test_debug_is_reported(self):
+        self.assertEqual(get_ids(checks.check_debug()), ['cirs.W001'])
+
+    @override_settings(SESSION_SAVE_EVERY_REQUEST=True,
+                       SESSION_ENGINE='django.contrib.sessions.backends.db')
+    def test_saving_database_sessions_every_request_is_reported(self):
+        self.assertEqual(get_ids(checks.check_sessions()), ['cirs.W002'])
+
+    @override_settings(SESSION_SAVE_EVERY_REQUEST=True,
+                       SESSION_ENGINE='django.contrib.sessions.backends.cached_db')
+    def test_cached_sessions_are_not_reported(self):
+        self.assertEqual(checks.check_sessions(), [])
+
+    def test_connections_without_max_age_are_reported(self):
+        databases = {
+            'default': {'ENGINE': 'django.db.backends.postgresql', 'CONN_MAX_AGE': 0},
+            'replica': {'ENGINE': 'django.db.backends.postgresql', 'CONN_MAX_AGE': 60},
+            'target': {'ENGINE': 'django.db.backends.postgresql'},
+        }
+        with mock.patch.object(checks.settings, 'DATABASES', databases):
+            self.assertEqual(get_ids(checks.check_connections()), ['cirs.W003'])
+
+    @override_settings(CACHES=LOCMEM)
+    def test_local_memory_cache_is_reported(self):
+        self.assertEqual(get_ids(checks.check_cache()), ['cirs.W004'])
+
+    @override_settings(CACHES=DUMMY)
+    def test_other_caches_are_not_reported(self):
+        self.assertEqual(checks.check_cache(), [])
+
+
+class DatabaseChecksTest(TestCase):
+
+    def test_migrated_database_has_all_indexes(self):
+        self.assertEqual(checks.get_missing_indexes(), [])
+
+    def test_missing_index_is_reported(self):
+        with mock.patch.object(connection.introspection, 'get_constraints', return_value={}):
+            missing = checks.get_missing_indexes()
+        self.assertIn(('cirs_criticalincident', ('department_id',)), missing)
+
+    @mock.patch.object(checks, 'SQLITE_MAX_DEPARTMENTS', -1)
+    def test_sqlite_with_many_departments_is_reported(self):
+        expected = ['cirs.W006'] if connection.vendor == 'sqlite' else []
+        self.assertEqual(get_ids(checks.check_sqlite_size()), expected)
+
+
+class MediaCheckTest(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        os.makedirs(os.path.join(self.media_root, 'photos'))
+        with open(os.path.join(self.media_root, 'photos', 'a.jpg'), 'wb') as photo:
+            photo.write(b'x' * 2048)
+
+    def test_size_of_media_directory_is_reported(self):
+        messages = checks.check_media(self.media_root)
+        self.assertEqual(get_ids(messages), ['cirs.I009'])
+        self.assertIn('2.0 KB', messages[0].msg)
+
+    @mock.patch.object(checks, 'MEDIA_WARNING_BYTES', 1024)
+    def test_large_media_directory_is_a_warning(self):
+        self.assertEqual(get_ids(checks.check_media(self.media_root)), ['cirs.W009'])
+
+
+class SMTPCheckTest(TestCase):
+
+    @override_settings(EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend')
+    def test_unreachable_mail_server_is_an_error(self):
+        with mock.patch('smtplib.SMTP', side_effect=ConnectionRefusedError):
+            self.assertEqual(get_ids(checks.check_smtp()), ['cirs.E010'])
+
+    def test_fast_mail_server_is_info(self):
+        self.assertEqual(get_ids(checks.check_smtp()), ['cirs.I010'])
+
+
+@override_settings(DEBUG=True, CACHES=DUMMY)
+class PerfcheckCommandTest(TestCase):
+
+    def test_warnings_are_listed_before_infos(self):
+        out = StringIO()
+        call_command('perfcheck', '--json', stdout=out)
+        messages = json.loads(out.getvalue())
+        levels = [message['level'] for message in messages]
+        self.assertIn('cirs.W001', [message['id'] for message in messages])
+        self.assertEqual(levels, sorted(levels, reverse=True))
+
+    def test_hints_are_printed(self):
+        out = StringIO()
+        call_command('perfcheck', stdout=out, no_color=True)
+        self.assertIn('[W] cirs.W001: DEBUG is True', out.getvalue())
+        self.assertIn('HINT: Use labcirs.settings.production', out.getvalue())
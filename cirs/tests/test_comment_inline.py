@@ -0,0 +1,80 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+from datetime import date, timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from model_mommy import mommy
+
+from cirs.models import Comment
+
+
+class CommentInlineTest(TestCase):
+
+    def setUp(self):
+        dept = mommy.make_recipe('cirs.department')
+        self.reviewer = mommy.make_recipe('cirs.reviewer')
+        dept.reviewers.add(self.reviewer)
+        self.incident = mommy.make_recipe('cirs.public_ci', department=dept)
+        self.url = reverse('admin:cirs_criticalincident_change', args=[self.incident.pk])
+        self.client.force_login(self.reviewer.user)
+
+    def add_comments(self, number, status='open'):
+        Comment.objects.bulk_create([
+            Comment(critical_incident=self.incident, author=self.reviewer.user,
+                    text='Comment {}'.format(index), status=status,
+                    created=date.today() - timedelta(days=index))
+            for index in range(number)])
+
+    def get_comments(self, **params):
+        response = self.client.get(self.url, params)
+        formset = [inline.formset for inline in response.context['inline_admin_formsets']
+                   if inline.formset.model is Comment][0]
+        return response, [comment.text for comment in formset.get_queryset()]
+
+    def test_first_page_shows_recent_comments(self):
+        self.add_comments(25)
+        response, texts = self.get_comments()
+        self.assertEqual(texts, ['Comment {}'.format(index) for index in range(20)])
+        self.assertContains(response, '25 comments, page 1 of 2')
+        self.assertContains(response, self.incident.get_absolute_url())
+
+    def test_next_page(self):
+        self.add_comments(25)
+        _, texts = self.get_comments(comments_page=2)
+        self.assertEqual(len(texts), 5)
+
+    def test_status_filter(self):
+        self.add_comments(3)
+        self.add_comments(2, status='closed')
+        _, texts = self.get_comments(comments_status='closed')
+        self.assertEqual(len(texts), 2)
+
+    def test_authors_are_read_with_comments(self):
+        self.add_comments(1)
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as one_comment:
+            self.client.get(self.url)
+        self.add_comments(19)
+        with CaptureQueriesContext(connection) as many_comments:
+            self.client.get(self.url)
+        self.assertEqual(len(many_comments), len(one_comment))
@@ -0,0 +1,111 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from model_mommy import mommy
+
+from cirs.importers import IncidentImporter
+from cirs.models import Comment, CriticalIncident, Department, PublishableIncident
+
+from .test_import import incident_row
+
+
+class CounterTest(TestCase):
+
+    def setUp(self):
+        # parler caches translations by ids, which are reused after rollbacks
+        cache.clear()
+        self.dept = mommy.make_recipe('cirs.department')
+        self.reviewer = mommy.make_recipe('cirs.reviewer')
+        self.incident = mommy.make_recipe('cirs.public_ci', department=self.dept)
+
+    def add_comment(self, status='open', incident=None):
+        return Comment.objects.create(critical_incident=incident or self.incident,
+                                      author=self.reviewer.user, text='Text', status=status)
+
+    def assertCounters(self, obj, **counters):
+        obj.refresh_from_db()
+        self.assertEqual({name: getattr(obj, name) for name in counters}, counters)
+
+    def test_comments_are_counted(self):
+        self.add_comment()
+        self.add_comment(status='closed')
+        self.assertCounters(self.incident, comment_count=2, open_comment_count=1)
+        self.assertCounters(self.dept, open_comment_count=1)
+
+    def test_closing_and_deleting_comments_updates_counters(self):
+        comment = self.add_comment()
+        comment.status = 'closed'
+        comment.save()
+        self.assertCounters(self.incident, comment_count=1, open_comment_count=0)
+        self.assertCounters(self.dept, open_comment_count=0)
+        comment.delete()
+        self.assertCounters(self.incident, comment_count=0)
+
+    def test_new_incidents_are_counted(self):
+        self.assertCounters(self.dept, new_incident_count=1)
+        self.incident.status = 'in process'
+        self.incident.save()
+        self.assertCounters(self.dept, new_incident_count=0)
+
+    def test_unpublished_incidents_are_counted(self):
+        publishable = PublishableIncident.objects.create(critical_incident=self.incident,
+                                                         incident='Draft')
+        self.assertCounters(self.dept, unpublished_count=1)
+        publishable.publish = True
+        publishable.save()
+        self.assertCounters(self.dept, unpublished_count=0)
+
+    def test_saving_stale_instance_keeps_counters(self):
+        stale = CriticalIncident.objects.get(pk=self.incident.pk)
+        self.add_comment()
+        stale.action = 'Reviewed'
+        stale.save()
+        self.assertCounters(self.incident, comment_count=1, action='Reviewed')
+
+    def test_drifted_counters_do_not_block_deletion(self):
+        comment = self.add_comment()
+        CriticalIncident.objects.update(comment_count=0, open_comment_count=0)
+        Department.objects.update(open_comment_count=0)
+        comment.delete()
+        self.assertCounters(self.incident, comment_count=-1)
+        call_command('reconcile_counters', stdout=StringIO())
+        self.assertCounters(self.incident, comment_count=0, open_comment_count=0)
+        self.assertCounters(self.dept, open_comment_count=0)
+
+    def test_imported_incidents_are_counted(self):
+        IncidentImporter(self.dept).run([incident_row(
+            status='new', comments=[{'author': self.reviewer.user.username, 'text': 'Hi'}])])
+        imported = CriticalIncident.objects.get(incident='Broken flask')
+        self.assertCounters(imported, comment_count=1, open_comment_count=1)
+        self.assertCounters(self.dept, new_incident_count=2, open_comment_count=1)
+
+    def test_command_corrects_counters(self):
+        self.add_comment()
+        CriticalIncident.objects.update(comment_count=5)
+        Department.objects.update(new_incident_count=0)
+        out = StringIO()
+        call_command('reconcile_counters', stdout=out)
+        self.assertIn('1 incidents and 1 departments', out.getvalue())
+        self.assertCounters(self.incident, comment_count=1)
+        self.assertCounters(self.dept, new_incident_count=1)
@@ -0,0 +1,100 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from model_mommy import mommy
+
+from cirs.dashboard import get_work_queues, incomplete_translations
+from cirs.models import Comment, PublishableIncident
+
+
+class WorkQueuesTest(TestCase):
+
+    def setUp(self):
+        # parler caches translations by ids, which are reused after rollbacks
+        cache.clear()
+        self.dept = mommy.make_recipe('cirs.department')
+        self.other_dept = mommy.make_recipe('cirs.department')
+        self.reviewer = mommy.make_recipe('cirs.reviewer')
+        self.dept.reviewers.add(self.reviewer)
+        self.other_dept.reviewers.add(self.reviewer)
+        config = self.dept.labcirsconfig
+        config.mandatory_languages = ['en', 'de']
+        config.save()
+
+    def make_incident(self, dept=None, status='new'):
+        return mommy.make_recipe('cirs.public_ci', department=dept or self.dept, status=status)
+
+    def make_publishable(self, **translations):
+        publishable = PublishableIncident(critical_incident=self.make_incident(status='completed'))
+        for language_code, text in translations.items():
+            publishable.set_current_language(language_code)
+            publishable.incident = publishable.description = text
+            publishable.measures_and_consequences = text
+        publishable.save()
+        return publishable
+
+    def test_counts_per_department(self):
+        self.make_incident()
+        self.make_incident(status='in process')
+        Comment.objects.create(critical_incident=self.make_incident(status='in process'),
+                               author=self.reviewer.user, text='Why?')
+        self.make_incident(dept=self.other_dept)
+        self.make_publishable(en='Done')
+        self.make_publishable(en='Done', de='Fertig')
+        with self.assertNumQueries(1):
+            queues = {queue['label']: queue for queue in get_work_queues(self.reviewer)}
+        self.assertEqual(
+            {key: queues[self.dept.label][key] for key in (
+                'new_incident_count', 'in_process_count', 'open_comment_count',
+                'untranslated_count')},
+            {'new_incident_count': 1, 'in_process_count': 2, 'open_comment_count': 1,
+             'untranslated_count': 1})
+        self.assertEqual(queues[self.other_dept.label]['new_incident_count'], 1)
+
+    def test_incomplete_translations_match_translation_status(self):
+        publishables = [self.make_publishable(en='Done'), self.make_publishable(de='Fertig'),
+                        self.make_publishable(en='Done', de='Fertig'),
+                        self.make_publishable(en='Done', de='')]
+        incomplete = incomplete_translations(PublishableIncident.objects.all())
+        self.assertEqual(
+            set(incomplete.values_list('pk', flat=True)),
+            {publishable.pk for publishable in publishables
+             if publishable.translation_status == 'incomplete'})
+
+    def test_admin_index_links_to_filtered_changelists(self):
+        self.make_incident()
+        self.make_publishable(en='Done')
+        self.client.force_login(self.reviewer.user)
+        response = self.client.get(reverse('admin:index'))
+        queue = [queue for queue in response.context['work_queues']
+                 if queue['pk'] == self.dept.pk][0]
+        for name, count in (('new', 1), ('open_comments', 0), ('untranslated', 1)):
+            response = self.client.get(queue['urls'][name])
+            self.assertEqual(response.context['cl'].result_count, count, name)
+
+    def test_work_queues_are_cached(self):
+        self.client.force_login(self.reviewer.user)
+        self.client.get(reverse('admin:index'))
+        self.make_incident()
+        response = self.client.get(reverse('labcirs_home'))
+        self.assertEqual(sum(queue['new_incident_count']
+                             for queue in response.context['work_queues']), 0)
@@ -0,0 +1,128 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connections
+from django.test import TestCase
+from model_mommy import mommy
+
+from cirs.dbcopy import DatabaseCopier, get_models
+from cirs.models import (Comment, CriticalIncident, Department, ProfileReport,
+                         PublishableIncident, PublishableIncidentTranslation)
+
+TARGET = 'target'
+
+
+class DatabaseCopyTest(TestCase):
+    """Copies the test database into a temporary SQLite file."""
+
+    @classmethod
+    def setUpClass(cls):
+        super(DatabaseCopyTest, cls).setUpClass()
+        cls.target_dir = tempfile.mkdtemp()
+        databases = {'default': dict(connections.settings['default']), TARGET: {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(cls.target_dir, 'target.sqlite3')}}
+        connections.settings[TARGET] = connections.configure_settings(databases)[TARGET]
+        call_command('migrate', database=TARGET, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[TARGET].close()
+        del connections[TARGET]
+        del connections.settings[TARGET]
+        shutil.rmtree(cls.target_dir)
+        super(DatabaseCopyTest, cls).tearDownClass()
+
+    def setUp(self):
+        self.addCleanup(call_command, 'flush', database=TARGET, interactive=False, verbosity=0)
+        self.dept = mommy.make_recipe('cirs.department')
+        self.reviewer = mommy.make_recipe('cirs.reviewer')
+        self.dept.reviewers.add(self.reviewer)
+        self.dept.labcirsconfig.notification_recipients.add(self.reviewer.user)
+        mommy.make_recipe('cirs.translated_pi', master__critical_incident__department=self.dept)
+        Comment.objects.create(critical_incident=CriticalIncident.objects.get(),
+                               author=self.reviewer.user, text='Reviewed')
+        self.client.force_login(self.reviewer.user)
+
+    def migrate_database(self, **options):
+        call_command('migrate_database', target=TARGET, stdout=StringIO(), **options)
+
+    def test_models_follow_their_references(self):
+        models = get_models('default', TARGET)
+        for model in (CriticalIncident, Department.reviewers.through, PublishableIncident):
+            for field in model._meta.concrete_fields:
+                if field.is_relation and field.related_model is not model:
+                    self.assertLess(models.index(field.related_model), models.index(model))
+
+    def test_all_rows_are_copied_with_their_ids(self):
+        self.migrate_database()
+        for model in (Department, Department.reviewers.through, Comment, Session,
+                      PublishableIncidentTranslation):
+            self.assertEqual(
+                list(model._base_manager.using(TARGET).order_by('pk').values_list('pk', flat=True)),
+                list(model._base_manager.order_by('pk').values_list('pk', flat=True)))
+
+    def test_copy_is_verified(self):
+        copier = DatabaseCopier('default', TARGET, chunk_size=2)
+        copier.run()
+        self.assertEqual(copier.verify(), [])
+        Comment.objects.using(TARGET).update(text='Changed')
+        self.assertEqual(copier.verify(), [Comment])
+
+    def test_binary_fields_are_verified(self):
+        ProfileReport.objects.create(
+            user=self.reviewer.user, method='GET', path='/', status_code=200, duration=1,
+            query_count=1, query_duration=1, stats=b'\x00profile')
+        self.migrate_database()
+        self.assertEqual(bytes(ProfileReport.objects.using(TARGET).get().stats),
+                         b'\x00profile')
+        copier = DatabaseCopier('default', TARGET)
+        ProfileReport.objects.using(TARGET).update(stats=b'\x00changed')
+        self.assertEqual(copier.verify(), [ProfileReport])
+
+    def test_permissions_keep_their_ids(self):
+        self.migrate_database()
+        user = self.reviewer.user
+        self.assertEqual(
+            set(user.user_permissions.values_list('pk', 'codename')),
+            set(type(user).objects.using(TARGET).get(pk=user.pk).user_permissions.values_list(
+                'pk', 'codename')))
+
+    def test_sequences_continue_after_copied_ids(self):
+        self.migrate_database()
+        incident = mommy.prepare_recipe('cirs.public_ci', department=self.dept)
+        incident.save(using=TARGET)
+        self.assertGreater(incident.pk, CriticalIncident.objects.get().pk)
+
+    def test_target_has_to_be_empty(self):
+        self.migrate_database()
+        with self.assertRaisesMessage(CommandError, 'not empty'):
+            self.migrate_database()
+
+    def test_unknown_database_is_rejected(self):
+        with self.assertRaisesMessage(CommandError, 'not configured'):
+            call_command('migrate_database', target='missing')
@@ -0,0 +1,65 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import NoReverseMatch, reverse
+from model_mommy import mommy
+
+
+class DepartmentResolutionTest(TestCase):
+
+    def setUp(self):
+        self.dept = mommy.make_recipe('cirs.department')
+        self.client.force_login(self.dept.reporter.user)
+
+    def test_url_accepts_department_instance(self):
+        self.assertEqual(reverse('incidents_for_department', kwargs={'dept': self.dept}),
+                         '/incidents/{}/'.format(self.dept.label))
+
+    def test_url_rejects_invalid_label(self):
+        with self.assertRaises(NoReverseMatch):
+            reverse('incidents_for_department', kwargs={'dept': 'a/b'})
+
+    def test_unknown_department_is_not_found(self):
+        response = self.client.get('/incidents/unknown/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_inactive_department_is_not_found(self):
+        self.dept.active = False
+        self.dept.save()
+        response = self.client.get(self.dept.get_absolute_url())
+        self.assertEqual(response.status_code, 404)
+
+    def test_request_has_department(self):
+        response = self.client.get(self.dept.get_absolute_url())
+        self.assertEqual(response.wsgi_request.department, self.dept)
+
+    def test_department_is_resolved_once_per_request(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.dept.get_absolute_url())
+        self.assertEqual(len([query for query in queries
+                              if '"cirs_department"."label" =' in query['sql']]), 1)
+
+    def test_incident_of_other_department_is_not_found(self):
+        ci = mommy.make_recipe('cirs.public_ci')
+        response = self.client.get(reverse('incident_detail', kwargs={
+            'dept': self.dept.label, 'pk': ci.pk}))
+        self.assertEqual(response.status_code, 404)
@@ -19,12 +19,16 @@
 import datetime as dt
 import random
 import string
+import time
+from unittest import mock
 
+from django.contrib.auth.models import User
 from django.core import mail
 from django.test import TestCase
 from django.urls import reverse
 from model_mommy import mommy
 
+from cirs.access import get_cookie_name, get_max_age
 from cirs.forms import CommentForm
 from cirs.models import Comment
 
@@ -51,28 +55,69 @@ class SecurityTest(BaseFeedbackTest):
         response = self.client.get(self.ci.get_absolute_url(), follow=True)
         self.assertRedirects(response, self.search_url)
             
-    def test_incident_search_sets_session_var_on_success(self):
-        self.client.post(self.search_url, {'incident_code':self.ci.comment_code}, follow=True)
-        self.assertEqual(self.client.session['accessible_incident'], self.ci.id)
-        
-    def test_reporter_can_acces_incident_if_session_var_is_set(self):
-        """Tests if reporter gets redirected to the detail view of incident
-        if 'accessible_incident' is set to the id of the incident.id."""
-        session = self.client.session
-        session['accessible_incident'] = self.ci.id
-        session.save()
-        response = self.client.get(self.ci.get_absolute_url(), follow=True)
+    def search(self, incident):
+        return self.client.post(self.search_url, {'incident_code': incident.comment_code})
+
+    def test_incident_search_redirects_with_access_cookie(self):
+        response = self.search(self.ci)
+        self.assertRedirects(response, self.ci.get_absolute_url())
+        cookie = response.cookies[get_cookie_name(self.ci)]
+        self.assertEqual(cookie['path'], self.ci.get_absolute_url())
+        self.assertTrue(cookie['httponly'])
+
+    def test_incident_search_does_not_write_session(self):
+        self.search(self.ci)
+        self.assertNotIn('accessible_incident', self.client.session)
+
+    def test_reporter_can_acces_incident_after_search(self):
+        """Tests if reporter gets the detail view of the incident found before."""
+        self.search(self.ci)
+        response = self.client.get(self.ci.get_absolute_url())
         self.assertEqual(response.status_code, 200)
 
-    def test_reporter_cannot_acces_incident_if_another_pk_is_set(self):
+    def test_reporter_can_access_several_incidents(self):
+        other = mommy.make_recipe('cirs.public_ci', department=self.ci.department)
+        self.search(self.ci)
+        self.search(other)
+        for incident in (self.ci, other):
+            response = self.client.get(incident.get_absolute_url())
+            self.assertEqual(response.status_code, 200)
+
+    def test_reporter_cannot_acces_incident_with_token_of_another(self):
         """Tests if reporter gets redirected to the search view of incident
-        if 'accessible_incident' is set to wrong id."""
-        session = self.client.session
-        session['accessible_incident'] = self.ci.id + 1
-        session.save()
+        if the cookie was copied from another incident."""
+        other = mommy.make_recipe('cirs.public_ci', department=self.ci.department)
+        response = self.search(other)
+        self.client.cookies[get_cookie_name(self.ci)] = response.cookies[
+            get_cookie_name(other)].value
         response = self.client.get(self.ci.get_absolute_url(), follow=True)
         self.assertRedirects(response, self.search_url)
 
+    def test_access_expires(self):
+        self.search(self.ci)
+        with mock.patch('django.core.signing.time.time',
+                        return_value=time.time() + get_max_age() + 1):
+            response = self.client.get(self.ci.get_absolute_url(), follow=True)
+        self.assertRedirects(response, self.search_url)
+
+    def test_reporter_cannot_comment_without_access_cookie(self):
+        response = self.client.post(self.ci.get_absolute_url(), {'text': 'Comment'})
+        self.assertRedirects(response, self.search_url)
+        self.assertFalse(Comment.objects.exists())
+
+    def test_reviewer_of_other_department_cannot_comment(self):
+        reviewer = mommy.make_recipe('cirs.reviewer')
+        self.client.force_login(reviewer.user)
+        self.client.post(self.ci.get_absolute_url(), {'text': 'Comment'})
+        self.assertFalse(Comment.objects.exists())
+
+    def test_superuser_without_role_cannot_comment_without_access_cookie(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'secret')
+        self.client.force_login(admin)
+        response = self.client.post(self.ci.get_absolute_url(), {'text': 'Comment'})
+        self.assertRedirects(response, self.search_url, fetch_redirect_response=False)
+        self.assertFalse(Comment.objects.exists())
+
     def test_wrong_code_causes_form_error(self):
         response = self.client.post(self.search_url, {'incident_code':'ab'}, follow=True)
         self.assertFormError(response, 'form', 'incident_code', 'No matching critical incident found!')
@@ -110,9 +155,8 @@ class CommentViewTest(BaseFeedbackTest):
                              'status': 'open'} 
 
         self.client.force_login(self.ci.department.reporter.user)
-        session = self.client.session
-        session['accessible_incident'] = self.ci.id
-        session.save()
+        self.client.post(reverse('incident_search', kwargs={'dept': self.ci.department.label}),
+                         {'incident_code': self.ci.comment_code})
 
     def test_comment_is_added_to_incident_after_post(self):
         Comment.objects.create(**self.test_comment)
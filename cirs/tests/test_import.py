@@ -0,0 +1,148 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+import csv
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
+
+from django.contrib.auth.models import Permission
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from model_mommy import mommy
+
+from cirs.importers import IncidentImporter
+from cirs.models import Comment, CriticalIncident
+
+from .helpers import create_user
+
+
+def incident_row(**kwargs):
+    row = {'date': '2019-05-02', 'incident': 'Broken flask', 'reason': 'Slippery',
+           'immediate_action': 'Cleaned up', 'preventability': 'avoidable',
+           'public': 'True', 'status': 'completed', 'risk': 'low',
+           'category': 'other,infrastructure'}
+    row.update(kwargs)
+    return row
+
+
+class IncidentImporterTest(TestCase):
+
+    def setUp(self):
+        self.dept = mommy.make_recipe('cirs.department')
+        self.author = create_user('rev')
+
+    def test_valid_rows_are_imported_with_comments(self):
+        rows = [incident_row(comments=[{'author': 'rev', 'text': 'Done', 'status': 'closed'}]),
+                incident_row(incident='Spilled acid')]
+        importer = IncidentImporter(self.dept, batch_size=1).run(rows)
+        self.assertEqual(importer.imported, 2)
+        incident = CriticalIncident.objects.get(incident='Broken flask')
+        self.assertEqual(incident.department, self.dept)
+        self.assertEqual(set(incident.category), {'other', 'infrastructure'})
+        self.assertEqual(incident.comments.get().author, self.author)
+
+    def test_comment_codes_are_generated_and_unique(self):
+        IncidentImporter(self.dept).run([incident_row() for _ in range(20)])
+        codes = CriticalIncident.objects.values_list('comment_code', flat=True)
+        self.assertNotIn('', codes)
+        self.assertEqual(len(set(codes)), 20)
+
+    def test_invalid_rows_are_skipped_and_reported(self):
+        future = (date.today() + timedelta(days=3)).isoformat()
+        rows = [incident_row(), incident_row(date=future),
+                incident_row(comments=[{'author': 'nobody', 'text': 'Hi'}])]
+        importer = IncidentImporter(self.dept).run(rows)
+        self.assertEqual(importer.imported, 1)
+        self.assertEqual([number for number, _ in importer.errors], [2, 3])
+
+    def test_dry_run_saves_nothing(self):
+        importer = IncidentImporter(self.dept, dry_run=True).run([incident_row()])
+        self.assertEqual(importer.imported, 1)
+        self.assertEqual(CriticalIncident.objects.count(), 0)
+
+
+class ImportCommandTest(TestCase):
+
+    def setUp(self):
+        self.dept = mommy.make_recipe('cirs.department')
+        create_user('rev')
+
+    def write_file(self, suffix, rows):
+        handle, file_name = tempfile.mkstemp(suffix=suffix)
+        self.addCleanup(os.remove, file_name)
+        with os.fdopen(handle, 'w', newline='') as f:
+            if suffix == '.csv':
+                writer = csv.DictWriter(f, fieldnames=list(incident_row()) + ['comments'])
+                writer.writeheader()
+                for row in rows:
+                    writer.writerow(row)
+            else:
+                json.dump(rows, f)
+        return file_name
+
+    def test_import_csv_with_comments(self):
+        comments = json.dumps([{'author': 'rev', 'text': 'Checked'}])
+        file_name = self.write_file('.csv', [incident_row(comments=comments), incident_row()])
+        call_command('import_incidents', self.dept.label, file_name, stdout=StringIO())
+        self.assertEqual(CriticalIncident.objects.filter(department=self.dept).count(), 2)
+        self.assertEqual(Comment.objects.get().text, 'Checked')
+
+    def test_malformed_comments_skip_only_their_row(self):
+        file_name = self.write_file('.csv', [incident_row(comments='[{"author": '),
+                                             incident_row()])
+        out = StringIO()
+        call_command('import_incidents', self.dept.label, file_name, '--batch-size', '1',
+                     stdout=out, stderr=StringIO())
+        self.assertEqual(CriticalIncident.objects.count(), 1)
+
+    def test_import_json_dry_run(self):
+        file_name = self.write_file('.json', [incident_row()])
+        out = StringIO()
+        call_command('import_incidents', self.dept.label, file_name, '--dry-run', stdout=out)
+        self.assertIn('1 incidents are valid', out.getvalue())
+        self.assertEqual(CriticalIncident.objects.count(), 0)
+
+
+class ImportAdminTest(TestCase):
+
+    def setUp(self):
+        self.dept = mommy.make_recipe('cirs.department')
+        self.reviewer = mommy.make_recipe('cirs.reviewer')
+        self.dept.reviewers.add(self.reviewer)
+        self.client.force_login(self.reviewer.user)
+
+    def upload(self):
+        upload = SimpleUploadedFile('incidents.json', json.dumps([incident_row()]).encode())
+        return self.client.post(reverse('admin:cirs_criticalincident_import'),
+                                {'department': self.dept.pk, 'file': upload, 'dry_run': ''})
+
+    def test_reviewer_with_add_permission_can_upload_incidents_for_own_department(self):
+        self.reviewer.user.user_permissions.add(
+            Permission.objects.get(codename='add_criticalincident'))
+        self.upload()
+        self.assertEqual(CriticalIncident.objects.filter(department=self.dept).count(), 1)
+
+    def test_import_requires_add_permission(self):
+        self.assertEqual(self.upload().status_code, 403)
+        self.assertEqual(CriticalIncident.objects.count(), 0)
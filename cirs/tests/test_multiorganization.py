@@ -107,8 +107,8 @@ class DepartmentTest(DepartmentBase):
             )
         )
 
-    def test_reviewers_use_filter_horizontal(self):
-        self.assertIn('reviewers', DepartmentAdmin.filter_horizontal)
+    def test_reviewers_use_autocomplete(self):
+        self.assertIn('reviewers', DepartmentAdmin.autocomplete_fields)
         
     def test_department_label_cannot_contain_spaces(self):
         dept = Department({'label': 'x y', 'name': 'Name', 
@@ -471,7 +471,7 @@ class CriticalIncidentWithDepartment(TestCase):
     
     def test_critical_incident_inherits_department_from_creating_reporter(self):
         reporter = create_role(Reporter, 'reporter')
-        dept = mommy.make(Department, reporter=reporter)
+        dept = mommy.make(Department, reporter=reporter, active=True)
         ci = mommy.prepare(CriticalIncident, public=True, id=1, photo='', department=dept, _fill_optional=True)
         self.client.login(username=reporter.user.username, password=reporter.user.username)
         self.client.post(reverse('create_incident', kwargs={'dept': dept.label}), data=ci.__dict__)
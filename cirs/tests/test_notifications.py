@@ -0,0 +1,113 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+import io
+from datetime import date, timedelta
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from model_mommy import mommy
+
+from cirs.forms import IncidentCreateForm
+from cirs.models import NotificationEvent
+from cirs.notifications import send_digests
+
+from .helpers import create_user
+
+
+class NotificationDigestTest(TestCase):
+
+    def setUp(self):
+        self.dept = mommy.make_recipe('cirs.department')
+        self.reviewer = create_user('reviewer')
+        self.config = self.prepare_config(self.dept, 'hourly')
+
+    def prepare_config(self, dept, mode):
+        config = dept.labcirsconfig
+        config.send_notification = True
+        config.notification_mode = mode
+        config.notification_sender_email = 'labcirs@labcirs.edu'
+        config.notification_text = 'Please check LabCIRS.'
+        config.save()
+        config.notification_recipients.add(self.reviewer)
+        return config
+
+    def report_incident(self, dept=None):
+        form = IncidentCreateForm({
+            'date': date(2015, 7, 31), 'incident': 'A strange incident happened',
+            'reason': 'No one knows', 'immediate_action': 'No action possible',
+            'preventability': 'indistinct', 'public': True})
+        form.instance.department = dept or self.dept
+        form.save()
+
+    def test_events_are_queued_instead_of_sent(self):
+        self.report_incident()
+        self.assertEqual(len(mail.outbox), 0)
+        event = NotificationEvent.objects.get()
+        self.assertEqual((event.recipient, event.subject),
+                         (self.reviewer, 'New critical incident'))
+
+    def test_digest_is_sent_after_interval(self):
+        for _ in range(3):
+            self.report_incident()
+        self.assertEqual(send_digests(), 0)
+        later = timezone.now() + timedelta(hours=1)
+        with self.assertNumQueries(2):
+            # one query for the events and one for their removal
+            self.assertEqual(send_digests(later), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        message = mail.outbox[0]
+        self.assertEqual((message.to, message.from_email),
+                         ([self.reviewer.email], 'labcirs@labcirs.edu'))
+        self.assertEqual(message.subject, 'LabCIRS: 3 new notifications')
+        self.assertTrue(message.body.startswith('Please check LabCIRS.'))
+        self.assertEqual(message.body.count('New critical incident'), 3)
+        self.assertFalse(NotificationEvent.objects.exists())
+
+    def test_daily_digest_waits_a_day(self):
+        self.config.notification_mode = 'daily'
+        self.config.save()
+        self.report_incident()
+        self.assertEqual(send_digests(timezone.now() + timedelta(hours=2)), 0)
+        self.assertEqual(send_digests(timezone.now() + timedelta(days=1)), 1)
+
+    def test_one_message_per_recipient(self):
+        other = create_user('other')
+        self.config.notification_recipients.add(other)
+        self.report_incident()
+        self.report_incident()
+        send_digests(timezone.now() + timedelta(hours=1))
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox),
+                         sorted([self.reviewer.email, other.email]))
+
+    def test_leftovers_are_sent_after_switching_to_immediate(self):
+        self.report_incident()
+        self.config.notification_mode = 'immediate'
+        self.config.save()
+        call_command('send_notification_digests', stdout=io.StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_immediate_mode_sends_right_away(self):
+        dept = mommy.make_recipe('cirs.department')
+        self.prepare_config(dept, 'immediate')
+        self.report_incident(dept)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertFalse(NotificationEvent.objects.exists())
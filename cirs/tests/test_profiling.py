@@ -0,0 +1,116 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+import marshal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from cirs.models import ProfileReport
+from cirs.profiling import COOKIE_NAME, QUERY_PARAMETER, get_token
+
+from .helpers import create_user
+
+
+class ProfilingTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.admin = create_user('admin', superuser=True)
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:index')
+
+    def start(self):
+        self.client.post(reverse('admin:cirs_profilereport_start'))
+
+    def test_started_profiling_records_requests(self):
+        self.start()
+        response = self.client.get(self.url)
+        report = ProfileReport.objects.get()
+        self.assertEqual(response['X-Profile-Report'],
+                         reverse('admin:cirs_profilereport_change', args=[report.pk]))
+        self.assertEqual((report.path, report.status_code), (self.url, 200))
+        self.assertEqual(report.query_count, len(report.queries))
+        functions = [name for _, _, name in marshal.loads(bytes(report.stats))]
+        self.assertIn('index', functions)
+
+    def test_queries_have_origin(self):
+        self.start()
+        self.client.get(reverse('admin:cirs_department_changelist'))
+        origins = [frame for query in ProfileReport.objects.get().queries
+                   for frame in query['origin']]
+        self.assertTrue(any(frame.startswith('cirs/') for frame in origins))
+
+    def test_query_parameter_profiles_single_request(self):
+        self.client.get(self.url, {QUERY_PARAMETER: get_token(self.admin)})
+        self.client.get(self.url)
+        self.assertEqual(ProfileReport.objects.count(), 1)
+
+    async def test_requests_are_profiled_under_asgi(self):
+        self.async_client.cookies = self.client.cookies
+        response = await self.async_client.get(
+            self.url, {QUERY_PARAMETER: get_token(self.admin)})
+        self.assertTrue(response.has_header('X-Profile-Report'))
+        self.assertEqual(await ProfileReport.objects.acount(), 1)
+
+    def test_stopped_profiling_records_nothing(self):
+        self.start()
+        self.client.post(reverse('admin:cirs_profilereport_stop'))
+        self.client.get(self.url)
+        # only the request stopping it was profiled
+        self.assertEqual(ProfileReport.objects.get().path,
+                         reverse('admin:cirs_profilereport_stop'))
+
+    def test_token_of_other_user_is_ignored(self):
+        other = create_user('other', superuser=True)
+        self.client.cookies[COOKIE_NAME] = get_token(other)
+        self.client.get(self.url)
+        self.assertFalse(ProfileReport.objects.exists())
+
+    def test_users_without_superuser_status_are_not_profiled(self):
+        user = create_user('staff')
+        user.is_staff = True
+        user.save()
+        self.client.force_login(user)
+        self.client.cookies[COOKIE_NAME] = get_token(user)
+        self.client.get(self.url)
+        self.assertFalse(ProfileReport.objects.exists())
+
+    @override_settings(THROTTLE_RATES={'profiling:user': '2/h'}, PROFILING_KEEP_REPORTS=1)
+    def test_profiled_requests_and_reports_are_limited(self):
+        self.start()
+        for _ in range(3):
+            self.client.get(self.url)
+        # the request to start profiling was the first one
+        self.assertEqual(ProfileReport.objects.count(), 1)
+        self.assertFalse(self.client.get(self.url).has_header('X-Profile-Report'))
+
+    def test_report_is_shown_and_downloaded(self):
+        self.client.get(self.url, {QUERY_PARAMETER: get_token(self.admin)})
+        report = ProfileReport.objects.get()
+        response = self.client.get(reverse('admin:cirs_profilereport_change', args=[report.pk]))
+        self.assertContains(response, 'function calls')
+        response = self.client.get(
+            reverse('admin:cirs_profilereport_download', args=[report.pk]))
+        self.assertEqual(response.content, bytes(report.stats))
+
+    def test_invalid_report_id_is_not_found(self):
+        response = self.client.get(reverse('admin:cirs_profilereport_change', args=['abc']))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,107 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from cirs.models import Department, LabCIRSConfig, Reviewer
+from cirs.provisioning import provision_departments, read_department_specs
+
+from .helpers import create_role, create_user
+
+
+def department_specs(quantity, start=0, reviewers=()):
+    return [{'label': 'dept{}'.format(i), 'name': 'Department {}'.format(i),
+             'reporter': 'rep{}'.format(i), 'reviewers': list(reviewers)}
+            for i in range(start, start + quantity)]
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ProvisioningTest(TestCase):
+
+    def test_departments_are_created_completely(self):
+        provision_departments(department_specs(3, reviewers=[('newrev', 'newrev@localhost')]))
+        self.assertEqual(LabCIRSConfig.objects.count(), 3)
+        reviewer = Reviewer.objects.get(user__username='newrev')
+        self.assertEqual(reviewer.departments.count(), 3)
+        self.assertTrue(reviewer.user.is_staff)
+        self.assertTrue(reviewer.user.has_perm('cirs.change_criticalincident'))
+
+    def test_reporter_can_log_in_with_generated_password(self):
+        (department, password), = provision_departments(department_specs(1))
+        self.assertTrue(self.client.login(username=department.reporter.user.username,
+                                          password=password))
+
+    def test_number_of_queries_does_not_depend_on_number_of_departments(self):
+        with CaptureQueriesContext(connection) as few:
+            provision_departments(department_specs(1, reviewers=[('rev1', '')]))
+        with CaptureQueriesContext(connection) as many:
+            provision_departments(department_specs(20, start=1, reviewers=[('rev2', '')]))
+        self.assertEqual(len(few), len(many))
+
+    def test_nothing_is_created_if_one_department_is_invalid(self):
+        create_role(Reviewer, 'rev')
+        specs = department_specs(2)
+        specs[1]['reporter'] = 'rev'
+        with self.assertRaises(ValidationError):
+            provision_departments(specs)
+        self.assertEqual(Department.objects.count(), 0)
+        self.assertFalse(User.objects.filter(username='rep0').exists())
+
+    def test_invalid_values_are_reported_before_saving(self):
+        specs = department_specs(3)
+        specs[0]['label'] = 'dept with spaces'
+        specs[1]['label'] = 'x' * 33
+        specs[2]['reporter'] = 'rep 2!'
+        with self.assertRaises(ValidationError) as context:
+            provision_departments(specs)
+        self.assertEqual(len(context.exception.messages), 3)
+        self.assertEqual(Department.objects.count(), 0)
+
+    def test_missing_columns_are_reported(self):
+        with self.assertRaisesMessage(ValidationError, 'Missing columns: label.'):
+            list(read_department_specs(StringIO('name,reporter\nLab 1,rep1\n')))
+
+    def test_management_command_reads_csv(self):
+        handle, file_name = tempfile.mkstemp(suffix='.csv')
+        self.addCleanup(os.remove, file_name)
+        with os.fdopen(handle, 'w') as f:
+            f.write('label,name,reporter,reporter_password,reviewers,active\n'
+                    'lab1,Lab 1,rep1,secret,rev1:rev1@localhost;rev2,true\n'
+                    'lab2,Lab 2,rep2,,rev1,false\n')
+        call_command('provision_departments', file_name, stdout=StringIO())
+        self.assertEqual(Department.objects.get(label='lab1').reviewers.count(), 2)
+        self.assertFalse(Department.objects.get(label='lab2').active)
+        self.assertTrue(User.objects.get(username='rep1').check_password('secret'))
+
+    def test_superuser_can_provision_in_admin(self):
+        self.client.force_login(create_user('admin', superuser=True))
+        upload = StringIO('label,name,reporter\nlab1,Lab 1,rep1\n')
+        upload.name = 'departments.csv'
+        self.client.post(reverse('admin:cirs_department_provision'), {'file': upload})
+        self.assertTrue(Department.objects.filter(label='lab1').exists())
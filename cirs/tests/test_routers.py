@@ -0,0 +1,120 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.db import connections, transaction
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from model_mommy import mommy
+
+from cirs.models import CriticalIncident, Reviewer
+from cirs.routers import (PIN_COOKIE, REPLICA_ALIAS, ReplicaRouter,
+                          replica_reads)
+
+from .helpers import create_role
+
+
+class RecordingRouter(ReplicaRouter):
+    reads = []
+
+    def db_for_read(self, model, **hints):
+        alias = super(RecordingRouter, self).db_for_read(model, **hints)
+        self.reads.append(alias)
+        return alias
+
+
+class ReplicaRouterTest(TransactionTestCase):
+    """Without the transaction of TestCase, which keeps reads on the primary."""
+
+    def test_reads_use_primary_by_default(self):
+        self.assertEqual(ReplicaRouter().db_for_read(CriticalIncident), 'default')
+
+    def test_reads_use_replica_when_allowed(self):
+        with replica_reads():
+            self.assertEqual(ReplicaRouter().db_for_read(CriticalIncident), REPLICA_ALIAS)
+
+    def test_sessions_use_primary(self):
+        with replica_reads():
+            self.assertEqual(ReplicaRouter().db_for_read(Session), 'default')
+
+    def test_reads_after_write_use_primary(self):
+        router = ReplicaRouter()
+        with replica_reads():
+            router.db_for_write(CriticalIncident)
+            self.assertEqual(router.db_for_read(CriticalIncident), 'default')
+
+    def test_reads_in_transactions_use_primary(self):
+        with replica_reads(), transaction.atomic():
+            self.assertEqual(ReplicaRouter().db_for_read(CriticalIncident), 'default')
+
+    def test_replica_is_not_migrated(self):
+        self.assertFalse(ReplicaRouter().allow_migrate(REPLICA_ALIAS, 'cirs'))
+
+
+@override_settings(DATABASE_ROUTERS=['cirs.tests.test_routers.RecordingRouter'],
+                   MIDDLEWARE=settings.MIDDLEWARE + ['cirs.routers.ReplicaMiddleware'])
+class ReplicaMiddlewareTest(TransactionTestCase):
+    """The replica mirrors the default database like TEST['MIRROR'] does."""
+
+    @classmethod
+    def setUpClass(cls):
+        super(ReplicaMiddlewareTest, cls).setUpClass()
+        connections.settings[REPLICA_ALIAS] = connections.settings['default']
+        connections[REPLICA_ALIAS] = connections['default']
+
+    @classmethod
+    def tearDownClass(cls):
+        del connections[REPLICA_ALIAS]
+        del connections.settings[REPLICA_ALIAS]
+        super(ReplicaMiddlewareTest, cls).tearDownClass()
+
+    def setUp(self):
+        self.dept = mommy.make_recipe('cirs.department')
+        self.client.force_login(self.dept.reporter.user)
+        RecordingRouter.reads.clear()
+
+    def test_published_incidents_are_read_from_replica(self):
+        response = self.client.get(reverse('incidents_for_department',
+                                           kwargs={'dept': self.dept.label}))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(REPLICA_ALIAS, RecordingRouter.reads)
+
+    def test_incident_search_uses_primary(self):
+        incident = mommy.make_recipe('cirs.public_ci', department=self.dept)
+        response = self.client.post(reverse('incident_search', kwargs={'dept': self.dept.label}),
+                                    {'incident_code': incident.comment_code})
+        self.assertNotIn(REPLICA_ALIAS, RecordingRouter.reads)
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+    def test_client_stays_on_primary_after_writing(self):
+        self.client.cookies[PIN_COOKIE] = '1'
+        self.client.get(reverse('incidents_for_department', kwargs={'dept': self.dept.label}))
+        self.assertNotIn(REPLICA_ALIAS, RecordingRouter.reads)
+
+    def test_admin_changelist_is_read_from_replica(self):
+        reviewer = create_role(Reviewer, 'reviewer')
+        reviewer.user.is_staff = True
+        reviewer.user.save()
+        self.dept.reviewers.add(reviewer)
+        self.client.force_login(reviewer.user)
+        RecordingRouter.reads.clear()
+        response = self.client.get(reverse('admin:cirs_criticalincident_changelist'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(REPLICA_ALIAS, RecordingRouter.reads)
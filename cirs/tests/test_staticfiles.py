@@ -0,0 +1,87 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+import gzip
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.http import Http404
+from django.templatetags.static import static
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from cirs.staticfiles import CompressedManifestStaticFilesStorage, serve_static
+
+CSS = b'body { background: url("missing.png"); }\n' + b'p { color: black; }\n' * 50
+
+
+class StaticFilesTest(SimpleTestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.storage = CompressedManifestStaticFilesStorage(location=self.root)
+        self.storage.save('css/site.css', ContentFile(CSS))
+        list(self.storage.post_process(
+            {'css/site.css': (self.storage, 'css/site.css')}))
+        self.hashed_name = self.storage.stored_name('css/site.css')
+        self.factory = RequestFactory()
+        self.settings = override_settings(STATIC_ROOT=self.root)
+        self.settings.enable()
+        self.addCleanup(self.settings.disable)
+        self.patch = mock.patch('cirs.staticfiles.staticfiles_storage', self.storage)
+        self.patch.start()
+        self.addCleanup(self.patch.stop)
+
+    def serve(self, path, **headers):
+        return serve_static(self.factory.get('/static/' + path, **headers), path)
+
+    def test_collected_file_is_hashed_and_compressed(self):
+        self.assertRegex(self.hashed_name, r'^css/site\.[0-9a-f]{12}\.css$')
+        with open(self.storage.path(self.hashed_name + '.gz'), 'rb') as compressed:
+            content = gzip.decompress(compressed.read())
+        self.assertEqual(content, self.storage.open(self.hashed_name).read())
+
+    def test_reference_to_missing_file_is_kept(self):
+        self.assertIn(b'url("missing.png")', self.storage.open(self.hashed_name).read())
+
+    def test_unknown_file_keeps_plain_name(self):
+        self.assertEqual(static('js/unknown.js'), '/static/js/unknown.js')
+
+    def test_compressed_variant_is_served_if_accepted(self):
+        response = self.serve(self.hashed_name, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertIn('immutable', response['Cache-Control'])
+
+    def test_plain_file_is_served_without_accept_encoding(self):
+        response = self.serve('css/site.css')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(response.streaming_content), CSS)
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+
+    def test_refused_encoding_is_not_served(self):
+        response = self.serve(self.hashed_name, HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_path_outside_static_root_is_not_found(self):
+        with self.assertRaises(Http404):
+            self.serve('../etc/passwd')
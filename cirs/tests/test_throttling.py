@@ -0,0 +1,134 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+import io
+import json
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from model_mommy import mommy
+
+from cirs.throttling import Throttle, get_counters, get_rate
+
+from .helpers import create_user
+
+RATES = {'login:ip': '3/m', 'login:username': '2/m', 'login:client': '5/m',
+         'incident_search:ip': '3/m', 'incident_search:department': '2/h',
+         'incident_search:client': '5/h'}
+
+
+@override_settings(THROTTLE_RATES=RATES)
+class ThrottleTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_rate_with_multiplier(self):
+        with self.settings(THROTTLE_RATES={'login:ip': '10/15m'}):
+            self.assertEqual(get_rate('login:ip'), (10, 900))
+
+    def test_bucket_is_emptied_and_refilled(self):
+        throttle = Throttle('login', ip='10.0.0.1')
+        for _ in range(3):
+            self.assertFalse(throttle.get_retry_after(now=1000))
+            throttle.consume(now=1000)
+        self.assertAlmostEqual(throttle.get_retry_after(now=1000), 20)
+        # one token every 20 seconds
+        self.assertFalse(throttle.get_retry_after(now=1020))
+
+    def test_buckets_are_separated_by_key(self):
+        Throttle('login', ip='10.0.0.1').consume('ip', now=1000)
+        for _ in range(2):
+            Throttle('login', ip='10.0.0.1').consume(now=1000)
+        self.assertTrue(Throttle('login', ip='10.0.0.1').get_retry_after(now=1000))
+        self.assertFalse(Throttle('login', ip='10.0.0.2').get_retry_after(now=1000))
+
+
+@override_settings(THROTTLE_RATES=RATES)
+class LoginThrottleTest(TestCase):
+
+    url = reverse('login')
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user('reviewer')
+
+    def login(self, password, ip='127.0.0.1'):
+        return self.client.post(self.url, {'username': 'reviewer', 'password': password},
+                                REMOTE_ADDR=ip)
+
+    def test_failed_attempts_lock_the_user_name(self):
+        for _ in range(2):
+            self.assertEqual(self.login('wrong').status_code, 200)
+        response = self.login('reviewer')
+        self.assertEqual(response.status_code, 429)
+        self.assertContains(response, 'Too many login attempts', status_code=429)
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+    def test_locked_user_name_does_not_refuse_other_addresses(self):
+        for _ in range(2):
+            self.login('wrong', ip='10.0.0.1')
+        response = self.login('reviewer', ip='10.0.0.2')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'Too many login attempts')
+        self.assertNotContains(response, 'incorrect')
+
+    def test_successful_attempts_count_only_for_the_address(self):
+        for _ in range(3):
+            self.login('reviewer')
+            self.client.logout()
+        self.assertEqual(self.login('reviewer').status_code, 429)
+
+    def test_counters_are_exposed(self):
+        for _ in range(3):
+            self.login('wrong')
+        self.assertEqual(get_counters()['login'], {'allowed': 2, 'refused': 1})
+        out = io.StringIO()
+        call_command('throttle_stats', '--json', stdout=out)
+        self.assertEqual(json.loads(out.getvalue())['login']['refused'], 1)
+
+
+@override_settings(THROTTLE_RATES=RATES)
+class IncidentSearchThrottleTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.ci = mommy.make_recipe('cirs.public_ci')
+        self.client.force_login(self.ci.department.reporter.user)
+        self.url = reverse('incident_search', kwargs={'dept': self.ci.department.label})
+
+    def test_guessing_is_refused_without_lookup(self):
+        for _ in range(2):
+            self.client.post(self.url, {'incident_code': 'guessed'})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {'incident_code': self.ci.comment_code})
+        self.assertContains(response, 'Too many searches', status_code=429)
+        self.assertFalse([query for query in queries.captured_queries
+                          if 'cirs_criticalincident' in query['sql']])
+
+    def test_guessing_does_not_refuse_other_addresses(self):
+        for _ in range(2):
+            self.client.post(self.url, {'incident_code': 'guessed'}, REMOTE_ADDR='10.0.0.1')
+        response = self.client.post(self.url, {'incident_code': self.ci.comment_code},
+                                    REMOTE_ADDR='10.0.0.2')
+        self.assertRedirects(response, self.ci.get_absolute_url())
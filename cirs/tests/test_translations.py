@@ -0,0 +1,180 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+import io
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from model_mommy import mommy
+
+from cirs import translations
+from cirs.models import ChangeLogEntry, PublishableIncident
+
+LANGUAGES = {None: ({'code': 'en'}, {'code': 'de'}),
+             'default': {'fallbacks': ['en', 'de'], 'hide_untranslated': False}}
+
+
+class TranslationBatchTest(TestCase):
+
+    def setUp(self):
+        # parler caches translations by ids, which are reused after rollbacks
+        cache.clear()
+        self.dept = mommy.make_recipe('cirs.department')
+
+    def make_publishable(self, dept=None, **translations):
+        incident = mommy.make_recipe('cirs.public_ci', department=dept or self.dept,
+                                     status='completed')
+        publishable = PublishableIncident(critical_incident=incident)
+        for language_code, text in translations.items():
+            publishable.set_current_language(language_code)
+            publishable.incident = publishable.description = text
+            publishable.measures_and_consequences = text
+        publishable.save()
+        return publishable
+
+    def test_batch_is_loaded_with_two_queries(self):
+        missing = [self.make_publishable(en='Done'), self.make_publishable(en='Done', de='')]
+        self.make_publishable(en='Done', de='Fertig')
+        with self.assertNumQueries(2):
+            rows = translations.load_batch(translations.missing_translations(
+                PublishableIncident.objects.all(), 'de'), 'de', 'en')
+        self.assertEqual([row['pk'] for row in rows], [pi.pk for pi in missing])
+        self.assertEqual(rows[0]['source']['incident'], 'Done')
+        self.assertEqual(rows[0]['target']['incident'], '')
+
+    def test_translations_are_created_and_updated(self):
+        new = self.make_publishable(en='Done')
+        partial = self.make_publishable(en='Done', de='')
+        created, updated = translations.save_translations(
+            PublishableIncident.objects.all(), 'de', {
+                new.pk: {'incident': 'Fertig', 'description': ''},
+                partial.pk: {'description': 'Beschreibung'}})
+        self.assertEqual((created, updated), (1, 1))
+        new = PublishableIncident.objects.get(pk=new.pk)
+        self.assertEqual(new.safe_translation_getter('incident', language_code='de'), 'Fertig')
+        partial = PublishableIncident.objects.get(pk=partial.pk)
+        partial.set_current_language('de')
+        self.assertEqual((partial.incident, partial.description), ('', 'Beschreibung'))
+        self.assertEqual(ChangeLogEntry.objects.filter(
+            object_pk=new.pk, model='cirs.publishableincident',
+            action='changed').last().changed_fields, ['incident:de'])
+
+    def test_incidents_outside_of_queryset_are_ignored(self):
+        other = self.make_publishable(dept=mommy.make_recipe('cirs.department'), en='Done')
+        translations.save_translations(
+            PublishableIncident.objects.filter(critical_incident__department=self.dept),
+            'de', {other.pk: {'incident': 'Fertig'}})
+        self.assertFalse(PublishableIncident._parler_meta.root_model.objects.filter(
+            language_code='de').exists())
+
+    def test_invalid_texts_are_not_saved(self):
+        valid = self.make_publishable(en='Done')
+        invalid = self.make_publishable(en='Done')
+        with self.assertRaises(ValidationError):
+            translations.save_translations(PublishableIncident.objects.all(), 'de', {
+                valid.pk: {'incident': 'Fertig'}, invalid.pk: {'incident': 'x' * 256}})
+        self.assertFalse(PublishableIncident._parler_meta.root_model.objects.filter(
+            language_code='de').exists())
+
+    def test_round_trip(self):
+        rows = [{'pk': 3,
+                 'source': {'incident': 'A "quoted" text', 'description': 'Two\nlines\n',
+                            'measures_and_consequences': ''},
+                 'target': {'incident': 'Ein Text', 'description': 'Tab\tand \\n',
+                            'measures_and_consequences': 'Zeile\n'}}]
+        for stream, write, read in ((io.StringIO(), translations.write_po, translations.read_po),
+                                    (io.BytesIO(), translations.write_xliff,
+                                     translations.read_xliff)):
+            write(rows, 'en', 'de', stream)
+            stream.seek(0)
+            self.assertEqual(read(stream), ('de', {3: rows[0]['target']}))
+
+    def test_fuzzy_po_entries_are_skipped(self):
+        po = ('msgid ""\nmsgstr "Language: de\\n"\n\n#, fuzzy\nmsgctxt "3.incident"\n'
+              'msgid "Done"\nmsgstr "Fertig"\n\nmsgctxt "3.description"\nmsgid ""\n'
+              'msgstr ""\n"Zwei\\n"\n"Zeilen"\n')
+        self.assertEqual(translations.read_po(io.StringIO(po)),
+                         ('de', {3: {'description': 'Zwei\nZeilen'}}))
+
+    def test_invalid_unit_is_rejected(self):
+        with self.assertRaises(ValueError):
+            translations.read_po(io.StringIO('msgctxt "3.publish"\nmsgid ""\nmsgstr "1"\n'))
+
+
+@override_settings(PARLER_LANGUAGES=LANGUAGES)
+class TranslationAdminTest(TestCase):
+
+    url = reverse('admin:cirs_publishableincident_translations')
+
+    def setUp(self):
+        cache.clear()
+        self.dept = mommy.make_recipe('cirs.department')
+        self.reviewer = mommy.make_recipe('cirs.reviewer')
+        self.dept.reviewers.add(self.reviewer)
+        self.client.force_login(self.reviewer.user)
+        self.params = {'department': self.dept.pk, 'language': 'de'}
+        incident = mommy.make_recipe('cirs.public_ci', department=self.dept, status='completed')
+        self.publishable = PublishableIncident.objects.create(
+            critical_incident=incident, incident='Done')
+
+    def get_translation(self):
+        return PublishableIncident.objects.get(pk=self.publishable.pk).safe_translation_getter(
+            'incident', language_code='de')
+
+    def test_grid_lists_missing_translations(self):
+        response = self.client.get(self.url, self.params)
+        self.assertEqual([row['pk'] for row in response.context['rows']], [self.publishable.pk])
+        self.assertContains(response, 'name="{}-incident"'.format(self.publishable.pk))
+
+    def test_grid_is_limited_to_own_departments(self):
+        other = mommy.make_recipe('cirs.department')
+        response = self.client.get(self.url, {'department': other.pk, 'language': 'de'})
+        self.assertTrue(response.context['form'].errors)
+
+    def test_grid_lists_all_departments_for_superusers(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'secret')
+        self.client.force_login(admin)
+        response = self.client.get(self.url, self.params)
+        self.assertEqual([row['pk'] for row in response.context['rows']], [self.publishable.pk])
+
+    def test_grid_saves_all_rows(self):
+        response = self.client.post('{}?department={}&language=de'.format(
+            self.url, self.dept.pk), {'{}-incident'.format(self.publishable.pk): 'Fertig'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.get_translation(), 'Fertig')
+
+    def test_export_and_import_xliff(self):
+        response = self.client.get(self.url, dict(self.params, format='xliff'))
+        self.assertEqual(response['Content-Type'], 'application/x-xliff+xml')
+        content = response.content.replace(b'<target />', b'<target>Fertig</target>', 1)
+        response = self.client.post(
+            reverse('admin:cirs_publishableincident_import_translations'),
+            {'file': SimpleUploadedFile('batch.xlf', content)}, follow=True)
+        self.assertContains(response, '1 translations created')
+        self.assertEqual(self.get_translation(), 'Fertig')
+
+    def test_import_of_unknown_format_is_reported(self):
+        response = self.client.post(
+            reverse('admin:cirs_publishableincident_import_translations'),
+            {'file': SimpleUploadedFile('batch.txt', b'Fertig')}, follow=True)
+        self.assertContains(response, 'The file could not be read')
@@ -0,0 +1,118 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+from django.contrib.admin import helpers
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from model_mommy import mommy
+
+from cirs.models import ChangeLogEntry, CriticalIncident, Department, PublishableIncident
+
+
+class BulkReviewActionTest(TestCase):
+
+    url = reverse('admin:cirs_criticalincident_changelist')
+
+    def setUp(self):
+        # parler caches translations by ids, which are reused after rollbacks
+        cache.clear()
+        self.dept = mommy.make_recipe('cirs.department')
+        self.reviewer = mommy.make_recipe('cirs.reviewer')
+        self.dept.reviewers.add(self.reviewer)
+        self.client.force_login(self.reviewer.user)
+
+    def make_incidents(self, quantity, **kwargs):
+        kwargs.setdefault('department', self.dept)
+        return [mommy.make_recipe('cirs.public_ci', **kwargs) for _ in range(quantity)]
+
+    def run_action(self, action, incidents, **data):
+        data.update({'action': action,
+                     helpers.ACTION_CHECKBOX_NAME: [incident.pk for incident in incidents]})
+        return self.client.post(self.url, data)
+
+    def test_status_action_shows_form_first(self):
+        incidents = self.make_incidents(2)
+        response = self.run_action('change_status', incidents)
+        self.assertTemplateUsed(response, 'admin/cirs/criticalincident/bulk_update_form.html')
+        self.assertNotIn(('new', 'new'), response.context['form'].fields['status'].choices)
+        self.assertEqual(CriticalIncident.objects.filter(status='new').count(), 2)
+
+    def test_status_is_changed_with_one_update(self):
+        incidents = self.make_incidents(3)
+        response = self.run_action('change_status', incidents, apply=1,
+                                   status='in process', responsibilty='Lab manager')
+        self.assertRedirects(response, self.url, fetch_redirect_response=False)
+        self.assertEqual(
+            set(CriticalIncident.objects.values_list('status', 'responsibilty')),
+            {('in process', 'Lab manager')})
+        self.assertEqual(ChangeLogEntry.objects.filter(
+            model='cirs.criticalincident', action='changed').count(), 3)
+        self.assertEqual(Department.objects.get(pk=self.dept.pk).new_incident_count, 0)
+        self.assertContains(self.client.get(self.url), '3 incidents were changed.')
+
+    def test_invalid_values_are_rejected(self):
+        incidents = self.make_incidents(1)
+        response = self.run_action('change_status', incidents, apply=1, status='new')
+        self.assertTrue(response.context['form'].errors)
+        self.assertEqual(CriticalIncident.objects.get().status, 'new')
+
+    def test_classification_skips_new_incidents(self):
+        new = self.make_incidents(1)[0]
+        reviewed = self.make_incidents(2, status='in process')
+        self.run_action('classify', [new] + reviewed, apply=1, risk='high')
+        self.assertEqual(CriticalIncident.objects.get(pk=new.pk).risk, '')
+        self.assertEqual(CriticalIncident.objects.filter(risk='high').count(), 2)
+
+    def test_unchanged_incidents_are_not_logged(self):
+        self.make_incidents(2, status='completed')
+        self.run_action('change_status', CriticalIncident.objects.all(), apply=1,
+                        status='completed')
+        self.assertFalse(ChangeLogEntry.objects.filter(
+            model='cirs.criticalincident', action='changed').exists())
+
+    def test_incidents_of_other_departments_are_not_changed(self):
+        other = self.make_incidents(1, department=mommy.make_recipe('cirs.department'))
+        own = self.make_incidents(1)
+        self.run_action('change_status', other + own, apply=1, status='completed')
+        self.assertEqual(CriticalIncident.objects.get(pk=other[0].pk).status, 'new')
+        self.assertEqual(CriticalIncident.objects.get(pk=own[0].pk).status, 'completed')
+
+    def test_publishable_incidents_are_created(self):
+        reviewed = self.make_incidents(2, status='in process', incident='x' * 300)
+        new = self.make_incidents(1)
+        private = self.make_incidents(1, status='in process', public=False)
+        self.run_action('create_publishable_incidents', reviewed + new + private)
+        publishable = PublishableIncident.objects.all()
+        self.assertEqual({pi.critical_incident_id for pi in publishable},
+                         {incident.pk for incident in reviewed})
+        self.assertEqual(publishable[0].incident, 'x' * 255)
+        self.assertFalse(publishable[0].publish)
+        self.assertEqual(Department.objects.get(pk=self.dept.pk).unpublished_count, 2)
+        self.assertEqual(ChangeLogEntry.objects.filter(
+            model='cirs.publishableincident', action='created').count(), 2)
+        response = self.client.get(self.url)
+        self.assertContains(response, '2 publishable incidents were created.')
+        self.assertContains(response, '2 incidents were skipped')
+
+    def test_existing_publishable_incidents_are_kept(self):
+        incident = self.make_incidents(1, status='completed')[0]
+        PublishableIncident.objects.create(critical_incident=incident, incident='Own text')
+        self.run_action('create_publishable_incidents', [incident])
+        self.assertEqual(PublishableIncident.objects.get().incident, 'Own text')
@@ -86,7 +86,7 @@ class CriticalIncidentCreateViewTest(TestCase):
     def test_create_view_returns_message(self):
         user = create_user_with_perm('reporter', 'add_criticalincident')
         create_role(Reporter, user)
-        mommy.make(Department, reporter=user.reporter)
+        mommy.make(Department, reporter=user.reporter, active=True)
           
         test_incident = {'date': '07/24/2015',
                          'incident': 'A strang incident happened',
@@ -241,7 +241,7 @@ class PublishedIncidentTest(TestCase):
         """Tests if newest published incidents appear first in the table.
         Neglects jQuery.DataTables!!!"""
         reporter = create_role(Reporter, 'reporter')
-        department = mommy.make(Department, reporter=reporter)
+        department = mommy.make(Department, reporter=reporter, active=True)
         generate_three_incidents(department)
 
         self.client.force_login(reporter.user)
@@ -0,0 +1,151 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+"""
+Token buckets in the cache against scripted guessing of passwords and
+incident codes.
+
+Every scope (e.g. login) has one bucket per key (e.g. IP address or user
+name). A bucket holds up to N tokens and is refilled with N tokens per period,
+configured as "N/period" in THROTTLE_RATES, e.g. "20/m" or "10/15m". A request
+is refused while one of its buckets is empty.
+
+Some buckets are shared by many clients, e.g. the user name of the reporters
+of a department. An empty shared bucket refuses only clients which failed
+themselves, i.e. whose own bucket for failures is not full. Otherwise anybody
+could lock out a whole department with a few wrong passwords.
+
+The buckets have to live in a cache shared by all processes, e.g. Redis or
+Memcached, to limit all of them together. Updates are not atomic, so
+concurrent requests may exceed a limit slightly.
+"""
+
+import re
+import time
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+
+DEFAULT_RATES = {
+    'login:ip': '20/m',
+    # only failed attempts, reporters of a department share one account
+    'login:username': '10/15m',
+    # failed attempts of one address for one user name
+    'login:client': '10/15m',
+    'incident_search:ip': '30/m',
+    # only failed lookups
+    'incident_search:department': '100/h',
+    # failed lookups of one address in one department
+    'incident_search:client': '20/h',
+    # requests of superusers profiled by cirs.profiling
+    'profiling:user': '20/h',
+}
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+RESULTS = ('allowed', 'refused')
+
+
+def get_rate(name):
+    """Returns the capacity and the period in seconds of a bucket."""
+    rate = dict(DEFAULT_RATES, **getattr(settings, 'THROTTLE_RATES', {}))[name]
+    match = re.match(r'^(\d+)/(\d*)([smhd])$', rate)
+    if match is None:
+        raise ValueError('Invalid throttle rate {}: {}'.format(name, rate))
+    capacity, multiplier, unit = match.groups()
+    return int(capacity), int(multiplier or 1) * PERIODS[unit]
+
+
+def get_client_ip(request):
+    # a reverse proxy has to set REMOTE_ADDR to the address of the client
+    return request.META.get('REMOTE_ADDR', '')
+
+
+class Throttle(object):
+    """
+    Buckets of one scope for the given keys, e.g. ip='10.0.0.1'. shared maps
+    shared buckets to the bucket of the client, e.g. {'username': 'client'}.
+    """
+
+    def __init__(self, scope, shared=None, **keys):
+        self.scope = scope
+        self.shared = shared or {}
+        self.buckets = {
+            name: 'cirs:throttle:{}:{}:{}'.format(
+                scope, name, md5(str(value).lower().encode('utf-8')).hexdigest())
+            for name, value in keys.items()}
+
+    def get_states(self, names, now):
+        states = cache.get_many([self.buckets[name] for name in names])
+        result = {}
+        for name in names:
+            capacity, period = get_rate('{}:{}'.format(self.scope, name))
+            tokens, updated = states.get(self.buckets[name], (capacity, now))
+            result[name] = min(capacity, tokens + (now - updated) * capacity / period)
+        return result
+
+    def get_retry_after(self, now=None):
+        """Seconds until all buckets have a token again, 0 if the request is allowed."""
+        now = now or time.time()
+        retry_after = 0
+        states = self.get_states(list(self.buckets), now)
+        for name, tokens in states.items():
+            client = self.shared.get(name)
+            if client is not None and states[client] >= self.get_capacity(client):
+                # the client did not fail, it is not affected by others
+                continue
+            if tokens < 1:
+                capacity, period = get_rate('{}:{}'.format(self.scope, name))
+                retry_after = max(retry_after, (1 - tokens) * period / capacity)
+        count(self.scope, 'refused' if retry_after else 'allowed')
+        return retry_after
+
+    def get_capacity(self, name):
+        return get_rate('{}:{}'.format(self.scope, name))[0]
+
+    def consume(self, *names, now=None):
+        """Takes a token from the named buckets, by default from all of them."""
+        now = now or time.time()
+        names = names or list(self.buckets)
+        cache.set_many({
+            self.buckets[name]: (max(tokens - 1, 0), now)
+            for name, tokens in self.get_states(names, now).items()
+        }, max(get_rate('{}:{}'.format(self.scope, name))[1] for name in names))
+
+
+def get_counter_key(scope, result):
+    return 'cirs:throttle:count:{}:{}'.format(scope, result)
+
+
+def count(scope, result):
+    key = get_counter_key(scope, result)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # missing or evicted
+        cache.add(key, 1, None)
+
+
+def get_counters():
+    """Numbers of allowed and refused requests per scope for monitoring."""
+    scopes = sorted({name.split(':')[0] for name in dict(
+        DEFAULT_RATES, **getattr(settings, 'THROTTLE_RATES', {}))})
+    values = cache.get_many([get_counter_key(scope, result)
+                             for scope in scopes for result in RESULTS])
+    return {scope: {result: values.get(get_counter_key(scope, result), 0)
+                    for result in RESULTS} for scope in scopes}
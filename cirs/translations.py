@@ -0,0 +1,277 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+"""
+Translation of many publishable incidents at once.
+
+A batch holds the publishable incidents lacking a complete translation in
+the target language together with their texts in the source language. It is
+edited in the admin grid or exported as XLIFF 1.2 or PO file for translation
+tools. Empty texts never overwrite existing translations.
+"""
+
+import re
+from collections import defaultdict
+from xml.etree import ElementTree
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from parler import appsettings
+from parler.cache import get_translation_cache_key
+
+from .changelog import record_bulk_changes
+from .models import PublishableIncident, PublishableIncidentTranslation
+
+TRANSLATED_FIELDS = ('incident', 'description', 'measures_and_consequences')
+FORMATS = ('xliff', 'po')
+XLIFF_NAMESPACE = 'urn:oasis:names:tc:xliff:document:1.2'
+
+
+def get_target_languages():
+    return [lang['code'] for lang in settings.PARLER_LANGUAGES[None]
+            if lang['code'] != settings.PARLER_DEFAULT_LANGUAGE_CODE]
+
+
+def get_format(file_name):
+    extension = file_name.rsplit('.', 1)[-1].lower()
+    if extension in ('xlf', 'xliff'):
+        return 'xliff'
+    if extension == 'po':
+        return 'po'
+    raise ValueError('Unsupported file type {}. Use XLIFF (.xlf) or PO (.po) files.'.format(
+        extension))
+
+
+def forget_cached_translations(translations):
+    """
+    Removes the translations from parler's cache, which bulk operations
+    bypass. The cache may still know them as missing or hold old texts.
+    """
+    if appsettings.PARLER_ENABLE_CACHING:
+        cache.delete_many([
+            get_translation_cache_key(type(translation), translation.master_id,
+                                      translation.language_code)
+            for translation in translations])
+
+
+def missing_translations(queryset, language_code):
+    """Publishable incidents of queryset without all fields in language_code."""
+    complete = PublishableIncidentTranslation.objects.filter(
+        master=OuterRef('pk'), language_code=language_code)
+    for field in TRANSLATED_FIELDS:
+        complete = complete.exclude(**{field: ''})
+    return queryset.filter(~Exists(complete))
+
+
+def load_batch(queryset, target_language, source_language=None):
+    """
+    Returns a list of dicts with pk, source and target texts for the
+    publishable incidents of queryset, read with two queries.
+    """
+    source_language = source_language or settings.PARLER_DEFAULT_LANGUAGE_CODE
+    empty = dict.fromkeys(TRANSLATED_FIELDS, '')
+    rows = {pk: {'pk': pk, 'source': dict(empty), 'target': dict(empty)}
+            for pk in queryset.order_by('pk').values_list('pk', flat=True)}
+    translations = PublishableIncidentTranslation.objects.filter(
+        master__in=list(rows), language_code__in=(source_language, target_language))
+    for values in translations.values('master', 'language_code', *TRANSLATED_FIELDS):
+        key = 'target' if values['language_code'] == target_language else 'source'
+        rows[values['master']][key] = {field: values[field] for field in TRANSLATED_FIELDS}
+    return list(rows.values())
+
+
+def clean_texts(texts):
+    """Drops empty texts and validates the others, e.g. their length."""
+    cleaned, errors = {}, []
+    for pk, values in texts.items():
+        values = {field: value for field, value in values.items()
+                  if field in TRANSLATED_FIELDS and value}
+        for field, value in values.items():
+            try:
+                PublishableIncidentTranslation._meta.get_field(field).run_validators(value)
+            except ValidationError as error:
+                errors.extend('{} {}: {}'.format(pk, field, message)
+                              for message in error.messages)
+        if values:
+            cleaned[pk] = values
+    if errors:
+        raise ValidationError(errors)
+    return cleaned
+
+
+def save_translations(queryset, language_code, texts):
+    """
+    Creates or updates the translations in language_code of the publishable
+    incidents in queryset with bulk operations.
+
+    texts maps ids of publishable incidents to dicts of field values, ids
+    outside of queryset are ignored. Raises ValidationError without saving
+    anything if a text is invalid. Returns the numbers of created and
+    updated translations.
+    """
+    texts = clean_texts(texts)
+    with transaction.atomic():
+        allowed = set(queryset.filter(pk__in=list(texts)).values_list('pk', flat=True))
+        existing = {translation.master_id: translation for translation in
+                    PublishableIncidentTranslation.objects.filter(
+                        master__in=allowed, language_code=language_code).select_for_update()}
+        created, updated, changed_fields = [], [], {}
+        for pk in allowed:
+            translation = existing.get(pk)
+            if translation is None:
+                translation = PublishableIncidentTranslation(
+                    master_id=pk, language_code=language_code)
+                created.append(translation)
+            fields = [field for field, value in texts[pk].items()
+                      if getattr(translation, field) != value]
+            if not fields:
+                continue
+            for field in fields:
+                setattr(translation, field, texts[pk][field])
+            if translation.pk is not None:
+                updated.append(translation)
+            changed_fields[pk] = fields
+        PublishableIncidentTranslation.objects.bulk_create(created)
+        PublishableIncidentTranslation.objects.bulk_update(updated, TRANSLATED_FIELDS)
+        forget_cached_translations(created + updated)
+        # the API reports changes by the modification date
+        PublishableIncident.objects.filter(pk__in=list(changed_fields)).update(
+            modified=timezone.now())
+        pks_by_fields = defaultdict(list)
+        for pk, fields in changed_fields.items():
+            pks_by_fields[tuple(fields)].append(pk)
+        for fields, pks in pks_by_fields.items():
+            record_bulk_changes(PublishableIncident.objects.filter(pk__in=pks), [
+                '{}:{}'.format(field, language_code) for field in fields])
+    return len(created), len(updated)
+
+
+def get_unit_key(unit_id):
+    pk, _, field = unit_id.partition('.')
+    if not pk.isdigit() or field not in TRANSLATED_FIELDS:
+        raise ValueError('Invalid translation unit {}.'.format(unit_id))
+    return int(pk), field
+
+
+def write_xliff(rows, source_language, target_language, stream):
+    root = ElementTree.Element('xliff', {'version': '1.2', 'xmlns': XLIFF_NAMESPACE})
+    body = ElementTree.SubElement(ElementTree.SubElement(root, 'file', {
+        'original': 'labcirs', 'datatype': 'plaintext',
+        'source-language': source_language, 'target-language': target_language,
+    }), 'body')
+    for row in rows:
+        for field in TRANSLATED_FIELDS:
+            unit = ElementTree.SubElement(body, 'trans-unit',
+                                          {'id': '{}.{}'.format(row['pk'], field)})
+            ElementTree.SubElement(unit, 'source').text = row['source'][field]
+            ElementTree.SubElement(unit, 'target').text = row['target'][field]
+    ElementTree.ElementTree(root).write(stream, encoding='utf-8', xml_declaration=True)
+
+
+def read_xliff(stream):
+    """Returns the target language and the texts of an XLIFF file."""
+    try:
+        root = ElementTree.parse(stream).getroot()
+    except ElementTree.ParseError as error:
+        raise ValueError(str(error))
+    namespaces = {'x': XLIFF_NAMESPACE}
+    file_element = root.find('x:file', namespaces)
+    if file_element is None:
+        raise ValueError('No XLIFF 1.2 file element found.')
+    texts = defaultdict(dict)
+    for unit in file_element.iterfind('x:body/x:trans-unit', namespaces):
+        target = unit.find('x:target', namespaces)
+        if target is not None:
+            pk, field = get_unit_key(unit.get('id', ''))
+            texts[pk][field] = ''.join(target.itertext())
+    return file_element.get('target-language'), dict(texts)
+
+
+PO_ESCAPES = {'\\': '\\\\', '"': '\\"', '\n': '\\n', '\t': '\\t', '\r': '\\r'}
+PO_UNESCAPES = {'n': '\n', 't': '\t', 'r': '\r'}
+
+
+def po_quote(text):
+    lines = [re.sub(r'[\\"\n\t\r]', lambda match: PO_ESCAPES[match.group()], line)
+             for line in re.findall(r'[^\n]*\n|[^\n]+', text)]
+    if len(lines) < 2:
+        return '"{}"'.format(''.join(lines))
+    return '""\n' + '\n'.join('"{}"'.format(line) for line in lines)
+
+
+def po_unquote(quoted):
+    return re.sub(r'\\(.)', lambda match: PO_UNESCAPES.get(match.group(1), match.group(1)),
+                  quoted.strip()[1:-1])
+
+
+def write_po(rows, source_language, target_language, stream):
+    stream.write('msgid ""\nmsgstr ""\n"Content-Type: text/plain; charset=UTF-8\\n"\n'
+                 '"Language: {}\\n"\n"X-Source-Language: {}\\n"\n'.format(
+                     target_language, source_language))
+    for row in rows:
+        for field in TRANSLATED_FIELDS:
+            stream.write('\nmsgctxt "{}.{}"\nmsgid {}\nmsgstr {}\n'.format(
+                row['pk'], field, po_quote(row['source'][field]),
+                po_quote(row['target'][field])))
+
+
+def read_po_entries(stream):
+    """Yields the entries of a PO file as dicts of keywords to texts."""
+    entry, keyword, flags = {}, None, ''
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('"') and keyword:
+            entry[keyword] += po_unquote(line)
+            continue
+        if 'msgstr' in entry:
+            yield entry, flags
+            entry, keyword, flags = {}, None, ''
+        if line.startswith('#'):
+            if line.startswith('#,'):
+                flags += line
+            continue
+        keyword, _, quoted = line.partition(' ')
+        if keyword not in ('msgctxt', 'msgid', 'msgstr') or not quoted.startswith('"'):
+            raise ValueError('Invalid line {} in PO file.'.format(number))
+        entry[keyword] = po_unquote(quoted)
+    if entry:
+        yield entry, flags
+
+
+def read_po(stream):
+    """Returns the target language and the texts of a PO file."""
+    language, texts = None, defaultdict(dict)
+    for entry, flags in read_po_entries(stream):
+        if 'msgctxt' not in entry:
+            match = re.search(r'^Language: *(\S+)$', entry.get('msgstr', ''), re.MULTILINE)
+            language = match.group(1) if match else language
+        elif 'fuzzy' not in flags:
+            pk, field = get_unit_key(entry['msgctxt'])
+            texts[pk][field] = entry.get('msgstr', '')
+    return language, dict(texts)
+
+
+WRITERS = {'xliff': write_xliff, 'po': write_po}
+READERS = {'xliff': read_xliff, 'po': read_po}
@@ -0,0 +1,96 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+"""
+Set based review operations for many critical incidents at once.
+
+They run a single UPDATE or bulk_create instead of saving every incident, so
+the change log and the counters are updated here explicitly.
+"""
+
+from django.conf import settings
+from django.db import transaction
+
+from .changelog import record_bulk_changes
+from .counters import reconcile_departments
+from .models import CriticalIncident, Department, PublishableIncident
+from .translations import forget_cached_translations
+
+# fields which require a status other than "new", see CriticalIncident.clean
+REVIEW_FIELDS = ('action', 'responsibilty', 'review_date', 'risk', 'frequency')
+
+
+def update_incidents(queryset, values):
+    """
+    Sets values on all incidents of queryset which differ from them.
+
+    Incidents with the status "new" are skipped if a review field is set
+    without changing the status. Returns the numbers of changed and skipped
+    incidents.
+    """
+    if values.get('status') == 'new':
+        raise ValueError('Incidents can not be reset to "new".')
+    skipped = 0
+    if 'status' not in values and set(values) & set(REVIEW_FIELDS):
+        skipped = queryset.filter(status='new').count()
+        queryset = queryset.exclude(status='new')
+    with transaction.atomic():
+        # exclude with several lookups keeps rows where any of them differs
+        pks = list(queryset.exclude(**values).select_for_update().values_list(
+            'pk', flat=True))
+        incidents = CriticalIncident.objects.filter(pk__in=pks)
+        changed = incidents.update(**values)
+        record_bulk_changes(incidents, values)
+        if 'status' in values:
+            reconcile_departments(Department.objects.filter(
+                pk__in=incidents.values('department_id')))
+    return changed, skipped
+
+
+def create_publishable_incidents(queryset, language_code=None):
+    """
+    Creates unpublished publishable incidents for the public incidents of
+    queryset which were reviewed and have none yet. The reported incident is
+    used as a first translation. Returns the number of created objects.
+    """
+    language_code = language_code or settings.PARLER_DEFAULT_LANGUAGE_CODE
+    translation_model = PublishableIncident._parler_meta.root_model
+    max_length = translation_model._meta.get_field('incident').max_length
+    with transaction.atomic():
+        incidents = list(queryset.filter(
+            public=True, publishableincident__isnull=True).exclude(
+                status='new').select_for_update().only('pk', 'incident'))
+        if not incidents:
+            return 0
+        PublishableIncident.objects.bulk_create([
+            PublishableIncident(critical_incident=incident, publish=False)
+            for incident in incidents])
+        created = PublishableIncident.objects.filter(
+            critical_incident__in=[incident.pk for incident in incidents])
+        texts = {incident.pk: incident.incident for incident in incidents}
+        translations = translation_model.objects.bulk_create([
+            translation_model(master_id=pk, language_code=language_code,
+                              incident=texts[incident_pk][:max_length])
+            for pk, incident_pk in created.values_list('pk', 'critical_incident_id')])
+        forget_cached_translations(translations)
+        record_bulk_changes(created, [field.name for field in
+                                      PublishableIncident._meta.concrete_fields], 'created')
+        reconcile_departments(Department.objects.filter(
+            pk__in=created.values('critical_incident__department_id')))
+    return len(incidents)
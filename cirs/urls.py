@@ -1,16 +1,20 @@
-from django.urls import re_path
+from django.urls import path
 from django.views.generic import TemplateView
 
+from cirs.routers import replica_allowed
 from cirs.views import (DepartmentList, IncidentCreate, IncidentDetailView,
                         IncidentSearch, PublishableIncidentList)
 
+# the dept converter is registered in cirs.departments
+
 urlpatterns = [
-    re_path(r'^$', DepartmentList.as_view(), name='departments_list'),
-    re_path(r'^(?P<dept>.+)/create/$', IncidentCreate.as_view(), name='create_incident'),
-    re_path(r'^(?P<dept>.+)/create/success/$',
+    path('', replica_allowed(DepartmentList.as_view()), name='departments_list'),
+    path('<dept:dept>/create/', IncidentCreate.as_view(), name='create_incident'),
+    path('<dept:dept>/create/success/',
         TemplateView.as_view(template_name="cirs/success.html"),
         name='success'),
-    re_path(r'^(?P<dept>.+)/search/$', IncidentSearch.as_view(), name='incident_search'),
-    re_path(r'^(?P<dept>.+)/(?P<pk>[0-9]+)/$', IncidentDetailView.as_view(), name='incident_detail'),
-    re_path(r'^(?P<dept>.+)/$', PublishableIncidentList.as_view(), name='incidents_for_department'),
+    path('<dept:dept>/search/', IncidentSearch.as_view(), name='incident_search'),
+    path('<dept:dept>/<int:pk>/', IncidentDetailView.as_view(), name='incident_detail'),
+    path('<dept:dept>/', replica_allowed(PublishableIncidentList.as_view()),
+        name='incidents_for_department'),
 ]
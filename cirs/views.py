@@ -16,6 +16,7 @@
 # along with LabCIRS.
 # If not, see <https://www.gnu.org/licenses/>.
 
+import math
 import os
 
 from django.conf import settings
@@ -23,9 +24,9 @@ from django.contrib import messages
 from django.contrib.auth import (REDIRECT_FIELD_NAME, authenticate, login,
                                  logout)
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.contrib.auth.models import User
 from django.contrib.messages.views import SuccessMessageMixin
-from django.shortcuts import redirect, render
+from django.db import transaction
+from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import get_script_prefix, resolve, reverse_lazy
 from django.utils.translation import get_language
 from django.utils.translation import gettext_lazy as _
@@ -33,9 +34,14 @@ from django.views.generic import ListView
 from django.views.generic.edit import CreateView, FormView
 from registration.backends.admin_approval.views import RegistrationView
 
+from .access import grant_access, has_access
+from .dashboard import cached_work_queues
+from .departments import resolve_department
 from .forms import CommentForm, IncidentCreateForm, IncidentSearchForm
-from .models import (Comment, CriticalIncident, Department, LabCIRSConfig,
-                     PublishableIncident, Reporter, Reviewer)
+from .models import (Comment, CriticalIncident, Department,
+                     PublishableIncident, Reviewer)
+from .provisioning import provision_department
+from .throttling import Throttle, get_client_ip
 
 
 class RedirectMixin(object):
@@ -51,13 +57,16 @@ class RedirectMixin(object):
 
 
 class ContextAndRedirectMixin(RedirectMixin):
-    
+
+    def get_department(self):
+        return resolve_department(self.request, self.kwargs['dept'])
+
     def get_context_data(self, **kwargs):
         context = super(ContextAndRedirectMixin, self).get_context_data(**kwargs)
         if hasattr(self.request.user, 'reporter'):
             context['department'] = self.request.user.reporter.department.label
         else:
-            context['department'] = self.kwargs['dept']
+            context['department'] = self.get_department().label
         return context
 
 class DepartmentList(RedirectMixin, ListView):
@@ -76,6 +85,12 @@ class DepartmentList(RedirectMixin, ListView):
         else:
             return super(DepartmentList, self).dispatch(*args, **kwargs)
         
+    def get_context_data(self, **kwargs):
+        context = super(DepartmentList, self).get_context_data(**kwargs)
+        if hasattr(self.request.user, 'reviewer'):
+            context['work_queues'] = cached_work_queues(self.request.user.reviewer)
+        return context
+
     def get_queryset(self):
         if hasattr(self.request.user, 'reviewer'):
             return self.request.user.reviewer.departments.filter(active=True)#all()
@@ -122,11 +137,26 @@ class IncidentSearch(ContextAndRedirectMixin, LoginRequiredMixin, FormView):
         else:
             return super(IncidentSearch, self).dispatch(*args, **kwargs)
 
+    def post(self, request, *args, **kwargs):
+        ip, department = get_client_ip(request), self.get_department().label
+        self.throttle = Throttle('incident_search', shared={'department': 'client'}, ip=ip,
+                                 department=department, client='{} {}'.format(ip, department))
+        retry_after = self.throttle.get_retry_after()
+        if retry_after:
+            # an unbound form, validation would look the code up
+            return self.render_to_response(self.get_context_data(
+                form=self.form_class(), retry_after_minutes=math.ceil(retry_after / 60)),
+                status=429)
+        self.throttle.consume('ip')
+        return super(IncidentSearch, self).post(request, *args, **kwargs)
+
+    def form_invalid(self, form):
+        self.throttle.consume('department', 'client')
+        return super(IncidentSearch, self).form_invalid(form)
+
     def form_valid(self, form):
-        comment_code = form.cleaned_data.get('incident_code')
-        incident = CriticalIncident.objects.get(comment_code=comment_code)
-        self.request.session['accessible_incident'] = incident.id
-        return redirect(incident.get_absolute_url())
+        incident = form.incident
+        return grant_access(redirect(incident.get_absolute_url()), incident, self.request.user)
     
 
 # TODO: Rename to Comment view?
@@ -139,36 +169,46 @@ class IncidentDetailView(ContextAndRedirectMixin, LoginRequiredMixin, CreateView
     form_class = CommentForm
     template_name = 'cirs/criticalincident_detail.html'
     
+    def get_incident(self):
+        if not hasattr(self, '_incident'):
+            self._incident = get_object_or_404(
+                CriticalIncident.objects.select_related('department'), pk=self.kwargs['pk'],
+                department=self.get_department())
+        return self._incident
+
     def get_success_url(self):
         # returns the absolute URL of the parent (and current incident)
-        return CriticalIncident.objects.get(pk=self.kwargs['pk']).get_absolute_url()
+        return self.get_incident().get_absolute_url()
   
     def form_valid(self, form):
         form.instance.author = self.request.user
-        form.instance.critical_incident = CriticalIncident.objects.get(pk=self.kwargs['pk'])
+        form.instance.critical_incident = self.get_incident()
         return super(IncidentDetailView, self).form_valid(form)
     
     def get_context_data(self, **kwargs):
         context = super(IncidentDetailView, self).get_context_data(**kwargs)
-        context['incident'] = CriticalIncident.objects.get(pk=self.kwargs['pk'])
+        context['incident'] = self.get_incident()
         return context
 
-    def render_to_response(self, context, **kwargs):
-        if hasattr(self.request.user, 'reviewer'):
+    def dispatch(self, request, *args, **kwargs):
+        # checked before GET and POST, so comments need access as well
+        if request.user.is_authenticated:
+            denied = self.check_access()
+            if denied is not None:
+                return denied
+        return super(IncidentDetailView, self).dispatch(request, *args, **kwargs)
+
+    def check_access(self):
+        user = self.request.user
+        incident = self.get_incident()
+        if hasattr(user, 'reviewer'):
             # display only if reviewer belongs to incidents department
-            if context['incident'].department in self.request.user.reviewer.departments.all():
-                return super(IncidentDetailView, self).render_to_response(context, **kwargs)
-            else:
+            if not user.reviewer.departments.filter(pk=incident.department_id).exists():
                 return redirect('labcirs_home')
-        accessible_incident_id = None
-        try:
-            accessible_incident_id = self.request.session['accessible_incident']
-        except KeyError:
-            return redirect('incident_search', dept=context['department'])
-        if accessible_incident_id != context['incident'].pk:
-            return redirect('incident_search', dept=context['department'])
-        else:
-            return super(IncidentDetailView, self).render_to_response(context, **kwargs)
+        elif not has_access(self.request, incident):
+            department = user.reporter.department if hasattr(user, 'reporter') else incident.department
+            return redirect('incident_search', dept=department.label)
+        return None
 
 
 class PublishableIncidentList(ContextAndRedirectMixin, LoginRequiredMixin, ListView):
@@ -179,9 +219,9 @@ class PublishableIncidentList(ContextAndRedirectMixin, LoginRequiredMixin, ListV
 
     def dispatch(self, *args, **kwargs):
         if hasattr(self.request.user, 'reporter'):
-            if self.request.user.reporter.department.label != self.kwargs['dept']:
+            if self.request.user.reporter.department != self.get_department():
                 messages.warning(self.request, _('You were redirected from {} to {}!').format(
-                    self.kwargs['dept'], self.request.user.reporter.department.label))
+                    self.get_department().label, self.request.user.reporter.department.label))
                 return redirect('labcirs_home')
 
         return super(PublishableIncidentList, self).dispatch(*args, **kwargs)
@@ -189,12 +229,13 @@ class PublishableIncidentList(ContextAndRedirectMixin, LoginRequiredMixin, ListV
     def get_queryset(self):
         if hasattr(self.request.user, 'reporter'):
             return PublishableIncident.objects.filter(publish=True,
-                critical_incident__department=self.request.user.reporter.department)
+                critical_incident__department=self.request.user.reporter.department
+            ).select_related('critical_incident')
         elif hasattr(self.request.user, 'reviewer'):
             qs =  PublishableIncident.objects.filter(publish=True,
                 critical_incident__department__in=self.request.user.reviewer.departments.filter(
-                    label=self.kwargs['dept']
-                ))
+                    pk=self.get_department().pk
+                )).select_related('critical_incident')
             return qs
         else:
             return PublishableIncident.objects.none()
@@ -205,28 +246,23 @@ class RegistrationViewWithDepartment(RegistrationView):
     Registers new user and new department and adds the new user as Reviewer for this new department 
     """
 
+    @transaction.atomic
     def register(self, form_class):
-        department = Department()
-        department.label = form_class.cleaned_data['department_label']
-        department.name = form_class.cleaned_data['department_name']
         reporter_name = form_class.cleaned_data['reporter_name'].lower()
-        reporter_user = User.objects.create_user(reporter_name, password=reporter_name, is_active=False)
-        department.reporter = Reporter.objects.create(user=reporter_user)
-        department.active = False
-        department.save()
-        if department.pk is not None:
-            new_user = super(RegistrationViewWithDepartment, self).register(form_class)
-            new_user.first_name = form_class.cleaned_data['first_name']
-            new_user.last_name = form_class.cleaned_data['last_name']
-            # in theory not necessary, because generation of reviewer saves the user, 
-            # but in case of eventual changes...
-            new_user.save()
-            reviewer = Reviewer.objects.create(user=new_user)
-            department.reviewers.add(reviewer)
-            return new_user
-        else:
-            # TODO: redirect to error message if department could not be saved
-            return False
+        # department and reporter stay inactive until the reviewer is approved
+        department, _ = provision_department(
+            form_class.cleaned_data['department_label'],
+            form_class.cleaned_data['department_name'],
+            reporter_name, reporter_password=reporter_name, active=False)
+        new_user = super(RegistrationViewWithDepartment, self).register(form_class)
+        new_user.first_name = form_class.cleaned_data['first_name']
+        new_user.last_name = form_class.cleaned_data['last_name']
+        # in theory not necessary, because generation of reviewer saves the user, 
+        # but in case of eventual changes...
+        new_user.save()
+        reviewer = Reviewer.objects.create(user=new_user)
+        department.reviewers.add(reviewer)
+        return new_user
 
     def get_context_data(self, **kwargs):
         context = super(RegistrationViewWithDepartment, self).get_context_data(**kwargs)
@@ -267,14 +303,27 @@ def login_user(request, redirect_field_name=REDIRECT_FIELD_NAME):
         'If you are reviewer or administrator and forgot your password, please klick')
     username = password = message = ''
     message_class = 'danger'
+    retry_after = 0
+    status = 200
     redirect_url = request.GET.get(redirect_field_name, '')
     if len(redirect_url) == 0:
         redirect_url = reverse_lazy('labcirs_home')
 
     if request.method == 'POST':
-        username = request.POST.get('username')
+        username = request.POST.get('username', '')
         password = request.POST.get('password')
-        user = authenticate(username=username, password=password)
+        ip = get_client_ip(request)
+        throttle = Throttle('login', shared={'username': 'client'}, ip=ip, username=username,
+                            client='{} {}'.format(ip, username))
+        retry_after = throttle.get_retry_after()
+        if retry_after:
+            # hashing the password is expensive, so it is not even tried
+            user = None
+            message_class = 'warning'
+            status = 429
+        else:
+            throttle.consume('ip')
+            user = authenticate(username=username, password=password)
         if user is not None:
             if user.is_active:
                 login(request, user)
@@ -299,13 +348,15 @@ def login_user(request, redirect_field_name=REDIRECT_FIELD_NAME):
             else:
                 message = _('Your account is not active, please contact the admin.')
                 message_class = 'warning'
-        else:
+        elif not retry_after:
+            throttle.consume('username', 'client')
             reset_link = '<a href="{}">{}.</a>'.format(reverse_lazy('auth_password_reset'), _('here'))
             message = NOT_AUTHENTICATED_MSG + " " + reset_link
 
     context = {'message': message,
                'message_class': message_class,
                'username': username,
+               'retry_after_minutes': math.ceil(retry_after / 60),
                redirect_field_name: redirect_url,
                }
     
@@ -314,13 +365,12 @@ def login_user(request, redirect_field_name=REDIRECT_FIELD_NAME):
         prefix = get_script_prefix()
         match = resolve(redirect_url.replace(prefix, '/'))
         context['department'] = match.kwargs['dept']
-        context['labcirs_config'] = LabCIRSConfig.objects.get(
-            department__label=match.kwargs['dept'])
+        context['labcirs_config'] = resolve_department(request, match.kwargs['dept']).labcirsconfig
     except Exception as e:
         pass
         #print e
         #traceback.print_exc()
-    return render(request, 'cirs/login.html', context)
+    return render(request, 'cirs/login.html', context, status=status)
 
 
 def logout_user(request):
@@ -0,0 +1,18 @@
+"""
+ASGI config for labcirs project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+The JSON API views are coroutines and do not occupy a worker thread while
+waiting for the database, all other views run in a thread pool.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
+"""
+
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "labcirs.settings.production")
+
+from django.core.asgi import get_asgi_application
+
+application = get_asgi_application()
@@ -0,0 +1,56 @@
+# Copyright (C) 2026 Sebastian Major
+#
+# This file is part of LabCIRS.
+#
+# LabCIRS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# LabCIRS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with LabCIRS.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+"""
+SQLite backend for production use with concurrent requests.
+
+Connections use the WAL journal, so readers do not block the writer, and
+wait for locks up to the ``timeout`` given in ``OPTIONS``. Transactions of
+atomic blocks start with ``BEGIN IMMEDIATE``: a deferred transaction which
+reads first and writes later cannot wait for the lock and fails at once with
+"database is locked". Further pragmas can be set with ``OPTIONS['pragmas']``.
+"""
+
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    pragmas = {
+        'journal_mode': 'WAL',
+        # durable at checkpoints, which is sufficient with WAL
+        'synchronous': 'NORMAL',
+        'cache_size': -20000,  # KiB
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    }
+
+    def get_connection_params(self):
+        kwargs = super(DatabaseWrapper, self).get_connection_params()
+        self.pragmas = dict(self.pragmas, **kwargs.pop('pragmas', {}))
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super(DatabaseWrapper, self).get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute('PRAGMA {} = {}'.format(name, value))
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
@@ -85,6 +85,9 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # profiles the middleware below and the view
+    'cirs.profiling.ProfilingMiddleware',
+    'cirs.departments.DepartmentMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -153,6 +156,16 @@ TIME_ZONE = get_local_setting('TIME_ZONE', 'UTC')
 
 STATICFILES_DIRS = (join_path(BASE_DIR, 'static'),)
 
+# collectstatic adds hashes to the file names and writes gzip and brotli variants,
+# see cirs/staticfiles.py
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'cirs.staticfiles.CompressedManifestStaticFilesStorage'},
+}
+
+# deliver collected static files with LabCIRS if no web server is configured for them
+SERVE_STATIC = get_local_setting('SERVE_STATIC', False)
+
 
 LANGUAGES = tuple((k, _(v)) for k, v in get_local_setting('LANGUAGES').items())
 
@@ -211,6 +224,13 @@ ADMINS = tuple((v, k) for k, v in get_local_setting('ADMINS', {}).items())
 REGISTRATION_RESTRICT_USER_EMAIL = get_local_setting('REGISTRATION_RESTRICT_USER_EMAIL', False)
 REGISTRATION_EMAIL_DOMAINS = get_local_setting('REGISTRATION_EMAIL_DOMAINS', [])
 
+# Limits of login attempts and incident code searches, see cirs/throttling.py
+THROTTLE_RATES = get_local_setting('THROTTLE_RATES', {})
+
+# On demand profiling of requests by superusers, see cirs/profiling.py
+PROFILING_MAX_AGE = get_local_setting('PROFILING_MAX_AGE', 30 * 60)
+PROFILING_KEEP_REPORTS = get_local_setting('PROFILING_KEEP_REPORTS', 50)
+
 if REGISTRATION_RESTRICT_USER_EMAIL is True:
     if len(REGISTRATION_EMAIL_DOMAINS) < 1:
         raise ImproperlyConfigured('If you want to restrict email domains for registration, '
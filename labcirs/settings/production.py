@@ -11,5 +11,38 @@ DATABASES = {
         'PASSWORD': get_local_setting('DB_PASSWORD'),
         'HOST': get_local_setting('DB_HOST'),
         'PORT': get_local_setting('DB_PORT'),
+        # seconds to keep connections open between requests, null for unlimited
+        'CONN_MAX_AGE': get_local_setting('DB_CONN_MAX_AGE', 0),
+        'CONN_HEALTH_CHECKS': get_local_setting('DB_CONN_HEALTH_CHECKS', False),
+        # required behind a pooler in transaction mode, e.g. PgBouncer
+        'DISABLE_SERVER_SIDE_CURSORS': get_local_setting('DB_EXTERNAL_POOLER', False),
     }
 }
+
+# Tuned SQLite for many concurrent requests, see labcirs/backends/sqlite3/base.py
+if (get_local_setting('SQLITE_PRODUCTION_PROFILE', False)
+        and DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3'):
+    DATABASES['default']['ENGINE'] = 'labcirs.backends.sqlite3'
+    DATABASES['default']['OPTIONS'] = {
+        'timeout': get_local_setting('SQLITE_BUSY_TIMEOUT', 20)}
+
+# Optional second database, e.g. PostgreSQL, as target of
+# python manage.py migrate_database --to target
+MIGRATION_TARGET_DATABASE = get_local_setting('MIGRATION_TARGET_DATABASE', {})
+if MIGRATION_TARGET_DATABASE:
+    DATABASES['target'] = MIGRATION_TARGET_DATABASE
+
+# Optional read replica of the default database for read-only views, see
+# cirs/routers.py
+REPLICA_DATABASE = get_local_setting('REPLICA_DATABASE', {})
+if REPLICA_DATABASE:
+    DATABASES['replica'] = dict(REPLICA_DATABASE, TEST={'MIRROR': 'default'})
+    DATABASE_ROUTERS = ['cirs.routers.ReplicaRouter']
+    MIDDLEWARE = MIDDLEWARE + ['cirs.routers.ReplicaMiddleware']
+    REPLICA_PIN_SECONDS = get_local_setting('REPLICA_PIN_SECONDS', 10)
+
+# Cache shared by all processes, e.g. Redis, required to throttle logins and
+# incident code searches of all processes together, see cirs/throttling.py
+CACHE = get_local_setting('CACHE', {})
+if CACHE:
+    CACHES = {'default': CACHE}
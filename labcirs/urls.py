@@ -4,12 +4,15 @@ from django.views.generic import TemplateView
 from django.views.static import serve
 
 from cirs.admin import admin_site
+from cirs.routers import replica_allowed
+from cirs.staticfiles import serve_static
 from cirs.views import (DepartmentList, RegistrationViewWithDepartment,
                         login_user, logout_user)
 
 urlpatterns = [
-    re_path(r'^$', DepartmentList.as_view(), name='labcirs_home'),
+    re_path(r'^$', replica_allowed(DepartmentList.as_view()), name='labcirs_home'),
     re_path(r'^incidents/', include('cirs.urls')),
+    re_path(r'^api/v1/', include('cirs.api_urls')),
     re_path(r'^admin/logout/$', logout_user, name='logout_admin'),
     re_path(r'^admin/', admin_site.urls),
     re_path(r'^login/$',  login_user, name='login'),
@@ -21,6 +24,11 @@ urlpatterns = [
     re_path(r'^demo_data.html$', TemplateView.as_view(), name='demo_login_data_page'),
 ]
 
+if settings.SERVE_STATIC:
+    urlpatterns += [
+        re_path(r'^static/(?P<path>.*)$', serve_static),
+    ]
+
 if settings.DEBUG:
     urlpatterns += [
         re_path(r'^media/(?P<path>.*)$', serve, {